@@ -0,0 +1,68 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import time
+import warnings
+import numpy as np
+import logging
+
+from src.engines.forecast_engine import fit_arima111, forecast_arima111
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _time_calls(fn, series, repeats):
+    """Median wall time per call in milliseconds"""
+    timings = []
+    for _ in range(repeats):
+        for y in series:
+            start = time.perf_counter()
+            fn(y)
+            timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+def main():
+    parser = argparse.ArgumentParser(description="ARIMA(1,1,1): NumPy kernel vs statsmodels")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[24, 60, 200])
+    parser.add_argument("--series", type=int, default=20)
+    parser.add_argument("--periods", type=int, default=6)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    
+    # Import cost is part of the statsmodels cold path
+    start = time.perf_counter()
+    from statsmodels.tsa.arima.model import ARIMA
+    import_ms = (time.perf_counter() - start) * 1000
+    logger.info(f"statsmodels ARIMA import: {import_ms:.1f} ms")
+    
+    def statsmodels_forecast(y):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return ARIMA(y, order=(1, 1, 1)).fit().get_forecast(steps=args.periods).summary_frame()
+    
+    def kernel_forecast(y):
+        return forecast_arima111(fit_arima111(y), args.periods)
+    
+    rng = np.random.default_rng(0)
+    print(f"{'length':>8} {'statsmodels ms':>15} {'kernel ms':>10} {'speedup':>8} {'median diff':>12} {'max diff':>9}")
+    for length in args.lengths:
+        series = [50000 + np.cumsum(rng.normal(0, 500, length)) for _ in range(args.series)]
+        reference_ms = _time_calls(statsmodels_forecast, series, args.repeats)
+        kernel_ms = _time_calls(kernel_forecast, series, args.repeats)
+        
+        # statsmodels' approximate diffuse prior (variance 1e6) is not negligible at income
+        # scale, so agreement is checked on unit-scale copies where both are exact.
+        # Random walks put the optimum on the phi = -theta ridge, so the max can be loose.
+        diffs = []
+        for y in series:
+            unit = 50 + (y - y[0]) / 500
+            expected = statsmodels_forecast(unit)["mean"].values
+            diff = np.abs(np.array(kernel_forecast(unit)["forecast"]) - expected) / np.abs(expected)
+            diffs.append(float(diff.max()))
+        
+        print(f"{length:>8} {reference_ms:>15.2f} {kernel_ms:>10.2f} {reference_ms / kernel_ms:>7.1f}x {np.median(diffs):>12.2e} {max(diffs):>9.2e}")
+
+if __name__ == "__main__":
+    main()
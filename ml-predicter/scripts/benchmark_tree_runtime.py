@@ -0,0 +1,79 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import time
+import warnings
+import numpy as np
+import joblib
+import logging
+
+from src.engines.tree_runtime import FlatTreeEnsemble, forest_intervals
+from src.utils.model_store import ARTIFACTS, TREE_ENSEMBLES
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _time_calls(fn, X, repeats):
+    """Median wall time per call in milliseconds"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+def _load(model_dir, name):
+    """(model, load ms) from the pickle, or (None, None)"""
+    path = os.path.join(model_dir, ARTIFACTS[name][0])
+    if not os.path.exists(path):
+        return None, None
+    try:
+        start = time.perf_counter()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            model = joblib.load(path)
+        return model, (time.perf_counter() - start) * 1000
+    except Exception as e:
+        logger.warning(f"{name}: cannot load ({e})")
+        return None, None
+
+def main():
+    parser = argparse.ArgumentParser(description="Tree ensembles: flattened runtime vs sklearn predict")
+    parser.add_argument("--model-dir", default="models")
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    load_times = []
+    print(f"{'model':>30} {'rows':>6} {'sklearn ms':>11} {'flat ms':>8} {'speedup':>8} {'max diff':>9} {'interval ms':>12}")
+    for name in sorted(TREE_ENSEMBLES):
+        model, pickle_ms = _load(args.model_dir, name)
+        if model is None:
+            continue
+        flat = FlatTreeEnsemble.from_sklearn(model)
+        manifest = os.path.join(args.model_dir, ARTIFACTS[f"{name}_trees"][0])
+        if os.path.exists(manifest):
+            start = time.perf_counter()
+            FlatTreeEnsemble.load(manifest)
+            load_times.append((name, pickle_ms, (time.perf_counter() - start) * 1000))
+        predict = "predict_proba" if hasattr(model, "predict_proba") else "predict"
+
+        for rows in (1, args.batch):
+            X = rng.normal(size=(rows, model.n_features_in_)) * 3
+            reference_ms = _time_calls(getattr(model, predict), X, args.repeats)
+            flat_ms = _time_calls(getattr(flat, predict), X, args.repeats)
+            diff = np.abs(getattr(model, predict)(X) - getattr(flat, predict)(X)).max()
+            # Per-tree quantile intervals (forest regressors only)
+            interval = f"{_time_calls(lambda X: forest_intervals(flat, X), X, args.repeats):.3f}" if flat.kind == "forest_regressor" else "-"
+            print(f"{name:>30} {rows:>6} {reference_ms:>11.2f} {flat_ms:>8.3f} {reference_ms / flat_ms:>7.1f}x {diff:>9.1e} {interval:>12}")
+
+    if load_times:
+        print(f"\n{'model':>30} {'unpickle ms':>12} {'memmap ms':>10}")
+        for name, pickle_ms, mmap_ms in load_times:
+            print(f"{name:>30} {pickle_ms:>12.1f} {mmap_ms:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,11 @@ import matplotlib.pyplot as plt
 import logging
 
 from src.config.settings import settings
+from src.engines.backtest import SYNTHETIC_SOURCE, BacktestConfig, run_backtest
+from src.engines.forecast_engine import INCOME_ARTIFACTS, build_income_engine
+from src.engines.feature_builder import FeatureBuilder, FeatureSpec
+from src.utils.model_store import ModelStore
+from src.utils.ts_artifacts import load_compact_model
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -24,6 +29,7 @@ class ModelEvaluator:
     def __init__(self, model_dir: str = "./models"):
         self.model_dir = Path(model_dir)
         self.results = {}
+        self.backtest = None
         
     def evaluate_all(self):
         """Evaluate all trained models"""
@@ -38,11 +44,15 @@ class ModelEvaluator:
             return
         
         # Evaluate income models
-        logger.info("\n[1/2] Evaluating Income Forecast Models...")
+        logger.info("\n[1/3] Evaluating Income Forecast Models...")
         self.evaluate_income_models()
         
+        # Rolling-origin backtest of the ensemble sub-models
+        logger.info("\n[2/3] Backtesting Income Ensemble...")
+        self.backtest_income_ensemble()
+        
         # Evaluate health models
-        logger.info("\n[2/2] Evaluating Health Risk Models...")
+        logger.info("\n[3/3] Evaluating Health Risk Models...")
         self.evaluate_health_models()
         
         # Generate report
@@ -62,13 +72,17 @@ class ModelEvaluator:
         
         for model_name in models_to_test:
             model_path = self.model_dir / f"{model_name}.pkl"
+            compact_path = self.model_dir / f"{model_name}_compact.npz"
             
-            if not model_path.exists():
+            if not model_path.exists() and not compact_path.exists():
                 logger.warning(f"✗ {model_name} not found")
                 continue
             
             try:
-                model = joblib.load(model_path)
+                if compact_path.exists():
+                    model = load_compact_model(compact_path)
+                else:
+                    model = joblib.load(model_path)
                 
                 # Evaluate based on model type
                 if 'rf' in model_name:
@@ -86,6 +100,39 @@ class ModelEvaluator:
             except Exception as e:
                 logger.error(f"✗ {model_name}: {e}")
     
+    def backtest_income_ensemble(
+        self,
+        series_csv: str = "data/user_income_series.csv",
+        n_series: int = 200,
+        n_obs: int = 120,
+        n_jobs: int = 2
+    ):
+        """
+        Rolling-origin backtest with the app's engine configuration (window policy included).
+        Inverse-MSE ensemble weights are saved only when real series are available: an export
+        of user_metrics income rows (user_id, metric_date, metric_value) at `series_csv`.
+        Otherwise a synthetic panel is scored for the report and no weights are written.
+        """
+        try:
+            engine = build_income_engine(settings, ModelStore(str(self.model_dir)).load(INCOME_ARTIFACTS))
+            panel, source = self._load_income_series(Path(series_csv))
+            if not panel:
+                panel, source = self._generate_test_panel(n_series, n_obs), SYNTHETIC_SOURCE
+            config = BacktestConfig(horizon=6, min_train=24, step=3, source=source)
+            result = run_backtest(engine, panel, config, n_jobs=n_jobs)
+            
+            result.log_table()
+            self.backtest = result.to_dict()
+            
+            if source == SYNTHETIC_SOURCE:
+                logger.warning(f"No real income series at {series_csv}; ensemble weights not saved")
+                return
+            weights_path = result.save_weights(self.model_dir / "income_ensemble_weights.json")
+            logger.info(f"✓ Ensemble weights saved to: {weights_path}")
+            
+        except Exception as e:
+            logger.error(f"✗ backtest: {e}")
+    
     def evaluate_health_models(self):
         """Evaluate health prediction models"""
         
@@ -193,6 +240,35 @@ class ModelEvaluator:
         
         return df
     
+    def _load_income_series(self, path: Path) -> tuple:
+        """(dates, values) per user from a user_metrics export, and its source label"""
+        if not path.exists():
+            return [], None
+        df = pd.read_csv(path, parse_dates=['metric_date'])
+        panel = [
+            (group['metric_date'].values, group['metric_value'].values.astype(float))
+            for _, group in df.groupby('user_id')
+            if len(group) > 1
+        ]
+        logger.info(f"✓ Loaded {len(panel)} income series from {path}")
+        return panel, f"user_metrics export: {path}"
+    
+    def _generate_test_panel(self, n_series: int = 200, n_obs: int = 120) -> list:
+        """Daily (dates, values) series with per-series level, growth and noise"""
+        rng = np.random.default_rng(123)
+        dates = np.datetime64('2024-01-01') + np.arange(n_obs)
+        t = np.arange(n_obs)
+        
+        panel = []
+        for _ in range(n_series):
+            level = rng.uniform(30000, 70000)
+            growth = rng.uniform(-20, 150)
+            seasonal = rng.uniform(0, 4000) * np.sin(2 * np.pi * t / 365)
+            noise = rng.normal(0, rng.uniform(500, 3000), n_obs)
+            panel.append((dates, level + growth * t + seasonal + noise))
+        
+        return panel
+    
     def _generate_health_test_data(self, n_samples: int = 200) -> pd.DataFrame:
         """Generate test data for health models"""
         np.random.seed(123)
@@ -262,8 +338,10 @@ class ModelEvaluator:
         # Load scaler
         scaler = joblib.load(self.model_dir / "income_scaler.pkl")
         
-        features = ['day_of_week', 'month', 'quarter']
-        X_test = test_data[features].values
+        # Same feature spec the model was trained with (legacy models: default calendar columns)
+        spec_path = self.model_dir / "income_rf_features.json"
+        spec = FeatureSpec.load(spec_path) if spec_path.exists() else FeatureSpec()
+        X_test = FeatureBuilder(spec).build(test_data['date'].values, test_data['income'].values)
         y_test = test_data['income'].values
         
         X_test_scaled = scaler.transform(X_test)
@@ -291,7 +369,8 @@ class ModelEvaluator:
         report = {
             'evaluation_date': datetime.now().isoformat(),
             'model_directory': str(self.model_dir),
-            'results': self.results
+            'results': self.results,
+            'backtest': self.backtest
         }
         
         # Save to JSON
@@ -0,0 +1,73 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import asyncio
+import json
+import logging
+
+from src.config.settings import settings
+from src.engines.forecast_engine import INCOME_ARTIFACTS, build_income_engine
+from src.utils.cache import CacheManager
+from src.utils.database import Database
+from src.utils.fitting_service import FittingService
+from src.utils.forecast_cache import ForecastCache
+from src.utils.forecast_precompute import ForecastPrecomputer
+from src.utils.model_registry import ModelRegistry
+from src.utils.model_store import ModelStore
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def run(args):
+    db = Database(settings.DATABASE_URL)
+    await db.connect()
+    if db.engine is None:
+        logger.error("Database unavailable, nothing to precompute")
+        return
+
+    cache = CacheManager(settings.REDIS_URL)
+    await cache.connect()
+    forecast_cache = ForecastCache(cache, ttl_seconds=settings.REDIS_CACHE_TTL)
+
+    model_registry = ModelRegistry(db)
+    await model_registry.register_model()
+
+    # Same engine configuration as the app, so cache keys match what the route computes
+    fitting_service = FittingService(max_workers=args.workers, max_pending=1_000_000).start()
+    engine = build_income_engine(
+        settings,
+        ModelStore(settings.MODEL_PATH, compile_trees=settings.TREE_RUNTIME).load(INCOME_ARTIFACTS),
+        fitting_service
+    )
+
+    try:
+        precomputer = ForecastPrecomputer(
+            db,
+            engine,
+            forecast_cache=forecast_cache,
+            model_registry=model_registry,
+            page_size=args.page_size,
+            active_days=args.active_days,
+            horizon=settings.FORECAST_MAX_HORIZON,
+            ttl_seconds=settings.PRECOMPUTE_TTL_SECONDS,
+            concurrency=args.workers
+        )
+        stats = await precomputer.run()
+        print(json.dumps(stats, indent=2))
+    finally:
+        fitting_service.shutdown()
+        await cache.disconnect()
+        await db.disconnect()
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute income forecasts for all active users")
+    parser.add_argument("--page-size", type=int, default=settings.PRECOMPUTE_PAGE_SIZE)
+    parser.add_argument("--active-days", type=int, default=settings.PRECOMPUTE_ACTIVE_DAYS)
+    parser.add_argument("--workers", type=int, default=settings.FIT_POOL_WORKERS)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -21,7 +21,10 @@ import json
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from src.config.settings import settings
-from statsmodels.tsa.arima.model import ARIMA
+from src.engines.feature_builder import FeatureBuilder, FeatureSpec
+from src.engines.order_selection import select_arima_order
+from src.engines.tree_runtime import save_tree_model
+from src.utils.ts_artifacts import save_compact_model
 from statsmodels.tsa.statespace.sarimax import SARIMAX
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingClassifier
 from sklearn.preprocessing import StandardScaler
@@ -32,6 +35,9 @@ warnings.filterwarnings('ignore')
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Worker processes for candidate fits in the ARIMA order search
+ORDER_SEARCH_JOBS = min(4, os.cpu_count() or 1)
+
 class ModelTrainer:
     """Central model training orchestrator"""
     
@@ -39,6 +45,7 @@ class ModelTrainer:
         self.model_dir = Path(model_dir)
         self.model_dir.mkdir(exist_ok=True, parents=True)
         self.trained_models = {}
+        self.order_search = []
         
     def train_all(self):
         """Train all models in the pipeline"""
@@ -76,7 +83,7 @@ class ModelTrainer:
         # Train ARIMA
         try:
             arima_model = self._train_arima(train_data)
-            self._save_model(arima_model, "income_arima")
+            self._save_compact_model(arima_model, "income_arima")
             logger.info("✓ ARIMA model trained and saved")
         except Exception as e:
             logger.error(f"✗ ARIMA training failed: {e}")
@@ -84,16 +91,18 @@ class ModelTrainer:
         # Train SARIMA
         try:
             sarima_model = self._train_sarima(train_data)
-            self._save_model(sarima_model, "income_sarima")
+            self._save_compact_model(sarima_model, "income_sarima")
             logger.info("✓ SARIMA model trained and saved")
         except Exception as e:
             logger.error(f"✗ SARIMA training failed: {e}")
         
         # Train Random Forest for income prediction
         try:
-            rf_model, scaler = self._train_rf_income(train_data)
+            rf_model, scaler, feature_spec = self._train_rf_income(train_data)
             self._save_model(rf_model, "income_rf")
+            self._save_tree_model(rf_model, "income_rf")
             self._save_model(scaler, "income_scaler")
+            self._save_feature_spec(feature_spec, "income_rf")
             logger.info("✓ Random Forest income model trained and saved")
         except Exception as e:
             logger.error(f"✗ Random Forest training failed: {e}")
@@ -122,29 +131,12 @@ class ModelTrainer:
         return df
     
     def _train_arima(self, data: pd.DataFrame) -> Any:
-        """Train ARIMA model"""
+        """Train ARIMA model (stepwise order search, candidates fitted in parallel)"""
         values = data['income'].values
         
-        # Auto ARIMA parameter selection
-        best_aic = float("inf")
-        best_model = None
-        best_order = (1, 1, 1)
-        
-        for p in range(3):
-            for d in range(2):
-                for q in range(3):
-                    try:
-                        model = ARIMA(values, order=(p, d, q))
-                        fitted = model.fit()
-                        if fitted.aic < best_aic:
-                            best_aic = fitted.aic
-                            best_model = fitted
-                            best_order = (p, d, q)
-                    except:
-                        continue
-        
-        logger.info(f"  Best ARIMA order: {best_order} (AIC: {best_aic:.2f})")
-        return best_model
+        selection = select_arima_order(values, n_jobs=ORDER_SEARCH_JOBS)
+        self.order_search = selection.report()
+        return selection.model
     
     def _train_sarima(self, data: pd.DataFrame) -> Any:
         """Train SARIMA model"""
@@ -166,8 +158,9 @@ class ModelTrainer:
     
     def _train_rf_income(self, data: pd.DataFrame) -> tuple:
         """Train Random Forest for income prediction"""
-        # Feature engineering
-        X = data[['day_of_week', 'month', 'quarter']].values
+        # Feature engineering (same builder the forecast engine uses at serving time)
+        feature_spec = FeatureSpec(calendar=("dayofweek", "month", "quarter"))
+        X = FeatureBuilder(feature_spec).build(data['date'].values)
         y = data['income'].values
         
         # Scale features
@@ -188,7 +181,7 @@ class ModelTrainer:
         train_score = model.score(X_scaled, y)
         logger.info(f"  Random Forest R² Score: {train_score:.4f}")
         
-        return model, scaler
+        return model, scaler, feature_spec
     
     def train_health_models(self):
         """Train health risk prediction models"""
@@ -201,6 +194,7 @@ class ModelTrainer:
         try:
             stress_model, stress_scaler = self._train_stress_classifier(health_data)
             self._save_model(stress_model, "health_stress_classifier")
+            self._save_tree_model(stress_model, "health_stress_classifier")
             self._save_model(stress_scaler, "health_stress_scaler")
             logger.info("✓ Stress classifier trained and saved")
         except Exception as e:
@@ -210,6 +204,7 @@ class ModelTrainer:
         try:
             risk_model, risk_scaler = self._train_risk_predictor(health_data)
             self._save_model(risk_model, "health_risk_predictor")
+            self._save_tree_model(risk_model, "health_risk_predictor")
             self._save_model(risk_scaler, "health_risk_scaler")
             logger.info("✓ Health risk predictor trained and saved")
         except Exception as e:
@@ -335,11 +330,56 @@ class ModelTrainer:
         except Exception as e:
             logger.error(f"Failed to save {name}: {e}")
     
+    def _save_compact_model(self, results: Any, name: str):
+        """Save a statsmodels results object as a compact artifact (params + filter state)"""
+        filepath = self.model_dir / f"{name}_compact.npz"
+        
+        try:
+            save_compact_model(results, filepath)
+            
+            self.trained_models[f"{name}_compact"] = {
+                'filepath': str(filepath),
+                'timestamp': datetime.now().isoformat(),
+                'size_bytes': filepath.stat().st_size
+            }
+        except Exception as e:
+            logger.error(f"Failed to save {name}: {e}")
+    
+    def _save_tree_model(self, model: Any, name: str):
+        """Save a tree ensemble as flat arrays + manifest (memory-mapped at serving time)"""
+        try:
+            manifest_path = save_tree_model(model, self.model_dir / name)
+            data_path = manifest_path.with_name(f"{name}.trees.bin")
+            
+            self.trained_models[f"{name}_trees"] = {
+                'filepath': str(manifest_path),
+                'timestamp': datetime.now().isoformat(),
+                'size_bytes': manifest_path.stat().st_size + data_path.stat().st_size
+            }
+        except Exception as e:
+            logger.error(f"Failed to save {name} tree artifact: {e}")
+    
+    def _save_feature_spec(self, spec: FeatureSpec, name: str):
+        """Save the feature spec next to the model it was trained with"""
+        filepath = self.model_dir / f"{name}_features.json"
+        
+        try:
+            spec.save(filepath)
+            
+            self.trained_models[f"{name}_features"] = {
+                'filepath': str(filepath),
+                'timestamp': datetime.now().isoformat(),
+                'columns': spec.columns
+            }
+        except Exception as e:
+            logger.error(f"Failed to save {name} feature spec: {e}")
+    
     def save_model_metadata(self):
         """Save metadata about all trained models"""
         metadata = {
             'training_date': datetime.now().isoformat(),
             'models': self.trained_models,
+            'arima_order_search': self.order_search,
             'config': {
                 'model_dir': str(self.model_dir),
                 'total_models': len(self.trained_models)
@@ -15,8 +15,12 @@ from dotenv import load_dotenv
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from src.config.settings import settings
+from src.engines.feature_builder import FeatureBuilder, FeatureSpec, infer_frequency
+from src.engines.global_model import fit_global_model
+from src.engines.order_selection import select_arima_order
+from src.engines.tree_runtime import artifact_paths, save_tree_model
+from src.utils.ts_artifacts import save_compact_model
 from supabase import create_client
-from statsmodels.tsa.arima.model import ARIMA
 from statsmodels.tsa.statespace.sarimax import SARIMAX
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingClassifier
 from sklearn.preprocessing import StandardScaler
@@ -29,6 +33,9 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+# Worker processes for candidate fits in the ARIMA order search
+ORDER_SEARCH_JOBS = min(4, os.cpu_count() or 1)
+
 # ============================================================================
 # DATA COLLECTORS
 # ============================================================================
@@ -266,6 +273,9 @@ class RealDataCollector:
             'date': df['metric_date'],
             'value': df['metric_value']
         })
+        # Kept for the global panel model, which trains on every user's series
+        if 'user_id' in df.columns:
+            result['user_id'] = df['user_id']
         return result
     
     def _format_health_data(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -373,6 +383,7 @@ class RealDataModelTrainer:
         self.model_dir.mkdir(exist_ok=True, parents=True)
         self.collector = RealDataCollector()
         self.trained_models = {}
+        self.order_search = None
     
     async def train_all_models(self):
         """Train all models with real data"""
@@ -434,11 +445,14 @@ class RealDataModelTrainer:
             predictions = best_model.forecast(steps=len(test_values))
             rmse = np.sqrt(mean_squared_error(test_values, predictions))
             
-            joblib.dump(best_model, self.model_dir / "income_arima.pkl")
+            save_compact_model(best_model, self.model_dir / "income_arima_compact.npz")
             self.trained_models['income_arima'] = {
                 'order': best_order,
                 'rmse': rmse,
-                'r2': r2_score(test_values, predictions)
+                'r2': r2_score(test_values, predictions),
+                'order_candidates': len(self.order_search.candidates),
+                'order_failures': len(self.order_search.failures),
+                'order_search_seconds': self.order_search.total_seconds
             }
             logger.info(f"  ✓ ARIMA trained - RMSE: {rmse:.2f}, Order: {best_order}")
             
@@ -459,7 +473,7 @@ class RealDataModelTrainer:
             predictions = sarima_model.forecast(steps=len(test_values))
             rmse = np.sqrt(mean_squared_error(test_values, predictions))
             
-            joblib.dump(sarima_model, self.model_dir / "income_sarima.pkl")
+            save_compact_model(sarima_model, self.model_dir / "income_sarima_compact.npz")
             self.trained_models['income_sarima'] = {'rmse': rmse}
             logger.info(f"  ✓ SARIMA trained - RMSE: {rmse:.2f}")
             
@@ -470,13 +484,10 @@ class RealDataModelTrainer:
         try:
             logger.info("  Training Random Forest...")
             
-            # Engineer features from dates
-            data['day_of_week'] = pd.to_datetime(data['date']).dt.dayofweek
-            data['month'] = pd.to_datetime(data['date']).dt.month
-            data['quarter'] = pd.to_datetime(data['date']).dt.quarter
-            
-            features = ['day_of_week', 'month', 'quarter']
-            X = data[features].values
+            # Engineer features from dates (same builder the forecast engine uses at serving time)
+            feature_spec = FeatureSpec(calendar=("dayofweek", "month", "quarter"))
+            dates = pd.to_datetime(data['date']).values
+            X = FeatureBuilder(feature_spec).build(dates)
             y = data['value'].values
             
             # Split
@@ -505,13 +516,60 @@ class RealDataModelTrainer:
             r2 = r2_score(y_test, predictions)
             
             joblib.dump(rf_model, self.model_dir / "income_rf.pkl")
+            self._save_tree_model(rf_model, "income_rf")
             joblib.dump(scaler, self.model_dir / "income_scaler.pkl")
+            feature_spec.save(self.model_dir / "income_rf_features.json")
             
-            self.trained_models['income_rf'] = {'rmse': rmse, 'r2': r2}
+            self.trained_models['income_rf'] = {'rmse': rmse, 'r2': r2, 'features': feature_spec.columns}
             logger.info(f"  ✓ Random Forest trained - RMSE: {rmse:.2f}, R²: {r2:.4f}")
             
         except Exception as e:
             logger.error(f"  ✗ Random Forest training failed: {e}")
+        
+        # 4. Global panel model (one model for all users' series)
+        try:
+            logger.info("  Training Global Panel Model...")
+            
+            # First 80% of each user's series for training, the rest for evaluation
+            groups = data.groupby('user_id') if 'user_id' in data.columns else [(None, data)]
+            train_series, test_series = [], []
+            for _, user_data in groups:
+                user_data = user_data.dropna(subset=['value'])
+                dates = pd.to_datetime(user_data['date']).values.astype('datetime64[D]')
+                user_values = user_data['value'].values.astype(np.float64)
+                split = int(len(user_values) * 0.8)
+                if split >= 2:
+                    train_series.append((dates[:split], user_values[:split]))
+                    test_series.append((dates[split - 1], user_values[:split], user_values[split:]))
+            
+            freq = infer_frequency(train_series[0][0])
+            global_model = fit_global_model(train_series, freq=freq)
+            
+            # Direct forecasts of each test segment (up to the trained horizon), one predict call
+            horizon = min(global_model.max_horizon, min(len(actual) for _, _, actual in test_series))
+            predictions, lower, upper = global_model.forecast_interval(
+                np.array([last for last, _, _ in test_series]),
+                [history for _, history, _ in test_series],
+                horizon,
+                freq
+            )
+            actual = np.stack([actual[:horizon] for _, _, actual in test_series])
+            rmse = np.sqrt(mean_squared_error(actual.ravel(), predictions.ravel()))
+            # Share of test values inside the calibrated 95% interval
+            coverage = float(np.mean((lower <= actual) & (actual <= upper))) if lower is not None else None
+            
+            joblib.dump(global_model, self.model_dir / "income_global.pkl")
+            self.trained_models['income_global'] = {
+                'rmse': rmse,
+                'interval_coverage': coverage,
+                'series': len(train_series),
+                'horizon': horizon,
+                'features': global_model.columns
+            }
+            logger.info(f"  ✓ Global model trained on {len(train_series)} series - RMSE: {rmse:.2f}")
+            
+        except Exception as e:
+            logger.error(f"  ✗ Global model training failed: {e}")
     
     async def train_health_models(self, data: pd.DataFrame):
         """Train health prediction models"""
@@ -558,6 +616,7 @@ class RealDataModelTrainer:
             accuracy = accuracy_score(y_test, classifier.predict(X_test_scaled))
             
             joblib.dump(classifier, self.model_dir / "health_stress_classifier.pkl")
+            self._save_tree_model(classifier, "health_stress_classifier")
             joblib.dump(scaler, self.model_dir / "health_stress_scaler.pkl")
             
             self.trained_models['health_stress_classifier'] = {'accuracy': accuracy}
@@ -592,6 +651,7 @@ class RealDataModelTrainer:
             r2 = r2_score(y_test, predictions)
             
             joblib.dump(predictor, self.model_dir / "health_risk_predictor.pkl")
+            self._save_tree_model(predictor, "health_risk_predictor")
             joblib.dump(scaler, self.model_dir / "health_risk_scaler.pkl")
             
             self.trained_models['health_risk_predictor'] = {'rmse': rmse, 'r2': r2}
@@ -649,6 +709,7 @@ class RealDataModelTrainer:
             
             # Save model, scaler and feature metadata
             joblib.dump(model, self.model_dir / "income_demographic_classifier.pkl")
+            self._save_tree_model(model, "income_demographic_classifier")
             joblib.dump(scaler, self.model_dir / "income_demographic_scaler.pkl")
             joblib.dump(feature_names, self.model_dir / "income_demographic_features.pkl")
             
@@ -661,26 +722,23 @@ class RealDataModelTrainer:
         except Exception as e:
             logger.error(f"  ✗ Demographic Classifier training failed: {e}")
 
+    def _save_tree_model(self, model: Any, name: str):
+        """
+        Flat tree artifact next to the pickle (src/engines/tree_runtime.py). The model
+        store prefers it over the pickle, so a stale one is removed if saving fails.
+        """
+        try:
+            save_tree_model(model, self.model_dir / name)
+        except Exception as e:
+            logger.error(f"  ✗ Tree artifact for {name} not saved ({e}), removing the stale one")
+            for path in artifact_paths(self.model_dir / name):
+                path.unlink(missing_ok=True)
+    
     def _auto_arima(self, values, max_p=3, max_d=2, max_q=3):
-        """Automatic ARIMA order selection"""
-        best_aic = float('inf')
-        best_model = None
-        best_order = (1, 1, 1)
-        
-        for p in range(max_p):
-            for d in range(max_d):
-                for q in range(max_q):
-                    try:
-                        model = ARIMA(values, order=(p, d, q))
-                        fitted = model.fit()
-                        if fitted.aic < best_aic:
-                            best_aic = fitted.aic
-                            best_model = fitted
-                            best_order = (p, d, q)
-                    except:
-                        continue
-        
-        return best_model, best_order
+        """Automatic ARIMA order selection (stepwise search, see src/engines/order_selection.py)"""
+        selection = select_arima_order(values, max_p, max_d, max_q, n_jobs=ORDER_SEARCH_JOBS)
+        self.order_search = selection
+        return selection.model, selection.order
     
     def evaluate_models(self, income_data, health_data):
         """Generate evaluation report"""
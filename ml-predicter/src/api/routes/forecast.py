@@ -1,20 +1,64 @@
 from fastapi import APIRouter, HTTPException, Request
 from typing import Dict, Any, List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError, model_validator
 from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
 import json
 import logging
 
+from src.config.settings import settings
+from src.utils.fitting_service import FittingQueueFullError
+from src.utils.forecast_cache import ForecastCache
+from src.utils.forecast_precompute import find_precomputed
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/forecast", tags=["forecast"])
 
 class ForecastRequest(BaseModel):
     user_id: str  # Required for DB tracking
-    timeseries: List[Dict[str, Any]]
+    # Either a list of {"date", "value"} points or the columnar dates/values form
+    timeseries: Optional[List[Dict[str, Any]]] = None
+    dates: Optional[List[str]] = None
+    values: Optional[List[Optional[float]]] = None
     periods_ahead: int = 6
     confidence: float = 0.95
 
+    @model_validator(mode="after")
+    def check_series(self):
+        columnar = self.dates is not None or self.values is not None
+        if (self.timeseries is not None) == columnar:
+            raise ValueError("Provide either timeseries or dates and values")
+        if columnar and (self.dates is None or self.values is None or len(self.dates) != len(self.values)):
+            raise ValueError("dates and values must both be given with the same length")
+        return self
+
+class BatchSeries(BaseModel):
+    user_id: str
+    dates: List[str]
+    values: List[Optional[float]]
+
+class BatchForecastRequest(BaseModel):
+    series: List[BatchSeries]
+    periods_ahead: int = 6
+
+class ObservationUpdateRequest(BaseModel):
+    user_id: str
+    date: str
+    value: Optional[float] = None
+    # History before `date`; required when no filter state is stored for the user
+    dates: Optional[List[str]] = None
+    values: Optional[List[Optional[float]]] = None
+    periods_ahead: int = 6
+
+    @model_validator(mode="after")
+    def check_history(self):
+        if (self.dates is None) != (self.values is None):
+            raise ValueError("dates and values must be given together")
+        if self.dates is not None and len(self.dates) != len(self.values):
+            raise ValueError("dates and values must have the same length")
+        return self
+
 class ForecastResponse(BaseModel):
     prediction_id: Optional[str] = None
     model: str
@@ -23,6 +67,8 @@ class ForecastResponse(BaseModel):
     ci_upper: List[float]
     trend: str = "stable"
     recommendations: List[str] = []
+    # Resampling/window policy applied before fitting (see src/engines/windowing.py)
+    preprocessing: Optional[Dict[str, Any]] = None
 
 @router.post("/income")
 async def forecast_income(request: Request, body: ForecastRequest) -> ForecastResponse:
@@ -32,20 +78,53 @@ async def forecast_income(request: Request, body: ForecastRequest) -> ForecastRe
     from src.engines.forecast_engine import IncomeForecastEngine
     
     try:
-        engine = IncomeForecastEngine()
+        engine = getattr(request.app.state, "forecast_engine", None) or IncomeForecastEngine()
         
         # Prepare data
-        df = engine.prepare_data(body.timeseries)
+        df = engine.prepare_data(body.timeseries, dates=body.dates, values=body.values)
+        
+        # Identical series + models + config -> cached full-horizon forecast, sliced to the request
+        forecast_cache = getattr(request.app.state, "forecast_cache", None)
+        db = getattr(request.app.state, "db", None)
+        horizon = body.periods_ahead
+        full_result = None
+        cache_key = ForecastCache.make_key(df.index.values, df["value"].values, engine.fingerprint())
+        if forecast_cache is not None:
+            horizon = max(body.periods_ahead, settings.FORECAST_MAX_HORIZON)
+            full_result = await forecast_cache.get(cache_key, body.periods_ahead)
+        
+        if full_result is None and db is not None and db.engine is not None:
+            # Row written by the nightly precompute job for this exact input
+            try:
+                found = await find_precomputed(db, body.user_id, cache_key)
+            except Exception as lookup_err:
+                logger.warning(f"Precomputed forecast lookup failed: {lookup_err}")
+                found = None
+            if found is not None and found[2] >= body.periods_ahead:
+                precomputed_id, full_result, stored_horizon = found
+                full_result = {**full_result, "prediction_id": precomputed_id}
+                if forecast_cache is not None:
+                    await forecast_cache.set(cache_key, full_result, stored_horizon, settings.PRECOMPUTE_TTL_SECONDS)
+        
+        if full_result is None:
+            # Forecast (in a worker thread: on-the-fly fits block until the process pool returns)
+            full_result = await run_in_threadpool(
+                engine.ensemble_forecast, df, periods=horizon
+            )
+            # Results missing sub-models that hit the latency budget are not cached
+            if forecast_cache is not None and not full_result.get("dropped_sub_models"):
+                await forecast_cache.set(cache_key, full_result, horizon)
         
-        # Forecast
-        forecast_result = engine.ensemble_forecast(df, periods=body.periods_ahead)
+        forecast_result = engine.slice_forecast(full_result, body.periods_ahead)
         
         # Generate recommendations
-        recommendations = engine.generate_recommendations(forecast_result)
+        recommendations = engine.generate_recommendations(
+            forecast_result, seasonality=engine.detect_seasonality(df)
+        )
         
-        # Save to Database (Optimization for "train and improve")
-        prediction_id = None
-        if hasattr(request.app.state, 'db') and hasattr(request.app.state, 'model_registry'):
+        # Save to Database (Optimization for "train and improve"); precomputed results already have a row
+        prediction_id = full_result.get("prediction_id")
+        if prediction_id is None and hasattr(request.app.state, 'db') and hasattr(request.app.state, 'model_registry'):
             db = request.app.state.db
             model_registry = request.app.state.model_registry
             
@@ -90,9 +169,143 @@ async def forecast_income(request: Request, body: ForecastRequest) -> ForecastRe
             ci_lower=forecast_result['ci_lower'],
             ci_upper=forecast_result['ci_upper'],
             trend=forecast_result['trend'],
-            recommendations=recommendations
+            recommendations=recommendations,
+            preprocessing=forecast_result.get('preprocessing')
         )
     
+    except FittingQueueFullError as e:
+        logger.warning(f"Forecast rejected: {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    
     except Exception as e:
         logger.error(f"Forecast error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/income/update")
+async def update_income_forecast(request: Request, body: ObservationUpdateRequest) -> Dict[str, Any]:
+    """
+    Append one observation to a user's income series and return the updated forecast.
+    
+    The user's filter state (Kalman state and covariance per model, Holt-Winters
+    states) is kept in Redis and advanced by one step, so each new point costs the
+    same regardless of history length. The first call, or any call answered with
+    409, must include the history in `dates`/`values`; sending it always resets the state.
+    
+    Concurrent updates for the same user are applied one after the other (compare-and-set
+    on the stored state). Steps are at the series' own frequency (`freq`, with the
+    step dates in `forecast_dates`): unlike /income, the history is not resampled.
+    """
+    from src.engines.forecast_engine import IncomeForecastEngine
+    from src.engines.streaming import StreamingForecaster
+    from src.utils.stream_state import StreamStateConflictError, StreamStateStore
+    import numpy as np
+    
+    engine = getattr(request.app.state, "forecast_engine", None) or IncomeForecastEngine()
+    streaming = getattr(request.app.state, "streaming_forecaster", None) or StreamingForecaster(engine)
+    store = getattr(request.app.state, "stream_state", None) or StreamStateStore(None)
+    initialized = False
+    
+    async def advance(state):
+        nonlocal initialized
+        if body.dates is not None or (state is not None and not streaming.is_current(state)):
+            # Reset, or written by other model versions or ensemble config
+            state = None
+        initialized = state is None
+        if initialized:
+            if body.dates is None:
+                raise HTTPException(
+                    status_code=409,
+                    detail="No forecast state for this user; resend the history in dates and values"
+                )
+            dates = np.array(body.dates, dtype="datetime64[D]")
+            values = np.array([np.nan if v is None else v for v in body.values], dtype=np.float64)
+            state = await run_in_threadpool(streaming.init_state, dates, values)
+        return streaming.update(state, body.date, body.value)
+    
+    try:
+        state = await store.update(body.user_id, advance)
+        forecast_result = streaming.forecast(state, body.periods_ahead)
+    
+    except HTTPException:
+        raise
+    except StreamStateConflictError as e:
+        raise HTTPException(status_code=409, detail=f"{e}; retry the update")
+    except Exception as e:
+        logger.error(f"Forecast update error: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "user_id": body.user_id,
+        "last_date": state.last_date,
+        "n_obs": state.n_obs,
+        "initialized": initialized,
+        "stateful": store.available,
+        **forecast_result
+    }
+
+
+def _parse_ndjson(raw: bytes) -> List[BatchSeries]:
+    """One BatchSeries object per line; blank lines are ignored"""
+    series = []
+    for line_no, line in enumerate(raw.decode("utf-8").splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            series.append(BatchSeries(**json.loads(line)))
+        except (ValueError, TypeError, ValidationError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid series on line {line_no}: {e}")
+    return series
+
+@router.post("/income/batch")
+async def forecast_income_batch(request: Request, periods_ahead: int = 6) -> Dict[str, Any]:
+    """
+    Forecast income for many users in one call.
+    
+    Accepts either a JSON body with columnar series
+    ({"series": [{"user_id", "dates": [...], "values": [...]}], "periods_ahead"})
+    or NDJSON (Content-Type: application/x-ndjson), one series per line with
+    `periods_ahead` as a query parameter. Results are not written to the database.
+    """
+    from src.engines.forecast_engine import IncomeForecastEngine
+    import numpy as np
+    
+    if "ndjson" in request.headers.get("content-type", ""):
+        series = _parse_ndjson(await request.body())
+    else:
+        try:
+            body = BatchForecastRequest(**(await request.json()))
+        except (ValueError, ValidationError) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        series, periods_ahead = body.series, body.periods_ahead
+    
+    if len(series) > settings.BATCH_MAX_SERIES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(series)} series exceeds the limit of {settings.BATCH_MAX_SERIES}"
+        )
+    
+    try:
+        engine = getattr(request.app.state, "forecast_engine", None) or IncomeForecastEngine()
+        
+        arrays = [
+            (
+                np.array(s.dates, dtype="datetime64[D]"),
+                np.array([np.nan if v is None else v for v in s.values], dtype=np.float64)
+            )
+            for s in series
+        ]
+        results = await run_in_threadpool(engine.batch_forecast, arrays, periods_ahead)
+    
+    except FittingQueueFullError as e:
+        logger.warning(f"Batch forecast rejected: {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    
+    except Exception as e:
+        logger.error(f"Batch forecast error: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "periods_ahead": periods_ahead,
+        "results": [{"user_id": s.user_id, **result} for s, result in zip(series, results)]
+    }
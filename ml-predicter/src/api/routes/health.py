@@ -1,6 +1,9 @@
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any, List
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Request
+from typing import Dict, Any, List, Optional
+from pydantic import BaseModel, model_validator
+from starlette.concurrency import run_in_threadpool
+
+from src.config.settings import settings
 
 router = APIRouter(prefix="/health", tags=["health"])
 
@@ -10,11 +13,26 @@ class HealthRiskRequest(BaseModel):
 class HealthRiskResponse(BaseModel):
     identified_risks: List[Dict[str, Any]]
     risk_count: int
+    # Risk predictor output for the latest metrics: {"score", "lower", "upper"}
+    predicted_stress: Optional[Dict[str, float]] = None
+    # Stress classifier output for the latest metrics: {"risk_level", "probabilities"}
+    predicted_risk_level: Optional[Dict[str, Any]] = None
     trends: Dict[str, float]
     recommendations: List[str]
 
+class StressScoreBatchRequest(BaseModel):
+    # Columnar metrics: {"work_hours": [...], "sleep_hours": [...], ...}; null means missing
+    metrics: Dict[str, List[Optional[float]]]
+
+    @model_validator(mode="after")
+    def check_columns(self):
+        lengths = {len(column) for column in self.metrics.values()}
+        if len(lengths) > 1:
+            raise ValueError("All metric columns must have the same length")
+        return self
+
 @router.post("/predict-risk")
-async def predict_health_risk(request: HealthRiskRequest) -> HealthRiskResponse:
+async def predict_health_risk(request: Request, body: HealthRiskRequest) -> HealthRiskResponse:
     """
     Predict health and stress risk for next 30 days
     
@@ -31,10 +49,58 @@ async def predict_health_risk(request: HealthRiskRequest) -> HealthRiskResponse:
     from src.engines.health_engine import HealthPredictionEngine
     
     try:
-        predictor = HealthPredictionEngine()
-        predictions = predictor.predict_health_risks(request.metrics_history)
+        predictor = getattr(request.app.state, "health_engine", None) or HealthPredictionEngine()
+        # In a worker thread: concurrent requests meet in the engine's micro-batchers
+        predictions = await run_in_threadpool(predictor.predict_health_risks, body.metrics_history)
         
         return HealthRiskResponse(**predictions)
     
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/stress-score/batch")
+async def stress_score_batch(request: Request, body: StressScoreBatchRequest) -> Dict[str, Any]:
+    """
+    Stress scores for many rows (e.g. a year of days for many users) in one call.
+    
+    Input and output are columnar: one list per metric in, one list per score
+    component out, in row order. Metrics not given take their defaults.
+    
+    Example:
+    ```json
+    {"metrics": {"work_hours": [8, 10], "sleep_hours": [7, 5.5], "mood_score": [6, null]}}
+    ```
+    """
+    from src.engines.health_engine import HealthPredictionEngine, STRESS_METRIC_DEFAULTS
+    import numpy as np
+    
+    unknown = [name for name in body.metrics if name not in STRESS_METRIC_DEFAULTS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown metrics: {', '.join(unknown)}")
+    
+    n_rows = len(next(iter(body.metrics.values()), []))
+    if n_rows > settings.HEALTH_BATCH_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {n_rows} rows exceeds the limit of {settings.HEALTH_BATCH_MAX_ROWS}"
+        )
+    
+    columns = list(body.metrics)
+    
+    def score(engine: HealthPredictionEngine) -> Dict[str, Any]:
+        # Conversion and scoring run in a worker thread, off the event loop (None -> NaN)
+        values = np.array([body.metrics[name] for name in columns], dtype=float).reshape(len(columns), n_rows).T
+        scores = engine.calculate_stress_scores(values, columns)
+        return {
+            "rows": n_rows,
+            "overall_score": np.round(scores["overall_score"], 2).tolist(),
+            "risk_level": scores["risk_level"].tolist(),
+            "components": {name: np.round(v, 2).tolist() for name, v in scores["components"].items()},
+        }
+    
+    try:
+        engine = getattr(request.app.state, "health_engine", None) or HealthPredictionEngine()
+        return await run_in_threadpool(score, engine)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -27,6 +27,47 @@ class Settings(BaseSettings):
     # ML Models
     MODEL_PATH: str = "./models"
     MODEL_CACHE_SIZE: int = 500
+    # Serve sklearn tree ensembles through the flattened NumPy runtime
+    TREE_RUNTIME: bool = True
+
+    # On-the-fly model fitting (process pool)
+    FIT_POOL_WORKERS: int = 2
+    FIT_QUEUE_DEPTH: int = 8
+    FIT_TIMEOUT_SECONDS: float = 15.0
+
+    # Ensemble
+    ENSEMBLE_CONCURRENT: bool = True
+    ENSEMBLE_LATENCY_BUDGET_MS: float = 2000.0
+    ENSEMBLE_MODELS: List[str] = ["arima", "sarima", "rf", "exponential_smoothing", "global"]
+
+    # Forecast cache (always computed at the max horizon, sliced per request)
+    FORECAST_MAX_HORIZON: int = 24
+    FORECAST_CACHE_ENTRIES: int = 1000
+
+    # Resampling and history window before fitting (src/engines/windowing.py);
+    # FORECAST_TARGET_FREQ is "auto" (coarsest of M/W/D with enough points) or a fixed D/W/M
+    FORECAST_WINDOWING: bool = True
+    FORECAST_TARGET_FREQ: str = "auto"
+    FORECAST_RESAMPLE_AGG: str = "mean"
+
+    # Incremental forecast updates (per-user filter state in Redis)
+    STREAM_STATE_TTL: int = 2592000
+
+    # Health model micro-batching (rows per batch, max wait); 0 rows calls the models directly
+    HEALTH_BATCH_ROWS: int = 256
+    HEALTH_BATCH_WAIT_MS: float = 2.0
+    # Row limit of /health/stress-score/batch
+    HEALTH_BATCH_MAX_ROWS: int = 500000
+
+    # Batch forecasting
+    BATCH_MAX_SERIES: int = 5000
+
+    # Nightly forecast precomputation (scripts/precompute_forecasts.py or in-app scheduler)
+    PRECOMPUTE_SCHEDULE: bool = False
+    PRECOMPUTE_HOUR_UTC: int = 2
+    PRECOMPUTE_PAGE_SIZE: int = 1000
+    PRECOMPUTE_ACTIVE_DAYS: int = 90
+    PRECOMPUTE_TTL_SECONDS: int = 129600
 
     # API Keys
     OPENAI_API_KEY: str = ""
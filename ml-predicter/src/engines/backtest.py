@@ -0,0 +1,376 @@
+"""
+Rolling-origin backtesting for the income ensemble
+
+Every series is cut at a sequence of forecast origins. At each origin every
+sub-model forecasts the next `horizon` observations from the data before it, and
+absolute, squared and percentage errors are accumulated per model and horizon step.
+Series first go through the engine's window policy (resampling and truncation,
+src/engines/windowing.py), so the sub-models are scored on what the route fits.
+Series of equal length are then evaluated together as one matrix, the way
+batch_forecast serves them:
+
+- pretrained ARIMA/SARIMA: the Kalman state is carried from one origin to the next
+  (one filter step per new observation) instead of refiltering the whole prefix
+- ARIMA without a pretrained model: the NumPy ARIMA(1,1,1) kernel per series
+- SARIMA without a pretrained model: the on-the-fly statsmodels fit per series,
+  as forecast_sarima serves it (slow; a failed fit scores as missing)
+- random forest: calendar features of the dates after each origin
+- exponential smoothing: one batched Holt-Winters fit per origin
+- global panel model: one predict call per origin
+
+Groups are split into chunks that run on the fitting service process pool. Inverse-MSE
+sub-model weights derived from the scores are saved for the engine's ensemble, but
+only from a backtest on real series: weights fitted to synthetic data say nothing
+about the served models.
+"""
+
+import json
+import logging
+import time
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.engines.forecast_engine import (
+    SARIMA_MAX_SEASON,
+    IncomeForecastEngine,
+    fit_arima111,
+    forecast_arima111,
+    get_worker_engine,
+)
+from src.engines.smoothing import fit_holt_winters_batch, season_period_for_frequency
+from src.engines.windowing import apply_window_policy
+from src.utils.fitting_service import FittingQueueFullError, FittingService, fit_sarima_forecast
+
+logger = logging.getLogger(__name__)
+
+WEIGHTS_VERSION = 1
+# Series per process-pool job
+CHUNK_SIZE = 64
+ENSEMBLE = "ensemble"
+SYNTHETIC_SOURCE = "synthetic"
+
+
+@dataclass
+class BacktestConfig:
+    """Forecast origins: every `step` observations from `min_train` until `horizon` before the end"""
+    horizon: int = 6
+    min_train: int = 24
+    step: int = 1
+    max_origins: Optional[int] = None  # keep only the latest origins
+    source: str = SYNTHETIC_SOURCE  # where the series came from; recorded with the weights
+
+    def origins(self, n_obs: int) -> np.ndarray:
+        origins = np.arange(max(self.min_train, 3), n_obs - self.horizon + 1, self.step)
+        if self.max_origins is not None:
+            origins = origins[-self.max_origins:]
+        return origins
+
+
+@dataclass
+class ErrorAccumulator:
+    """Running error sums per horizon step; mergeable across series groups and workers"""
+    horizon: int
+    abs_error: np.ndarray = None
+    sq_error: np.ndarray = None
+    pct_error: np.ndarray = None
+    count: np.ndarray = None
+    pct_count: np.ndarray = None
+    seconds: float = 0.0
+
+    def __post_init__(self):
+        for name in ("abs_error", "sq_error", "pct_error", "count", "pct_count"):
+            if getattr(self, name) is None:
+                setattr(self, name, np.zeros(self.horizon))
+
+    def add(self, forecast: np.ndarray, actual: np.ndarray):
+        """Accumulate a (n_series, horizon) forecast against the realized values"""
+        error = np.asarray(forecast, dtype=np.float64) - actual
+        valid = np.isfinite(error)
+        error = np.where(valid, error, 0.0)
+        self.abs_error += np.abs(error).sum(axis=0)
+        self.sq_error += (error ** 2).sum(axis=0)
+        self.count += valid.sum(axis=0)
+
+        scaled = valid & (actual != 0)
+        self.pct_error += np.where(scaled, np.abs(error) / np.where(scaled, np.abs(actual), 1.0), 0.0).sum(axis=0)
+        self.pct_count += scaled.sum(axis=0)
+
+    def merge(self, other: "ErrorAccumulator") -> "ErrorAccumulator":
+        for name in ("abs_error", "sq_error", "pct_error", "count", "pct_count"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.seconds += other.seconds
+        return self
+
+    @property
+    def n_forecasts(self) -> int:
+        return int(self.count[0])
+
+    @property
+    def mse(self) -> float:
+        total = self.count.sum()
+        return float(self.sq_error.sum() / total) if total else float("nan")
+
+    def metrics(self) -> Dict[str, Any]:
+        total = self.count.sum()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rmse_by_step = np.sqrt(self.sq_error / self.count)
+        return {
+            "forecasts": self.n_forecasts,
+            "mae": float(self.abs_error.sum() / total) if total else float("nan"),
+            "rmse": float(np.sqrt(self.mse)),
+            "mape": float(100 * self.pct_error.sum() / self.pct_count.sum()) if self.pct_count.sum() else float("nan"),
+            "rmse_by_step": rmse_by_step.tolist(),
+            "seconds": self.seconds,
+            "ms_per_forecast": 1000 * self.seconds / self.n_forecasts if self.n_forecasts else float("nan"),
+        }
+
+
+@dataclass
+class BacktestResult:
+    """Per-model accumulated errors and run statistics"""
+    config: BacktestConfig
+    scores: Dict[str, ErrorAccumulator] = field(default_factory=dict)
+    n_series: int = 0
+    total_seconds: float = 0.0
+    windowing: Optional[Dict[str, Any]] = None
+
+    def merge(self, scores: Dict[str, ErrorAccumulator]):
+        for name, acc in scores.items():
+            if name in self.scores:
+                self.scores[name].merge(acc)
+            else:
+                self.scores[name] = acc
+
+    def ensemble_weights(self) -> Dict[str, float]:
+        """Inverse-MSE weights over the sub-models, normalized to sum to 1"""
+        inverse = {
+            name: 1.0 / acc.mse
+            for name, acc in self.scores.items()
+            if name != ENSEMBLE and acc.n_forecasts and np.isfinite(acc.mse) and acc.mse > 0
+        }
+        total = sum(inverse.values())
+        return {name: value / total for name, value in inverse.items()} if total else {}
+
+    def table(self) -> List[Dict[str, Any]]:
+        """One row per model: accuracy, latency and derived weight"""
+        weights = self.ensemble_weights()
+        return [
+            {"model": name, **acc.metrics(), "weight": weights.get(name)}
+            for name, acc in sorted(self.scores.items(), key=lambda item: item[1].mse)
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "config": asdict(self.config),
+            "windowing": self.windowing,
+            "n_series": self.n_series,
+            "total_seconds": self.total_seconds,
+            "models": self.table(),
+            "weights": self.ensemble_weights(),
+        }
+
+    def log_table(self):
+        logger.info(f"  {'Model':<24} {'Forecasts':>10} {'MAE':>12} {'RMSE':>12} {'MAPE %':>8} {'ms/fcst':>8} {'Weight':>7}")
+        for row in self.table():
+            weight = f"{row['weight']:.3f}" if row["weight"] is not None else "-"
+            logger.info(
+                f"  {row['model']:<24} {row['forecasts']:>10} {row['mae']:>12.2f} {row['rmse']:>12.2f} "
+                f"{row['mape']:>8.2f} {row['ms_per_forecast']:>8.3f} {weight:>7}"
+            )
+        logger.info(f"  {self.n_series} series in {self.total_seconds:.1f}s")
+
+    def save_weights(self, path) -> Path:
+        """Write the weights file the engine loads as `income_ensemble_weights`"""
+        if self.config.source == SYNTHETIC_SOURCE:
+            raise ValueError("Ensemble weights are only saved from a backtest on real series")
+        path = Path(path)
+        path.write_text(json.dumps({
+            "version": WEIGHTS_VERSION,
+            "created": datetime.now().isoformat(),
+            "weights": self.ensemble_weights(),
+            # Sub-models that were scored; the engine ignores weights that miss any of its own
+            "models": sorted(self.ensemble_weights()),
+            "backtest": self.to_dict(),
+        }, indent=2))
+        return path
+
+
+class RollingOriginBacktester:
+    """
+    Rolling-origin evaluation of an engine's ensemble sub-models. Pass a started
+    FittingService to spread series chunks over its process pool; without one
+    everything runs inline.
+    """
+
+    def __init__(
+        self,
+        engine: IncomeForecastEngine,
+        config: Optional[BacktestConfig] = None,
+        fitting_service: Optional[FittingService] = None,
+        chunk_size: int = CHUNK_SIZE,
+    ):
+        self.engine = engine
+        self.config = config or BacktestConfig()
+        self.fitting_service = fitting_service
+        self.chunk_size = chunk_size
+
+    def run(self, series: List[Tuple[np.ndarray, np.ndarray]]) -> BacktestResult:
+        """Backtest a list of (dates, values) series"""
+        start = time.perf_counter()
+        windowing = self.engine.windowing
+        result = BacktestResult(
+            config=self.config, n_series=len(series), windowing=asdict(windowing) if windowing else None
+        )
+
+        groups: Dict[int, List[Tuple[np.ndarray, np.ndarray]]] = {}
+        for dates, values in series:
+            dates, values = self.engine._normalize_series(dates, values)
+            if windowing is not None:
+                dates, values, _ = apply_window_policy(dates, values, windowing)
+            groups.setdefault(len(values), []).append((dates, values))
+
+        chunks = []
+        for members in groups.values():
+            dates = np.stack([d for d, _ in members])
+            values = np.stack([v for _, v in members])
+            for i in range(0, len(values), self.chunk_size):
+                chunks.append((dates[i:i + self.chunk_size], values[i:i + self.chunk_size]))
+
+        futures: Dict[int, Future] = {}
+        if self.fitting_service is not None and len(chunks) > 1:
+            for n, (dates, values) in enumerate(chunks):
+                try:
+                    futures[n] = self.fitting_service.submit(
+                        _backtest_group_worker, str(self.engine.model_dir), self.engine.ensemble_models,
+                        asdict(self.config), dates, values
+                    )
+                except FittingQueueFullError:
+                    break  # remaining chunks run inline
+
+        for n, (dates, values) in enumerate(chunks):
+            scores = futures[n].result() if n in futures else self.run_group(dates, values)
+            result.merge(scores)
+
+        result.total_seconds = time.perf_counter() - start
+        return result
+
+    def run_group(self, dates: np.ndarray, values: np.ndarray) -> Dict[str, ErrorAccumulator]:
+        """Backtest a (n_series, n_obs) matrix of equal-length series"""
+        engine, config = self.engine, self.config
+        horizon = config.horizon
+        origins = config.origins(values.shape[1])
+        if len(origins) == 0:
+            return {}
+
+        models = engine.ensemble_models
+        scores = {name: ErrorAccumulator(horizon) for name in (*models, ENSEMBLE)}
+        freq = engine._infer_frequency(dates[0])
+        season_period = season_period_for_frequency(freq)
+
+        # Kalman state per pretrained model, advanced origin by origin
+        states = {}
+        for name in ("arima", "sarima"):
+            system = engine._systems.get(name)
+            if name in models and system is not None:
+                a = np.repeat(system.initial_state[None, :], len(values), axis=0)
+                states[name] = [system, a, system.initial_state_cov.copy(), 0]
+
+        for origin in origins:
+            actual = values[:, origin:origin + horizon]
+            forecasts, elapsed = {}, {}
+
+            for name, state in states.items():
+                started = time.perf_counter()
+                system, a, P, t = state
+                for t in range(t, origin):
+                    a, P = system.step(a, P, values[:, t])
+                state[1:] = [a, P, origin]
+                forecasts[name] = system.forecast(a, P, horizon)[0]
+                elapsed[name] = time.perf_counter() - started
+
+            if "arima" in models and "arima" not in states:
+                started = time.perf_counter()
+                forecasts["arima"] = np.array([
+                    forecast_arima111(fit_arima111(row[:origin]), horizon)["forecast"] for row in values
+                ])
+                elapsed["arima"] = time.perf_counter() - started
+
+            if "sarima" in models and "sarima" not in states:
+                started = time.perf_counter()
+                forecasts["sarima"] = np.array([_fit_sarima(engine, row[:origin], horizon) for row in values])
+                elapsed["sarima"] = time.perf_counter() - started
+
+            if "rf" in models and "rf" in engine.models:
+                started = time.perf_counter()
+                X = engine.feature_builder.build_future(dates[:, origin - 1], horizon, freq)
+                predictions = engine.models["rf"].predict(engine.scalers["rf"].transform(X))
+                forecasts["rf"] = predictions.reshape(len(values), horizon)
+                elapsed["rf"] = time.perf_counter() - started
+
+            if "exponential_smoothing" in models:
+                started = time.perf_counter()
+                fit = fit_holt_winters_batch(values[:, :origin], season_period)
+                forecasts["exponential_smoothing"] = fit.forecast(horizon)[0]
+                elapsed["exponential_smoothing"] = time.perf_counter() - started
+
+            if "global" in models and "global" in engine.models:
+                started = time.perf_counter()
+                forecasts["global"] = engine.models["global"].forecast(dates[:, origin - 1], values[:, :origin], horizon, freq)
+                elapsed["global"] = time.perf_counter() - started
+
+            for name, forecast in forecasts.items():
+                scores[name].add(forecast, actual)
+                scores[name].seconds += elapsed[name]
+            if forecasts:
+                # The ensemble costs all of its members
+                scores[ENSEMBLE].add(engine.combine_forecasts(forecasts)[0], actual)
+                scores[ENSEMBLE].seconds += sum(elapsed.values())
+
+        return {name: acc for name, acc in scores.items() if acc.n_forecasts}
+
+
+def _fit_sarima(engine: IncomeForecastEngine, values: np.ndarray, horizon: int) -> np.ndarray:
+    """On-the-fly SARIMA forecast with the season forecast_sarima would use; NaN if the fit fails"""
+    season_period = engine.seasonality.analyze(values).season_period
+    if season_period > SARIMA_MAX_SEASON:
+        season_period = 12
+    try:
+        return np.asarray(fit_sarima_forecast(values, (1, 1, 1), (1, 1, 0, season_period), horizon)["forecast"])
+    except Exception as e:
+        logger.debug(f"SARIMA backtest fit failed: {e}")
+        return np.full(horizon, np.nan)
+
+
+def _backtest_group_worker(
+    model_dir: str,
+    ensemble_models: Tuple[str, ...],
+    config: Dict[str, Any],
+    dates: np.ndarray,
+    values: np.ndarray
+) -> Dict[str, ErrorAccumulator]:
+    """Process-pool entry point for RollingOriginBacktester.run"""
+    engine = get_worker_engine(model_dir, ensemble_models)
+    return RollingOriginBacktester(engine, BacktestConfig(**config)).run_group(dates, values)
+
+
+def run_backtest(
+    engine: IncomeForecastEngine,
+    series: List[Tuple[np.ndarray, np.ndarray]],
+    config: Optional[BacktestConfig] = None,
+    n_jobs: int = 1,
+) -> BacktestResult:
+    """Convenience wrapper for scripts; n_jobs > 1 uses a private process pool"""
+    if n_jobs <= 1:
+        return RollingOriginBacktester(engine, config).run(series)
+
+    # Chunks are submitted all at once, so the queue must hold them all
+    service = FittingService(max_workers=n_jobs, max_pending=1_000_000).start()
+    try:
+        return RollingOriginBacktester(engine, config, fitting_service=service).run(series)
+    finally:
+        service.shutdown()
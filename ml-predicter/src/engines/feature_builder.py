@@ -0,0 +1,228 @@
+"""
+Shared feature builder for training and serving
+
+Calendar and lag features are computed with integer arithmetic on datetime64
+arrays and returned as contiguous float64 matrices. The column layout is described
+by a versioned FeatureSpec that training saves next to the model and serving loads
+with it, so both sides always build the same columns in the same order.
+The demographic one-hot encoder is compiled once from the trained column names.
+"""
+
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+FEATURE_SPEC_VERSION = 1
+
+
+def _days(dates: np.ndarray) -> np.ndarray:
+    return np.asarray(dates).astype("datetime64[D]")
+
+
+def _month(days: np.ndarray) -> np.ndarray:
+    return days.astype("datetime64[M]").astype(np.int64) % 12 + 1
+
+
+CALENDAR_FEATURES: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    # 1970-01-01 was a Thursday; Monday = 0 as in pandas
+    "dayofweek": lambda d: (d.astype(np.int64) + 3) % 7,
+    "dayofmonth": lambda d: (d - d.astype("datetime64[M]")).astype(np.int64) + 1,
+    "dayofyear": lambda d: (d - d.astype("datetime64[Y]")).astype(np.int64) + 1,
+    "month": _month,
+    "quarter": lambda d: (_month(d) - 1) // 3 + 1,
+    "year": lambda d: d.astype("datetime64[Y]").astype(np.int64) + 1970,
+}
+
+
+# Days per step for the frequency codes of infer_frequency
+STEP_DAYS = {"D": 1, "W": 7, "M": 30}
+
+
+def infer_frequency(dates: np.ndarray) -> str:
+    """Frequency code (D/W/M or irregular) from the median spacing of sorted dates"""
+    step = np.median(np.diff(_days(dates)).astype(np.int64))
+    if step <= 1:
+        return "D"
+    if 6 <= step <= 8:
+        return "W"
+    if 28 <= step <= 31:
+        return "M"
+    return "irregular"
+
+
+def future_dates(last_dates: np.ndarray, periods: int, freq: Optional[str]) -> np.ndarray:
+    """(len(last_dates), periods) datetime64[D] of the next periods; months step by calendar month"""
+    last = _days(last_dates).reshape(-1, 1)
+    steps = np.arange(1, periods + 1)
+    if freq == "M":
+        # Same day of month, clipped to the month end
+        months = last.astype("datetime64[M]") + steps
+        offset = last - last.astype("datetime64[M]")
+        return np.minimum(months.astype("datetime64[D]") + offset, (months + 1).astype("datetime64[D]") - 1)
+    return last + steps * STEP_DAYS.get(freq or "", 1)
+
+
+@dataclass
+class FeatureSpec:
+    """Ordered feature columns: calendar features first, then lags of the target"""
+    calendar: Tuple[str, ...] = ("dayofweek", "month", "quarter")
+    lags: Tuple[int, ...] = ()
+    version: int = FEATURE_SPEC_VERSION
+
+    def __post_init__(self):
+        self.calendar = tuple(self.calendar)
+        self.lags = tuple(int(lag) for lag in self.lags)
+        unknown = [name for name in self.calendar if name not in CALENDAR_FEATURES]
+        if unknown:
+            raise ValueError(f"Unknown calendar features: {', '.join(unknown)}")
+        if any(lag < 1 for lag in self.lags):
+            raise ValueError("Lags must be positive")
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.calendar) + [f"lag_{lag}" for lag in self.lags]
+
+    @property
+    def max_lag(self) -> int:
+        return max(self.lags, default=0)
+
+    def to_dict(self) -> Dict:
+        return {**asdict(self), "columns": self.columns}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "FeatureSpec":
+        if data.get("version") != FEATURE_SPEC_VERSION:
+            raise ValueError(f"Unsupported feature spec version: {data.get('version')}")
+        return cls(calendar=data["calendar"], lags=data.get("lags", ()), version=data["version"])
+
+    def save(self, path) -> Path:
+        path = Path(path)
+        path.write_text(json.dumps(self.to_dict(), indent=2))
+        return path
+
+    @classmethod
+    def load(cls, path) -> "FeatureSpec":
+        return cls.from_dict(json.loads(Path(path).read_text()))
+
+
+def calendar_features(dates: np.ndarray, names: Sequence[str]) -> np.ndarray:
+    """(n, len(names)) float64 matrix of calendar features for a datetime64 array"""
+    days = _days(dates).ravel()
+    X = np.empty((len(days), len(names)), dtype=np.float64)
+    for j, name in enumerate(names):
+        X[:, j] = CALENDAR_FEATURES[name](days)
+    return X
+
+
+def lag_features(values: np.ndarray, lags: Sequence[int]) -> np.ndarray:
+    """
+    Lagged copies of the last axis of `values`, stacked as columns.
+    For (n,) input returns (n, L); for (n_series, n) input returns (n_series, n, L).
+    Positions without enough history are NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape + (len(lags),), np.nan)
+    for j, lag in enumerate(lags):
+        if lag < values.shape[-1]:
+            out[..., lag:, j] = values[..., :-lag]
+    return out
+
+
+class FeatureBuilder:
+    """Builds model inputs according to a FeatureSpec"""
+
+    def __init__(self, spec: Optional[FeatureSpec] = None):
+        self.spec = spec or FeatureSpec()
+
+    @property
+    def n_features(self) -> int:
+        return len(self.spec.columns)
+
+    def build(self, dates: np.ndarray, values: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Feature matrix for observations at `dates` (values are needed for lag features).
+        Rows whose lags reach before the start of the series contain NaN.
+        """
+        X = calendar_features(dates, self.spec.calendar)
+        if self.spec.lags:
+            if values is None:
+                raise ValueError("Lag features need the target values")
+            X = np.hstack([X, lag_features(values, self.spec.lags)])
+        return np.ascontiguousarray(X)
+
+    def build_future(self, last_dates: np.ndarray, periods: int, freq: Optional[str] = None) -> np.ndarray:
+        """
+        Calendar features for `periods` steps of `freq` (daily by default) after each
+        of `last_dates`, shape (len(last_dates) * periods, n_calendar); rows are series-major.
+        """
+        if self.spec.lags:
+            raise ValueError("Future features with lags need a recursive forecast")
+        return calendar_features(future_dates(last_dates, periods, freq), self.spec.calendar)
+
+
+# Numeric demographic inputs and the defaults used when a profile omits them
+DEMOGRAPHIC_NUMERIC_DEFAULTS: Dict[str, float] = {
+    "age": 30,
+    "capital_gain": 0,
+    "capital_loss": 0,
+    "hours_per_week": 40,
+}
+
+
+class DemographicEncoder:
+    """
+    One-hot encoder compiled from the trained demographic feature names.
+
+    Training one-hot encodes categoricals as "<field>_<value>" columns. Every split of
+    each column name at an underscore is registered as a (field, value) key, so a
+    profile item matches exactly the columns whose name equals f"{field}_{value}".
+    """
+
+    def __init__(self, feature_names: Sequence[str], numeric_defaults: Optional[Dict[str, float]] = None):
+        self.feature_names = list(feature_names)
+        numeric_defaults = DEMOGRAPHIC_NUMERIC_DEFAULTS if numeric_defaults is None else numeric_defaults
+
+        index = {name: i for i, name in enumerate(self.feature_names)}
+        self.numeric: List[Tuple[str, int]] = [(name, index[name]) for name in numeric_defaults if name in index]
+
+        # Row template: numeric defaults, every one-hot column off
+        self._template = np.zeros(len(self.feature_names), dtype=np.float64)
+        for name, i in self.numeric:
+            self._template[i] = numeric_defaults[name]
+
+        numeric_names = {name for name, _ in self.numeric}
+        self.categorical: Dict[Tuple[str, str], List[int]] = {}
+        for name, i in index.items():
+            if name in numeric_names:
+                continue
+            for pos, char in enumerate(name):
+                if char == "_":
+                    self.categorical.setdefault((name[:pos], name[pos + 1:]), []).append(i)
+
+    @property
+    def n_features(self) -> int:
+        return len(self.feature_names)
+
+    def encode(self, profile: Dict[str, Any], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Fill `out` (or a new vector) with the encoded profile"""
+        if out is None:
+            out = np.empty(self.n_features, dtype=np.float64)
+        out[:] = self._template
+        for name, i in self.numeric:
+            if name in profile:
+                out[i] = profile[name]
+        for key, value in profile.items():
+            columns = self.categorical.get((key, f"{value}"))
+            if columns:
+                out[columns] = 1.0
+        return out
+
+    def encode_batch(self, profiles: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """(len(profiles), n_features) matrix, one encoded row per profile"""
+        X = np.empty((len(profiles), self.n_features), dtype=np.float64)
+        for row, profile in zip(X, profiles):
+            self.encode(profile, out=row)
+        return X
@@ -9,77 +9,384 @@ import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Tuple, Optional
 import logging
-import joblib
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import asdict
 from pathlib import Path
 
+from src.engines.feature_builder import STEP_DAYS, DemographicEncoder, FeatureBuilder, FeatureSpec, infer_frequency
+from src.engines.seasonality import SeasonalityAnalyzer
+from src.engines.smoothing import fit_holt_winters_batch, season_period_for_frequency
+from src.engines.state_space import Z_95, StateSpaceSystem, forecast_intervals
+from src.engines.tree_runtime import forest_intervals
+from src.engines.windowing import WindowingConfig, WindowPolicy, apply_window_policy
+from src.utils.fitting_service import (
+    FittingQueueFullError,
+    FittingService,
+    fit_arima_forecast,
+    fit_sarima_forecast,
+)
+from src.utils.model_store import ModelStore
+from src.utils.ts_artifacts import CompactTimeSeriesModel
+
 logger = logging.getLogger(__name__)
 
+INCOME_ARTIFACTS = (
+    "income_arima_compact",
+    "income_sarima_compact",
+    "income_arima",
+    "income_sarima",
+    "income_rf_trees",
+    "income_rf",
+    "income_scaler",
+    "income_rf_features",
+    "income_demographic_classifier_trees",
+    "income_demographic_classifier",
+    "income_demographic_scaler",
+    "income_demographic_features",
+    "income_global",
+    "income_ensemble_weights",
+)
+
+# Threads used to dispatch ensemble sub-models in concurrent mode
+ENSEMBLE_THREADS = 8
+
+# Longest detected season the SARIMA fallback will use (longer ones fall back to 12)
+SARIMA_MAX_SEASON = 52
+
+# Sub-models available to ensemble_forecast, in combination order
+ENSEMBLE_MODELS = ("arima", "sarima", "rf", "exponential_smoothing", "global")
+
+# NumPy ARIMA(1,1,1) kernel: grid resolution and zoom rounds of the likelihood search
+ARIMA_KERNEL_GRID = 15
+ARIMA_KERNEL_ROUNDS = 8
+ARIMA_KERNEL_BOUND = 0.999
+# Longest series the kernel fits inline: its cost is linear in n (~0.13 ms/obs) and
+# statsmodels, run in the fitting pool, is faster from roughly 500 observations on
+ARIMA_KERNEL_MAX_OBS = 500
+
+
+def _arma11_innovations(x: np.ndarray, phi: np.ndarray, theta: np.ndarray):
+    """
+    Innovations algorithm for a zero-mean ARMA(1,1), vectorized over parameter candidates.
+
+    Returns (S, sum_log_r, x_hat_next, r_last): the weighted sum of squared innovations,
+    the sum of log relative innovation variances, the one-step prediction for the
+    next period and its relative variance r_n (all with unit innovation variance).
+    """
+    # Stationary variance of x_1 relative to sigma^2
+    r = (1 + 2 * theta * phi + theta ** 2) / (1 - phi ** 2)
+    theta2 = theta ** 2
+    x_hat = np.zeros_like(phi)
+    S = np.zeros_like(phi)
+    # r_t >= 1 and bounded, so the product is safe and saves a log per step
+    prod_r = np.ones_like(phi)
+    
+    for x_t in x.tolist():
+        inv_r = 1 / r
+        v = x_t - x_hat
+        S += v * v * inv_r
+        prod_r *= r
+        x_hat = phi * x_t + theta * inv_r * v
+        r = 1 + theta2 - theta2 * inv_r
+    
+    sum_log_r = np.log(prod_r)
+    return S, sum_log_r, x_hat, r
+
+
+def fit_arima111(values: np.ndarray) -> Dict[str, Any]:
+    """
+    Exact maximum likelihood ARIMA(1,1,1) without constant, in NumPy.
+
+    The innovation variance is concentrated out and the (phi, theta) likelihood is
+    maximized by a vectorized grid search that zooms in around the best point.
+    Parameters are restricted to the stationary/invertible region, like statsmodels.
+    """
+    y = np.asarray(values, dtype=np.float64)
+    x = np.diff(y)
+    m = len(x)
+    if m < 2 or np.isnan(x).any():
+        raise ValueError("ARIMA kernel needs at least 3 observations without missing values")
+    
+    center = np.zeros(2)
+    half_width = ARIMA_KERNEL_BOUND
+    offsets = np.linspace(-1, 1, ARIMA_KERNEL_GRID)
+    
+    for _ in range(ARIMA_KERNEL_ROUNDS):
+        axis_phi = np.clip(center[0] + half_width * offsets, -ARIMA_KERNEL_BOUND, ARIMA_KERNEL_BOUND)
+        axis_theta = np.clip(center[1] + half_width * offsets, -ARIMA_KERNEL_BOUND, ARIMA_KERNEL_BOUND)
+        phi, theta = (grid.ravel() for grid in np.meshgrid(axis_phi, axis_theta, indexing="ij"))
+        
+        S, sum_log_r, _, _ = _arma11_innovations(x, phi, theta)
+        loglike = -0.5 * m * np.log(S / m) - 0.5 * sum_log_r
+        best = np.nanargmax(loglike)
+        center = np.array([phi[best], theta[best]])
+        half_width *= 4 / (ARIMA_KERNEL_GRID - 1)
+    
+    phi, theta = center[:1], center[1:]
+    S, sum_log_r, x_hat, r = _arma11_innovations(x, phi, theta)
+    sigma2 = float(S[0] / m)
+    
+    return {
+        "phi": float(phi[0]),
+        "theta": float(theta[0]),
+        "sigma2": sigma2,
+        "llf": float(-0.5 * m * (np.log(2 * np.pi * sigma2) + 1) - 0.5 * sum_log_r[0]),
+        "last_value": float(y[-1]),
+        "next_diff": float(x_hat[0]),
+        "next_rel_var": float(r[0]),
+    }
+
+
+def weighted_percentile(stacked: np.ndarray, weights: np.ndarray, q: float) -> np.ndarray:
+    """
+    Percentile along axis 0 of `stacked` (one row per sub-model) with per-row weights
+    summing to 1. Each sorted value sits at the midpoint of its cumulative weight and
+    the percentile is interpolated between them (clamped to the extremes).
+    """
+    order = np.argsort(stacked, axis=0)
+    values = np.take_along_axis(stacked, order, axis=0)
+    w = np.broadcast_to(np.asarray(weights, dtype=np.float64).reshape(-1, *[1] * (stacked.ndim - 1)), stacked.shape)
+    w = np.take_along_axis(w, order, axis=0)
+    positions = np.cumsum(w, axis=0) - w / 2
+
+    target = q / 100
+    above = (positions <= target).sum(axis=0, keepdims=True)
+    lo = np.clip(above - 1, 0, len(stacked) - 1)
+    hi = np.clip(above, 0, len(stacked) - 1)
+    p_lo, p_hi = np.take_along_axis(positions, lo, axis=0), np.take_along_axis(positions, hi, axis=0)
+    v_lo, v_hi = np.take_along_axis(values, lo, axis=0), np.take_along_axis(values, hi, axis=0)
+    span = p_hi - p_lo
+    frac = np.divide(target - p_lo, span, out=np.zeros_like(span), where=span > 0)
+    return (v_lo + frac * (v_hi - v_lo))[0]
+
+
+def forecast_arima111(fit: Dict[str, Any], periods: int, z: float = Z_95) -> Dict[str, List[float]]:
+    """
+    Closed-form level forecasts and intervals from a `fit_arima111` result.
+
+    The h-step error is the integrated psi-weight sum of future shocks plus the
+    propagated uncertainty of the last MA shock (r_n - 1, vanishing for long series).
+    """
+    phi, theta, sigma2 = fit["phi"], fit["theta"], fit["sigma2"]
+    h = np.arange(periods)
+    phi_powers = phi ** h
+    
+    # Differences decay geometrically from the one-step prediction
+    diffs = fit["next_diff"] * phi_powers
+    mean = fit["last_value"] + np.cumsum(diffs)
+    
+    # psi_0 = 1, psi_k = phi^(k-1) (phi + theta); integrated weights are their partial sums
+    psi = np.concatenate([[1.0], phi_powers[:-1] * (phi + theta)])
+    integrated = np.cumsum(psi)
+    var = sigma2 * (np.cumsum(integrated ** 2) + (fit["next_rel_var"] - 1) * np.cumsum(phi_powers) ** 2)
+    
+    ci_lower, ci_upper = forecast_intervals(mean, var, z)
+    return {
+        "forecast": mean.tolist(),
+        "ci_lower": ci_lower.tolist(),
+        "ci_upper": ci_upper.tolist(),
+    }
+
 class IncomeForecastEngine:
     """
     Forecast income using pre-trained time-series models
     Supports ARIMA, SARIMA, and ensemble predictions
     """
     
-    def __init__(self, model_dir: str = "./models"):
+    def __init__(
+        self,
+        model_dir: str = "./models",
+        model_store: Optional[ModelStore] = None,
+        fitting_service: Optional[FittingService] = None,
+        concurrent_ensemble: bool = False,
+        latency_budget_ms: Optional[float] = None,
+        condition_pretrained: bool = True,
+        ensemble_models: Optional[List[str]] = None,
+        windowing: Optional[WindowingConfig] = None
+    ):
         self.model_dir = Path(model_dir)
+        self.model_store = model_store or ModelStore(model_dir).load(INCOME_ARTIFACTS)
+        self.fitting_service = fitting_service
+        self.concurrent_ensemble = concurrent_ensemble
+        self.latency_budget_ms = latency_budget_ms
+        self._ensemble_executor: Optional[ThreadPoolExecutor] = None
+        self.condition_pretrained = condition_pretrained
+        self.ensemble_models = self._validate_ensemble_models(ensemble_models or ENSEMBLE_MODELS)
+        # Resampling and history window applied before fitting (src/engines/windowing.py); None fits the raw series
+        self.windowing = windowing
+        self._systems: Dict[str, StateSpaceSystem] = {}
+        self.seasonality = SeasonalityAnalyzer()
         self.models = {}
         self.scalers = {}
+        self.features_metadata = None
+        self.feature_builder: Optional[FeatureBuilder] = None
+        self.demographic_encoder: Optional[DemographicEncoder] = None
+        self.ensemble_weights: Optional[Dict[str, float]] = None
         self._load_models()
         logger.info("Income Forecast Engine initialized")
     
     def _load_models(self):
-        """Load pre-trained models from disk"""
-        try:
-            # Load ARIMA model
-            arima_path = self.model_dir / "income_arima.pkl"
-            if arima_path.exists():
-                self.models['arima'] = joblib.load(arima_path)
-                logger.info("✓ ARIMA model loaded")
-            
-            # Load SARIMA model
-            sarima_path = self.model_dir / "income_sarima.pkl"
-            if sarima_path.exists():
-                self.models['sarima'] = joblib.load(sarima_path)
-                logger.info("✓ SARIMA model loaded")
-            
-            # Load Random Forest model
-            rf_path = self.model_dir / "income_rf.pkl"
-            scaler_path = self.model_dir / "income_scaler.pkl"
-            
-            if rf_path.exists() and scaler_path.exists():
-                self.models['rf'] = joblib.load(rf_path)
-                self.scalers['rf'] = joblib.load(scaler_path)
-                logger.info("✓ Random Forest model loaded")
-            
-            # Load Demographic Classifier
-            demo_model_path = self.model_dir / "income_demographic_classifier.pkl"
-            demo_scaler_path = self.model_dir / "income_demographic_scaler.pkl"
-            demo_features_path = self.model_dir / "income_demographic_features.pkl"
-            
-            if demo_model_path.exists() and demo_scaler_path.exists() and demo_features_path.exists():
-                self.models['demographic'] = joblib.load(demo_model_path)
-                self.scalers['demographic'] = joblib.load(demo_scaler_path)
-                self.features_metadata = joblib.load(demo_features_path)
-                logger.info("✓ Demographic Classifier loaded")
-            
-            if not self.models:
-                logger.warning("No pre-trained models found. Using on-the-fly training.")
+        """Pick up pre-trained models from the shared model store"""
+        store = self.model_store
+        
+        # Compact artifacts (see src/utils/ts_artifacts.py) take precedence over legacy pickles
+        for name in ('arima', 'sarima'):
+            model = store.get(f"income_{name}_compact", store.get(f"income_{name}"))
+            if model is not None:
+                self.models[name] = model
+        
+        # Memory-mapped tree artifacts (see src/engines/tree_runtime.py) take precedence over pickles
+        rf = store.get("income_rf_trees", store.get("income_rf"))
+        if rf is not None and "income_scaler" in store:
+            # Models trained before feature specs were saved use the original calendar columns
+            builder = FeatureBuilder(store.get("income_rf_features") or FeatureSpec())
+            scaler = store.get("income_scaler")
+            expected = getattr(scaler, "n_features_in_", builder.n_features)
+            if expected == builder.n_features:
+                self.models['rf'] = rf
+                self.scalers['rf'] = scaler
+                self.feature_builder = builder
+            else:
+                logger.error(
+                    f"RF feature spec has {builder.n_features} columns but the scaler expects {expected}; "
+                    "RF sub-model disabled"
+                )
+        
+        classifier = store.get("income_demographic_classifier_trees", store.get("income_demographic_classifier"))
+        if classifier is not None and all(
+            name in store for name in ("income_demographic_scaler", "income_demographic_features")
+        ):
+            self.models['demographic'] = classifier
+            self.scalers['demographic'] = store.get("income_demographic_scaler")
+            self.features_metadata = store.get("income_demographic_features")
+            self.demographic_encoder = DemographicEncoder(self.features_metadata)
+        
+        # Global panel model across users (src/engines/global_model.py)
+        global_model = store.get("income_global")
+        if global_model is not None:
+            self.models['global'] = global_model
+        
+        # Sub-model weights from the rolling-origin backtest (src/engines/backtest.py);
+        # weights that did not score every sub-model this engine can run are stale
+        weights = store.get("income_ensemble_weights")
+        if weights is not None:
+            scored = {name: float(w) for name, w in weights.get("weights", {}).items()}
+            unscored = [
+                name for name in self.ensemble_models
+                if name not in scored and (name not in ('rf', 'global') or name in self.models)
+            ]
+            if unscored:
+                logger.warning(
+                    f"Ensemble weights do not score {', '.join(unscored)}; using the simple average "
+                    "(re-run scripts/evaluate_models.py)"
+                )
+            else:
+                self.ensemble_weights = scored
+        
+        # State-space matrices for conditioning pretrained params on user series
+        for name in ('arima', 'sarima'):
+            if name in self.models:
+                self._systems[name] = self._build_system(self.models[name])
         
+        if self.models:
+            logger.info(f"✓ Pre-trained models available: {', '.join(self.models)}")
+        else:
+            logger.warning("No pre-trained models found. Using on-the-fly training.")
+    
+    def _validate_ensemble_models(self, models) -> Tuple[str, ...]:
+        unknown = [name for name in models if name not in ENSEMBLE_MODELS]
+        if unknown:
+            raise ValueError(f"Unknown ensemble sub-models: {', '.join(unknown)}")
+        return tuple(models)
+    
+    def _build_system(self, model: Any) -> Optional[StateSpaceSystem]:
+        """Extract the Kalman filter system from a compact artifact or legacy results object"""
+        try:
+            if not isinstance(model, CompactTimeSeriesModel):
+                model = CompactTimeSeriesModel.from_results(model)
+            return StateSpaceSystem.from_statsmodels(model.model_type(), model.apply_kwds(), model.params)
         except Exception as e:
-            logger.error(f"Error loading models: {e}")
-            logger.warning("Will fall back to on-the-fly training")
+            logger.warning(f"Conditioning fast path unavailable: {e}")
+            return None
     
-    def prepare_data(self, timeseries: List[Dict[str, Any]]) -> pd.DataFrame:
+    def prepare_data(
+        self,
+        timeseries: Optional[List[Dict[str, Any]]] = None,
+        dates: Optional[List[Any]] = None,
+        values: Optional[List[Optional[float]]] = None
+    ) -> pd.DataFrame:
         """
         Convert API input to pandas DataFrame
         
         Args:
             timeseries: List of {"date": str, "value": float} dicts
+            dates, values: Columnar alternative to `timeseries`
         
         Returns:
             Prepared DataFrame with date index and value column
         """
-        df = pd.DataFrame(timeseries)
+        if timeseries is not None:
+            try:
+                dates = [point["date"] for point in timeseries]
+                values = [point["value"] for point in timeseries]
+            except (KeyError, TypeError):
+                return self._prepare_data_pandas(pd.DataFrame(timeseries))
+        if dates is None or values is None:
+            raise ValueError("Either timeseries or dates and values are required")
+        
+        df = self._prepare_data_numpy(dates, values)
+        if df is None:
+            df = self._prepare_data_pandas(pd.DataFrame({"date": dates, "value": values}))
+        return df
+    
+    def _prepare_data_numpy(self, dates: List[Any], values: List[Optional[float]]) -> Optional[pd.DataFrame]:
+        """
+        Fast path for regular series of ISO dates: parse, sort and forward-fill with NumPy.
+        Returns None for input pandas has to handle (other date formats, timestamps,
+        duplicates, uneven spacing).
+        """
+        if len(dates) != len(values):
+            raise ValueError("dates and values must have the same length")
+        # Plain YYYY-MM-DD only: NumPy would silently truncate times and ignore time zones
+        if not all(isinstance(date, str) and len(date) == 10 for date in dates):
+            return None
+        try:
+            days = np.array(dates, dtype="datetime64[D]")
+            y = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        except (ValueError, TypeError):
+            return None
+        if len(days) < 2 or np.isnat(days).any():
+            return None
+        
+        if (np.diff(days) < np.timedelta64(0, "D")).any():
+            order = np.argsort(days, kind="stable")
+            days, y = days[order], y[order]
+        if not self._is_regular(days):
+            return None
+        
+        missing = np.isnan(y)
+        if missing.any():
+            logger.warning("Missing values detected, performing forward fill")
+            last_valid = np.maximum.accumulate(np.where(missing, 0, np.arange(len(y))))
+            y = y[last_valid]
+        
+        index = pd.DatetimeIndex(days.astype("datetime64[ns]"), name="date")
+        return pd.DataFrame({"value": y}, index=index)
+    
+    def _is_regular(self, days: np.ndarray) -> bool:
+        """Strictly increasing with a constant step in days, or monthly on a fixed day / month end"""
+        steps = np.diff(days).astype(np.int64)
+        if steps[0] > 0 and (steps == steps[0]).all():
+            return True
+        months = days.astype("datetime64[M]")
+        if not (np.diff(months).astype(np.int64) == 1).all():
+            return False
+        day_of_month = (days - months).astype(np.int64)
+        month_end = (days + 1).astype("datetime64[M]") != months
+        return bool((day_of_month == day_of_month[0]).all() or month_end.all())
+    
+    def _prepare_data_pandas(self, df: pd.DataFrame) -> pd.DataFrame:
+        """General path: arbitrary date formats, duplicates and irregular spacing"""
         df["date"] = pd.to_datetime(df["date"])
         df = df.sort_values("date")
         df.set_index("date", inplace=True)
@@ -87,7 +394,7 @@ class IncomeForecastEngine:
         # Check for missing values
         if df["value"].isnull().any():
             logger.warning("Missing values detected, performing forward fill")
-            df["value"].fillna(method="ffill", inplace=True)
+            df["value"] = df["value"].ffill()
         
         return df
     
@@ -116,8 +423,28 @@ class IncomeForecastEngine:
             model = self.models[model_name]
             
             if model_name in ['arima', 'sarima']:
+                values = data["value"].values
+                system = self._systems.get(model_name)
+                conditioned = self.condition_pretrained and len(values) > 0
+                
+                if conditioned and system is not None and not np.isnan(values).any():
+                    # Fast path: Kalman filter the user's series with the pretrained params
+                    a, P = system.filter(values[None, :])
+                    mean, var = system.forecast(a, P, periods)
+                    ci_lower, ci_upper = forecast_intervals(mean[0], var)
+                    
+                    return {
+                        "model": model_name.upper(),
+                        "forecast": mean[0].tolist(),
+                        "ci_lower": ci_lower.tolist(),
+                        "ci_upper": ci_upper.tolist(),
+                        "using_pretrained": True,
+                        "conditioned": True
+                    }
+                
                 # Use statsmodels forecast method
-                forecast_result = model.get_forecast(steps=periods)
+                results = model.apply(values) if conditioned else model
+                forecast_result = results.get_forecast(steps=periods)
                 forecast_df = forecast_result.summary_frame()
                 
                 return {
@@ -125,45 +452,28 @@ class IncomeForecastEngine:
                     "forecast": forecast_df["mean"].tolist(),
                     "ci_lower": forecast_df["mean_ci_lower"].tolist(),
                     "ci_upper": forecast_df["mean_ci_upper"].tolist(),
-                    "using_pretrained": True
+                    "using_pretrained": True,
+                    "conditioned": conditioned
                 }
             
             elif model_name == 'rf':
                 # Random Forest requires feature engineering
                 scaler = self.scalers['rf']
                 
-                # Generate future dates
-                last_date = data.index[-1]
-                future_dates = pd.date_range(
-                    start=last_date + pd.Timedelta(days=1),
-                    periods=periods,
-                    freq='D'
-                )
-                
-                # Create features
-                features = []
-                for date in future_dates:
-                    features.append([
-                        date.dayofweek,
-                        date.month,
-                        date.quarter
-                    ])
-                
-                X_future = np.array(features)
+                # Calendar features for the next `periods` steps at the series' frequency (shared with training)
+                dates = data.index.values
+                freq = self._infer_frequency(dates) if len(dates) > 1 else None
+                X_future = self.feature_builder.build_future(dates[-1:], periods, freq)
                 X_future_scaled = scaler.transform(X_future)
                 
-                # Predict
-                predictions = model.predict(X_future_scaled)
-                
-                # Estimate confidence intervals (RF doesn't provide them natively)
-                # Use prediction std as proxy
-                std = np.std(predictions) * 0.5
+                # Predict; the interval is the 2.5%-97.5% range of the individual trees
+                predictions, ci_lower, ci_upper = forest_intervals(model, X_future_scaled)
                 
                 return {
                     "model": "Random Forest",
                     "forecast": predictions.tolist(),
-                    "ci_lower": (predictions - 1.96 * std).tolist(),
-                    "ci_upper": (predictions + 1.96 * std).tolist(),
+                    "ci_lower": ci_lower.tolist(),
+                    "ci_upper": ci_upper.tolist(),
                     "using_pretrained": True
                 }
         
@@ -171,30 +481,36 @@ class IncomeForecastEngine:
             logger.error(f"Error forecasting with {model_name}: {e}")
             return None
     
-    def detect_seasonality(self, data: pd.DataFrame) -> Dict[str, Any]:
-        """Detect seasonality pattern in time series"""
-        from scipy import signal
-        
-        values = data["value"].values
+    def forecast_pretrained_batch(
+        self,
+        values: np.ndarray,
+        model_name: str,
+        periods: int = 6
+    ) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Condition a pretrained ARIMA/SARIMA on many equal-length series at once
         
-        # Calculate autocorrelation
-        acf = np.correlate(values - values.mean(), values - values.mean(), mode="full")
-        acf = acf[len(acf)//2:]
-        acf = acf / acf[0]
+        Args:
+            values: (n_series, n_obs) matrix without missing values
+            model_name: 'arima' or 'sarima'
+            periods: Number of periods to forecast
         
-        # Find dominant frequencies using FFT
-        fft = np.abs(np.fft.fft(values))
-        freqs = np.fft.fftfreq(len(values))
+        Returns:
+            Dict of (n_series, periods) arrays or None if the model is not available
+        """
+        system = self._systems.get(model_name)
+        if system is None:
+            return None
         
-        # Peak frequency indicates seasonality
-        peak_freq = freqs[np.argmax(fft)]
-        season_period = int(1 / abs(peak_freq)) if peak_freq != 0 else 12
+        a, P = system.filter(values)
+        mean, var = system.forecast(a, P, periods)
+        ci_lower, ci_upper = forecast_intervals(mean, var)
         
-        return {
-            "has_seasonality": season_period < len(values) / 2,
-            "season_period": season_period,
-            "strength": float(np.max(acf[1:min(13, len(acf))])) if len(acf) > 1 else 0
-        }
+        return {"forecast": mean, "ci_lower": ci_lower, "ci_upper": ci_upper}
+    
+    def detect_seasonality(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """Detect seasonality pattern in time series (FFT analysis, memoized per series)"""
+        return self.seasonality.analyze(data["value"].values).to_dict()
     
     def forecast_arima(self, data: pd.DataFrame, periods: int = 6) -> Dict[str, Any]:
         """Forecast using ARIMA model (pre-trained or on-the-fly)"""
@@ -208,27 +524,29 @@ class IncomeForecastEngine:
         logger.info("Training ARIMA on-the-fly...")
         
         try:
-            from statsmodels.tsa.arima.model import ARIMA
-            
             values = data["value"].values
             
-            # Simple ARIMA (1,1,1) for speed
-            model = ARIMA(values, order=(1, 1, 1))
-            fitted_model = model.fit()
-            
-            # Forecast
-            forecast_result = fitted_model.get_forecast(steps=periods)
-            forecast_df = forecast_result.summary_frame()
+            # Simple ARIMA (1,1,1) for speed: NumPy kernel inline for short series,
+            # statsmodels in the fitting pool for long ones (or if the kernel cannot fit)
+            order = (1, 1, 1)
+            fit = None
+            if len(values) <= ARIMA_KERNEL_MAX_OBS:
+                try:
+                    fit = forecast_arima111(fit_arima111(values), periods)
+                except ValueError as e:
+                    logger.info(f"ARIMA kernel unavailable ({e}), fitting with statsmodels")
+            if fit is None:
+                fit = self._run_fit(fit_arima_forecast, values, order, periods)
             
             return {
                 "model": "ARIMA",
-                "order": (1, 1, 1),
-                "forecast": forecast_df["mean"].tolist(),
-                "ci_lower": forecast_df["mean_ci_lower"].tolist(),
-                "ci_upper": forecast_df["mean_ci_upper"].tolist(),
+                "order": order,
+                **fit,
                 "using_pretrained": False
             }
         
+        except FittingQueueFullError:
+            raise
         except Exception as e:
             logger.error(f"ARIMA forecasting failed: {e}")
             return None
@@ -245,72 +563,146 @@ class IncomeForecastEngine:
         logger.info("Training SARIMA on-the-fly...")
         
         try:
-            from statsmodels.tsa.statespace.sarimax import SARIMAX
-            
             values = data["value"].values
             seasonality = self.detect_seasonality(data)
             season_period = seasonality["season_period"]
+            if season_period > SARIMA_MAX_SEASON:
+                season_period = 12
             
-            model = SARIMAX(
+            fit = self._run_fit(
+                fit_sarima_forecast,
                 values,
-                order=(1, 1, 1),
-                seasonal_order=(1, 1, 0, season_period),
-                enforce_stationarity=False,
-                enforce_invertibility=False
+                (1, 1, 1),
+                (1, 1, 0, season_period),
+                periods
             )
             
-            fitted_model = model.fit(disp=False)
-            
-            # Forecast
-            forecast_result = fitted_model.get_forecast(steps=periods)
-            forecast_df = forecast_result.summary_frame()
-            
             return {
                 "model": "SARIMA",
-                "forecast": forecast_df["mean"].tolist(),
-                "ci_lower": forecast_df["mean_ci_lower"].tolist(),
-                "ci_upper": forecast_df["mean_ci_upper"].tolist(),
+                **fit,
                 "using_pretrained": False
             }
         
+        except FittingQueueFullError:
+            raise
         except Exception as e:
             logger.error(f"SARIMA forecasting failed: {e}")
             return None
     
-    def ensemble_forecast(self, data: pd.DataFrame, periods: int = 6) -> Dict[str, Any]:
+    def forecast_exponential_smoothing(self, data: pd.DataFrame, periods: int = 6) -> Dict[str, Any]:
+        """Forecast using additive Holt-Winters (see src/engines/smoothing.py)"""
+        try:
+            values = data["value"].values
+            season_period = season_period_for_frequency(self._infer_frequency(data.index.values))
+            fit = fit_holt_winters_batch(values[None, :], season_period)
+            mean, ci_lower, ci_upper = fit.forecast(periods)
+            
+            return {
+                "model": "Holt-Winters",
+                "season_period": fit.season_period,
+                "forecast": mean[0].tolist(),
+                "ci_lower": ci_lower[0].tolist(),
+                "ci_upper": ci_upper[0].tolist(),
+                "using_pretrained": False
+            }
+        
+        except Exception as e:
+            logger.error(f"Exponential smoothing forecasting failed: {e}")
+            return None
+    
+    def forecast_global(self, data: pd.DataFrame, periods: int = 6) -> Optional[Dict[str, Any]]:
+        """Forecast with the global panel model; works from a single observation"""
+        if 'global' not in self.models:
+            return None
+        try:
+            dates = data.index.values
+            freq = self._infer_frequency(dates) if len(dates) > 1 else None
+            mean, ci_lower, ci_upper = self.models['global'].forecast_interval(
+                dates[-1:], [data["value"].values], periods, freq
+            )
+            
+            # Models trained without calibration series have no interval
+            return {
+                "model": "Global",
+                "forecast": mean[0].tolist(),
+                "ci_lower": None if ci_lower is None else ci_lower[0].tolist(),
+                "ci_upper": None if ci_upper is None else ci_upper[0].tolist(),
+                "using_pretrained": True
+            }
+        
+        except Exception as e:
+            logger.error(f"Global model forecasting failed: {e}")
+            return None
+    
+    def _run_fit(self, fit_fn, *args) -> Dict[str, Any]:
+        """Run a fit in the process pool when one is attached, inline otherwise"""
+        if self.fitting_service is not None:
+            return self.fitting_service.run(fit_fn, *args)
+        return fit_fn(*args)
+    
+    def ensemble_forecast(
+        self,
+        data: pd.DataFrame,
+        periods: int = 6,
+        concurrent: Optional[bool] = None,
+        latency_budget_ms: Optional[float] = None,
+        models: Optional[List[str]] = None,
+        window: bool = True
+    ) -> Dict[str, Any]:
         """
         Combine multiple forecasts using ensemble method
         Weighted average of best performing models
+        
+        `models` selects sub-models from ENSEMBLE_MODELS (default: the engine's
+        configured set). In concurrent mode sub-models run in parallel and any that
+        have not finished within the latency budget are dropped (see `dropped_sub_models`).
+        With a windowing config the series is resampled and truncated first; the
+        policy applied is returned as `preprocessing`. `window=False` fits the series
+        as given (batch_forecast has already windowed it).
         """
-        forecasts = {}
+        data, policy = self.preprocess(data) if window else (data, None)
+        
+        if concurrent is None:
+            concurrent = self.concurrent_ensemble
+        if latency_budget_ms is None:
+            latency_budget_ms = self.latency_budget_ms
         
-        # Generate forecasts from different models
-        arima_result = self.forecast_arima(data, periods)
-        if arima_result:
-            forecasts["arima"] = arima_result
+        models = self._validate_ensemble_models(models) if models else self.ensemble_models
         
-        sarima_result = self.forecast_sarima(data, periods)
-        if sarima_result:
-            forecasts["sarima"] = sarima_result
+        available = {
+            "arima": lambda: self.forecast_arima(data, periods),
+            "sarima": lambda: self.forecast_sarima(data, periods),
+            "rf": lambda: self.forecast_with_pretrained(data, 'rf', periods),
+            "exponential_smoothing": lambda: self.forecast_exponential_smoothing(data, periods),
+            "global": lambda: self.forecast_global(data, periods),
+        }
+        sub_models = {name: available[name] for name in models}
         
-        # Try RF if available
-        rf_result = self.forecast_with_pretrained(data, 'rf', periods)
-        if rf_result:
-            forecasts["rf"] = rf_result
+        if concurrent:
+            forecasts, dropped = self._run_sub_models_concurrently(sub_models, latency_budget_ms)
+        else:
+            forecasts, dropped = {}, []
+            for name, run in sub_models.items():
+                result = run()
+                if result:
+                    forecasts[name] = result
         
         if not forecasts:
             raise ValueError("All forecasting methods failed")
         
-        # Ensemble: Simple average
-        ensemble_forecast = np.mean(
-            [f["forecast"] for f in forecasts.values()],
-            axis=0
+        # Ensemble: backtest-weighted average (simple average without weights)
+        ensemble_forecast, weights = self.combine_forecasts(
+            {name: f["forecast"] for name, f in forecasts.items()}
         )
         
-        # Calculate ensemble confidence intervals
-        all_forecasts = np.array([f["forecast"] for f in forecasts.values()])
-        ci_lower = np.percentile(all_forecasts, 2.5, axis=0)
-        ci_upper = np.percentile(all_forecasts, 97.5, axis=0)
+        # Calculate ensemble confidence intervals; a single sub-model keeps its own
+        only = next(iter(forecasts.values())) if len(forecasts) == 1 else None
+        if only is not None and only.get("ci_lower") is not None:
+            ci_lower, ci_upper = np.asarray(only["ci_lower"]), np.asarray(only["ci_upper"])
+        else:
+            ci_lower, ci_upper = self.ensemble_interval(
+                {name: f["forecast"] for name, f in forecasts.items()}, ensemble_forecast, weights
+            )
         
         # Check if any pre-trained models were used
         using_pretrained = any(f.get("using_pretrained", False) for f in forecasts.values())
@@ -318,14 +710,312 @@ class IncomeForecastEngine:
         return {
             "model": "Ensemble",
             "sub_models": list(forecasts.keys()),
+            "dropped_sub_models": dropped,
+            "weights": weights,
             "forecast": ensemble_forecast.tolist(),
             "ci_lower": ci_lower.tolist(),
             "ci_upper": ci_upper.tolist(),
             "trend": self._calculate_trend(ensemble_forecast),
             "volatility": float(np.std(ensemble_forecast)),
-            "using_pretrained": using_pretrained
+            "using_pretrained": using_pretrained,
+            "preprocessing": policy.to_dict() if policy else None
+        }
+    
+    def preprocess(self, data: pd.DataFrame) -> Tuple[pd.DataFrame, Optional[WindowPolicy]]:
+        """Resample and truncate a prepared series per the windowing config"""
+        if self.windowing is None or len(data) < 2 or data["value"].isnull().any():
+            return data, None
+        days, values, policy = apply_window_policy(data.index.values, data["value"].values, self.windowing)
+        if policy.target_freq == policy.source_freq and not policy.truncated:
+            return data, policy
+        index = pd.DatetimeIndex(days.astype("datetime64[ns]"), name="date")
+        return pd.DataFrame({"value": values}, index=index), policy
+    
+    def combine_forecasts(self, forecasts: Dict[str, Any]) -> Tuple[np.ndarray, Optional[Dict[str, float]]]:
+        """
+        Combine sub-model forecasts (each (periods,) or (n_series, periods)).
+        Backtest weights are renormalized over the sub-models present; a sub-model the
+        backtest did not score gets the mean weight. Returns the combined forecast and
+        the weights used (None for the simple average).
+        """
+        stacked = np.stack([np.asarray(f, dtype=np.float64) for f in forecasts.values()])
+        if self.ensemble_weights:
+            neutral = float(np.mean(list(self.ensemble_weights.values())))
+            w = np.array([self.ensemble_weights.get(name, neutral) for name in forecasts])
+            if w.sum() > 0:
+                w = w / w.sum()
+                return np.tensordot(w, stacked, axes=1), dict(zip(forecasts, w.tolist()))
+        return stacked.mean(axis=0), None
+    
+    def ensemble_interval(
+        self,
+        forecasts: Dict[str, Any],
+        combined: np.ndarray,
+        weights: Optional[Dict[str, float]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        2.5%-97.5% spread of the sub-model forecasts, weighted like the combined forecast
+        (see combine_forecasts) and widened where needed so that it contains it
+        """
+        stacked = np.stack([np.asarray(f, dtype=np.float64) for f in forecasts.values()])
+        if weights is None:
+            ci_lower = np.percentile(stacked, 2.5, axis=0)
+            ci_upper = np.percentile(stacked, 97.5, axis=0)
+        else:
+            w = np.array([weights[name] for name in forecasts])
+            ci_lower = weighted_percentile(stacked, w, 2.5)
+            ci_upper = weighted_percentile(stacked, w, 97.5)
+        return np.minimum(ci_lower, combined), np.maximum(ci_upper, combined)
+    
+    def _run_sub_models_concurrently(
+        self,
+        sub_models: Dict[str, Any],
+        latency_budget_ms: Optional[float]
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """
+        Dispatch sub-models on the ensemble thread pool (fits go on to the process pool)
+        and keep whatever finishes within the budget.
+        """
+        if self._ensemble_executor is None:
+            self._ensemble_executor = ThreadPoolExecutor(
+                max_workers=ENSEMBLE_THREADS, thread_name_prefix="ensemble"
+            )
+        
+        futures = {self._ensemble_executor.submit(run): name for name, run in sub_models.items()}
+        timeout = latency_budget_ms / 1000 if latency_budget_ms else None
+        done, not_done = wait(futures, timeout=timeout)
+        
+        forecasts = {}
+        queue_full = None
+        for future in done:
+            try:
+                result = future.result()
+            except FittingQueueFullError as e:
+                queue_full = e
+                continue
+            if result:
+                forecasts[futures[future]] = result
+        
+        dropped = []
+        for future in not_done:
+            future.cancel()
+            dropped.append(futures[future])
+        
+        if dropped:
+            logger.warning(f"Ensemble latency budget exceeded, dropped: {', '.join(dropped)}")
+        
+        # Only reject the request if saturation left us with nothing to serve
+        if not forecasts and queue_full is not None:
+            raise queue_full
+        
+        # Keep the configured sub-model order regardless of completion order
+        ordered = {name: forecasts[name] for name in sub_models if name in forecasts}
+        return ordered, sorted(dropped, key=list(sub_models).index)
+    
+    def batch_forecast(
+        self,
+        series: List[Tuple[np.ndarray, np.ndarray]],
+        periods: int = 6
+    ) -> List[Dict[str, Any]]:
+        """
+        Ensemble forecasts for many series in one call
+        
+        Series are windowed like ensemble_forecast, then grouped by (length,
+        frequency); within a group the pretrained ARIMA/SARIMA filters and the RF
+        calendar features run vectorized over the whole group. Groups are spread
+        over the process pool when one is attached.
+        
+        Args:
+            series: List of (dates, values) arrays, one pair per user
+            periods: Number of periods to forecast
+        
+        Returns:
+            One result dict per input series, in input order
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(series)
+        policies: List[Optional[WindowPolicy]] = [None] * len(series)
+        groups: Dict[Tuple[int, str], List[int]] = {}
+        normalized = []
+        
+        for i, (dates, values) in enumerate(series):
+            try:
+                dates, values = self._normalize_series(dates, values)
+            except ValueError as e:
+                results[i] = {"error": str(e)}
+                normalized.append(None)
+                continue
+            if self.windowing is not None:
+                dates, values, policies[i] = apply_window_policy(dates, values, self.windowing)
+            normalized.append((dates, values))
+            groups.setdefault((len(values), self._infer_frequency(dates)), []).append(i)
+        
+        jobs = []
+        for (_, freq), indices in groups.items():
+            dates = np.vstack([normalized[i][0] for i in indices])
+            values = np.vstack([normalized[i][1] for i in indices])
+            jobs.append((indices, dates, values, freq))
+        
+        futures = {}
+        if self.fitting_service is not None and len(jobs) > 1:
+            for n, (indices, dates, values, freq) in enumerate(jobs):
+                try:
+                    futures[n] = self.fitting_service.submit(
+                        _forecast_group_worker, str(self.model_dir), self.ensemble_models,
+                        dates[:, -1], values, periods, freq, dates
+                    )
+                except FittingQueueFullError:
+                    break  # remaining groups run inline
+        
+        for n, (indices, dates, values, freq) in enumerate(jobs):
+            if n in futures:
+                try:
+                    group_results = futures[n].result(timeout=self.fitting_service.timeout_seconds)
+                except Exception as e:
+                    logger.warning(f"Batch group failed in worker ({e}), running inline")
+                    group_results = self.forecast_group(dates[:, -1], values, periods, freq, dates)
+            else:
+                group_results = self.forecast_group(dates[:, -1], values, periods, freq, dates)
+            for i, result in zip(indices, group_results):
+                results[i] = result
+                if "error" not in result:
+                    result["preprocessing"] = policies[i].to_dict() if policies[i] else None
+        
+        return results
+    
+    def forecast_group(
+        self,
+        last_dates: np.ndarray,
+        values: np.ndarray,
+        periods: int,
+        freq: Optional[str] = None,
+        dates: Optional[np.ndarray] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Vectorized ensemble over a (n_series, n_obs) matrix of equal-length series.
+        `dates` ((n_series, n_obs)) are the rows' own dates for the per-series fallback;
+        without them the rows are assumed evenly spaced at `freq` up to `last_dates`.
+        """
+        forecasts, intervals = {}, {}
+        selected = self.ensemble_models
+        
+        for name in ('arima', 'sarima'):
+            result = self.forecast_pretrained_batch(values, name, periods) if name in selected else None
+            if result is not None:
+                forecasts[name] = result["forecast"]
+                intervals[name] = (result["ci_lower"], result["ci_upper"])
+        
+        if 'rf' in self.models and 'rf' in selected:
+            # Future dates at the group frequency, as in the single-series RF path
+            X_future = self.feature_builder.build_future(last_dates, periods, freq)
+            predictions = self.models['rf'].predict(self.scalers['rf'].transform(X_future))
+            forecasts['rf'] = predictions.reshape(len(values), periods)
+        
+        if 'exponential_smoothing' in selected and values.shape[1] >= 3:
+            fit = fit_holt_winters_batch(values, season_period_for_frequency(freq))
+            mean, ci_lower, ci_upper = fit.forecast(periods)
+            forecasts['exponential_smoothing'] = mean
+            intervals['exponential_smoothing'] = (ci_lower, ci_upper)
+        
+        if 'global' in self.models and 'global' in selected:
+            # One predict call for every series and horizon
+            forecasts['global'], ci_lower, ci_upper = self.models['global'].forecast_interval(
+                last_dates, values, periods, freq
+            )
+            if ci_lower is not None:
+                intervals['global'] = (ci_lower, ci_upper)
+        
+        if not forecasts:
+            # No vectorized sub-model applies: fall back to the per-series ensemble,
+            # on the series as given (batch_forecast has already windowed them)
+            if dates is None:
+                step = STEP_DAYS.get(freq or "", 1)
+                dates = last_dates.astype("datetime64[D]")[:, None] - np.arange(values.shape[1])[::-1] * step
+            results = []
+            for row_dates, row in zip(dates, values):
+                index = pd.DatetimeIndex(row_dates.astype("datetime64[ns]"), name="date")
+                df = pd.DataFrame({"value": row}, index=index)
+                try:
+                    results.append(self.ensemble_forecast(df, periods, window=False))
+                except FittingQueueFullError:
+                    raise
+                except Exception as e:
+                    results.append({"error": str(e)})
+            return results
+        
+        ensemble, weights = self.combine_forecasts(forecasts)
+        if len(forecasts) == 1 and next(iter(forecasts)) in intervals:
+            # A single sub-model keeps its own interval
+            ci_lower, ci_upper = intervals[next(iter(forecasts))]
+        else:
+            ci_lower, ci_upper = self.ensemble_interval(forecasts, ensemble, weights)
+        volatility = ensemble.std(axis=1)
+        sub_models = list(forecasts.keys())
+        
+        return [
+            {
+                "model": "Ensemble",
+                "sub_models": sub_models,
+                "dropped_sub_models": [],
+                "weights": weights,
+                "forecast": ensemble[i].tolist(),
+                "ci_lower": ci_lower[i].tolist(),
+                "ci_upper": ci_upper[i].tolist(),
+                "trend": self._calculate_trend(ensemble[i]),
+                "volatility": float(volatility[i]),
+                "using_pretrained": any(name in forecasts for name in ('arima', 'sarima', 'rf', 'global'))
+            }
+            for i in range(len(values))
+        ]
+    
+    def _normalize_series(self, dates: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Sort by date and forward-fill gaps; rejects series that cannot be filtered"""
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        values = np.asarray(values, dtype=np.float64)
+        if len(dates) != len(values):
+            raise ValueError("dates and values must have the same length")
+        if len(values) < 2:
+            raise ValueError("At least 2 observations are required")
+        
+        order = np.argsort(dates, kind="stable")
+        dates, values = dates[order], values[order]
+        
+        missing = np.isnan(values)
+        if missing.any():
+            # Forward fill: index of the last valid observation at each position
+            last_valid = np.maximum.accumulate(np.where(missing, 0, np.arange(len(values))))
+            values = values[last_valid]
+            if np.isnan(values[0]):
+                raise ValueError("Series starts with missing values")
+        
+        return dates, values
+    
+    def _infer_frequency(self, dates: np.ndarray) -> str:
+        """Classify the median spacing of a sorted datetime64 array"""
+        return infer_frequency(dates)
+    
+    def fingerprint(self) -> Dict[str, Any]:
+        """Model versions and config that determine ensemble output (for cache keys)"""
+        return {
+            "models": self.model_store.fingerprint(INCOME_ARTIFACTS),
+            "condition_pretrained": self.condition_pretrained,
+            "ensemble_models": list(self.ensemble_models),
+            "windowing": asdict(self.windowing) if self.windowing else None,
         }
     
+    def slice_forecast(self, forecast: Dict[str, Any], periods: int) -> Dict[str, Any]:
+        """
+        Cut a longer-horizon ensemble result down to `periods` steps.
+        Per-step values are horizon independent; summary stats are recomputed.
+        """
+        sliced = dict(forecast)
+        for key in ("forecast", "ci_lower", "ci_upper"):
+            sliced[key] = list(forecast[key][:periods])
+        
+        values = np.asarray(sliced["forecast"])
+        sliced["trend"] = self._calculate_trend(values)
+        sliced["volatility"] = float(np.std(values))
+        return sliced
+    
     def _calculate_trend(self, forecast: np.ndarray) -> str:
         """Determine trend direction"""
         if len(forecast) < 2:
@@ -354,58 +1044,56 @@ class IncomeForecastEngine:
             return None
             
         try:
-            model = self.models['demographic']
-            scaler = self.scalers['demographic']
-            feature_names = self.features_metadata
-            
-            # Prepare input DataFrame with dummy variables
-            # 1. Start with numerical features
-            input_data = {
-                'age': [user_profile.get('age', 30)],
-                'capital_gain': [user_profile.get('capital_gain', 0)],
-                'capital_loss': [user_profile.get('capital_loss', 0)],
-                'hours_per_week': [user_profile.get('hours_per_week', 40)]
-            }
-            
-            # 2. Add categorical features (one-hot encoded)
-            # We need to match the feature names from training
-            for feat in feature_names:
-                if feat in input_data:
-                    continue
-                
-                # Check if this feature matches the user's category
-                # Format is usually 'category_value'
-                matched = False
-                for cat_key, cat_val in user_profile.items():
-                    if f"{cat_key}_{cat_val}" == feat:
-                        input_data[feat] = [1]
-                        matched = True
-                        break
-                
-                if not matched:
-                    input_data[feat] = [0]
-            
-            # Convert to DF and ensure order matches
-            input_df = pd.DataFrame(input_data)
-            input_df = input_df[feature_names]
+            X = self.demographic_encoder.encode(user_profile)[None, :]
+            return self._predict_demographic(X)[0]
             
-            # Scale and predict
-            X_scaled = scaler.transform(input_df)
-            prediction = model.predict(X_scaled)[0]
-            probability = model.predict_proba(X_scaled)[0][1]
-            
-            return {
+        except Exception as e:
+            logger.error(f"Demographic prediction failed: {e}")
+            return None
+    
+    def predict_income_demographic_batch(self, user_profiles: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """Batch variant of predict_income_demographic: one encoded matrix, one model call"""
+        if 'demographic' not in self.models:
+            return None
+        
+        try:
+            return self._predict_demographic(self.demographic_encoder.encode_batch(user_profiles))
+        
+        except Exception as e:
+            logger.error(f"Demographic batch prediction failed: {e}")
+            return None
+    
+    def _predict_demographic(self, X: np.ndarray) -> List[Dict[str, Any]]:
+        model = self.models['demographic']
+        scaler = self.scalers['demographic']
+        
+        # Standardize directly (same arithmetic as StandardScaler.transform, no feature-name checks)
+        if getattr(scaler, "mean_", None) is not None:
+            X = X - scaler.mean_
+        if getattr(scaler, "scale_", None) is not None:
+            X = X / scaler.scale_
+        
+        # One pass over the trees: the predicted class is the argmax of the probabilities
+        proba = model.predict_proba(X)
+        predictions = model.classes_[np.argmax(proba, axis=1)]
+        probabilities = proba[:, 1]
+        
+        return [
+            {
                 "income_bracket": ">50K" if prediction == 1 else "<=50K",
                 "high_income_probability": float(probability),
                 "insight": "High growth potential" if probability > 0.7 else "Stable income profile"
             }
-            
-        except Exception as e:
-            logger.error(f"Demographic prediction failed: {e}")
-            return None
+            for prediction, probability in zip(predictions, probabilities)
+        ]
 
-    def generate_recommendations(self, forecast: Dict[str, Any], demographic_avg: Optional[Dict] = None) -> List[str]:
-        """Generate recommendations based on forecast"""
+    def generate_recommendations(
+        self,
+        forecast: Dict[str, Any],
+        demographic_avg: Optional[Dict] = None,
+        seasonality: Optional[Dict[str, Any]] = None
+    ) -> List[str]:
+        """Generate recommendations based on forecast (and `detect_seasonality` output if given)"""
         recommendations = []
         
         values = forecast["forecast"]
@@ -431,8 +1119,65 @@ class IncomeForecastEngine:
         if volatility > np.mean(values) * 0.3:
             recommendations.append("⚠️ High income volatility - maintain larger emergency fund")
         
+        # Seasonal pattern in the history
+        if seasonality and seasonality.get("has_seasonality"):
+            recommendations.append(
+                f"🗓️ Income follows a ~{seasonality['season_period']}-period cycle - "
+                "save during peak periods to cover the low ones"
+            )
+        
         # Model confidence
         if forecast.get("using_pretrained", False):
             recommendations.append("✓ Predictions based on trained models (higher confidence)")
         
-        return recommendations
\ No newline at end of file
+        return recommendations
+
+
+def build_income_engine(
+    settings: Any,
+    model_store: Optional[ModelStore] = None,
+    fitting_service: Optional[FittingService] = None
+) -> IncomeForecastEngine:
+    """
+    Income engine configured from settings. The app and scripts/precompute_forecasts.py
+    both build it here, so their fingerprints (and so cache keys) match.
+    """
+    windowing = WindowingConfig(
+        target_freq=settings.FORECAST_TARGET_FREQ,
+        aggregation=settings.FORECAST_RESAMPLE_AGG,
+        latency_budget_ms=settings.ENSEMBLE_LATENCY_BUDGET_MS
+    ) if settings.FORECAST_WINDOWING else None
+    return IncomeForecastEngine(
+        settings.MODEL_PATH,
+        model_store=model_store,
+        fitting_service=fitting_service,
+        concurrent_ensemble=settings.ENSEMBLE_CONCURRENT,
+        latency_budget_ms=settings.ENSEMBLE_LATENCY_BUDGET_MS,
+        ensemble_models=settings.ENSEMBLE_MODELS,
+        windowing=windowing
+    )
+
+
+_worker_engines: Dict[Tuple[str, Tuple[str, ...]], "IncomeForecastEngine"] = {}
+
+
+def get_worker_engine(model_dir: str, ensemble_models: Tuple[str, ...]) -> "IncomeForecastEngine":
+    """Engine for process-pool jobs: built once per worker process and config"""
+    key = (model_dir, tuple(ensemble_models))
+    engine = _worker_engines.get(key)
+    if engine is None:
+        engine = _worker_engines[key] = IncomeForecastEngine(model_dir, ensemble_models=list(ensemble_models))
+    return engine
+
+
+def _forecast_group_worker(
+    model_dir: str,
+    ensemble_models: Tuple[str, ...],
+    last_dates: np.ndarray,
+    values: np.ndarray,
+    periods: int,
+    freq: Optional[str] = None,
+    dates: Optional[np.ndarray] = None
+):
+    """Process-pool entry point for batch_forecast"""
+    return get_worker_engine(model_dir, ensemble_models).forecast_group(last_dates, values, periods, freq, dates)
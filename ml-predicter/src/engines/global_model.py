@@ -0,0 +1,269 @@
+"""
+Global panel income model
+
+One HistGradientBoostingRegressor trained on the windows of every user's series
+instead of one time-series model per user. Each row is a (series, origin, horizon)
+triple: lags of the series at the origin, the horizon step and the calendar
+features of the target date. Lags and target are divided by the mean of the
+recent history, so users with different income levels share one model.
+
+Forecasting is direct: all horizons of all series form one feature matrix and one
+predict call. Missing lags (short histories) are NaN, which the model handles
+natively, so cold-start users need no special path.
+
+Prediction intervals come from the per-horizon quantiles of the scaled residuals
+on calibration series held out of a first fit; the served model is then refitted
+on every series.
+"""
+
+import logging
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.engines.feature_builder import STEP_DAYS, FeatureSpec, calendar_features, future_dates
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SPEC = FeatureSpec(calendar=("dayofweek", "dayofmonth", "month", "quarter"), lags=(1, 2, 3, 7, 14, 28))
+DEFAULT_MAX_HORIZON = 24
+# Fewer observations than this at an origin: not used for training
+MIN_HISTORY = 2
+# Training rows are subsampled (uniformly over windows) above this size
+MAX_TRAINING_ROWS = 500_000
+# Share of series held out to calibrate the prediction intervals
+CALIBRATION_FRACTION = 0.2
+INTERVAL_PERCENTILES = (2.5, 97.5)
+
+
+class GlobalIncomeModel:
+    """Direct multi-horizon panel regressor and its feature layout"""
+
+    # Scaled residual percentiles per horizon, (2, max_horizon); None: no interval
+    residual_quantiles: Optional[np.ndarray] = None
+
+    def __init__(
+        self,
+        estimator: Any,
+        spec: FeatureSpec = DEFAULT_SPEC,
+        max_horizon: int = DEFAULT_MAX_HORIZON,
+        residual_quantiles: Optional[np.ndarray] = None
+    ):
+        self.estimator = estimator
+        self.spec = spec
+        self.max_horizon = max_horizon
+        self.residual_quantiles = residual_quantiles
+
+    @property
+    def columns(self) -> List[str]:
+        return ["horizon", "step_days", "history"] + [f"lag_{lag}" for lag in self.spec.lags] + list(self.spec.calendar)
+
+    @property
+    def window(self) -> int:
+        """Observations needed for full lag features"""
+        return self.spec.max_lag
+
+    def _origin_features(self, history: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Scaled lags at the end of each row of a (n_series, window) NaN-left-padded matrix.
+
+        Returns:
+            lags (n_series, n_lags) and scale (n_series,)
+        """
+        with np.errstate(invalid="ignore"):
+            scale = np.nanmean(np.abs(history), axis=1)
+        scale = np.where(np.isfinite(scale) & (scale > 0), scale, 1.0)
+        # lag_k at the origin is the k-th most recent observation
+        lags = history[:, [-lag for lag in self.spec.lags]] / scale[:, None]
+        return lags, scale
+
+    def _design(self, lags: np.ndarray, history: np.ndarray, target_dates: np.ndarray, step_days: np.ndarray) -> np.ndarray:
+        """(n_series * periods, n_features) rows, series-major"""
+        n_series, periods = target_dates.shape
+        X = np.empty((n_series, periods, len(self.columns)))
+        X[:, :, 0] = np.arange(1, periods + 1)
+        X[:, :, 1] = step_days[:, None]
+        X[:, :, 2] = history[:, None]
+        n_lags = len(self.spec.lags)
+        X[:, :, 3:3 + n_lags] = lags[:, None, :]
+        X[:, :, 3 + n_lags:] = calendar_features(target_dates, self.spec.calendar).reshape(n_series, periods, -1)
+        return X.reshape(n_series * periods, -1)
+
+    def _predict(
+        self,
+        last_dates: np.ndarray,
+        histories: Sequence[np.ndarray],
+        periods: int,
+        freq: Optional[str]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Scaled predictions (n_series, periods) and each series' scale"""
+        window = np.full((len(histories), self.window), np.nan)
+        for row, values in zip(window, histories):
+            values = np.asarray(values, dtype=np.float64)[-self.window:]
+            if len(values):
+                row[-len(values):] = values
+        lengths = np.array([min(len(values), self.window) for values in histories], dtype=np.float64)
+
+        lags, scale = self._origin_features(window)
+        step_days = np.full(len(histories), STEP_DAYS.get(freq or "", 1), dtype=np.float64)
+        X = self._design(lags, lengths, future_dates(last_dates, periods, freq), step_days)
+        return self.estimator.predict(X).reshape(len(histories), periods), scale
+
+    def forecast(
+        self,
+        last_dates: np.ndarray,
+        histories: Sequence[np.ndarray],
+        periods: int,
+        freq: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Forecasts for many series in one predict call.
+
+        Args:
+            last_dates: Date of the last observation of each series
+            histories: Each series' observations (only the last `window` are used);
+                a (n_series, n_obs) matrix or a list of 1-D arrays of any length
+            periods: Steps ahead; beyond max_horizon the horizon feature is extrapolated
+                the way the trees do (flat)
+            freq: Shared frequency code (D/W/M)
+
+        Returns:
+            (n_series, periods) forecasts
+        """
+        predicted, scale = self._predict(last_dates, histories, periods, freq)
+        return predicted * scale[:, None]
+
+    def forecast_interval(
+        self,
+        last_dates: np.ndarray,
+        histories: Sequence[np.ndarray],
+        periods: int,
+        freq: Optional[str] = None
+    ) -> Tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        Forecasts and 95% prediction intervals, each (n_series, periods).
+        The bounds are None for a model trained without calibration series.
+        """
+        predicted, scale = self._predict(last_dates, histories, periods, freq)
+        mean = predicted * scale[:, None]
+        if self.residual_quantiles is None:
+            return mean, None, None
+        # Beyond max_horizon the last calibrated horizon is used, like the point forecast
+        q = self.residual_quantiles[:, np.minimum(np.arange(periods), self.max_horizon - 1)]
+        lower = (predicted + q[0]) * scale[:, None]
+        upper = (predicted + q[1]) * scale[:, None]
+        return mean, np.minimum(lower, mean), np.maximum(upper, mean)
+
+def build_training_set(
+    series: Sequence[Tuple[np.ndarray, np.ndarray]],
+    spec: FeatureSpec = DEFAULT_SPEC,
+    max_horizon: int = DEFAULT_MAX_HORIZON,
+    freq: Optional[str] = None,
+    max_rows: int = MAX_TRAINING_ROWS,
+    seed: int = 0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Windows of every series: features at each origin (with at least MIN_HISTORY
+    observations) for every horizon that is observed, and the scaled targets.
+    Series must be sorted and gap-free (see IncomeForecastEngine._normalize_series).
+    """
+    model = GlobalIncomeModel(None, spec, max_horizon)
+    rng = np.random.default_rng(seed)
+    blocks_X, blocks_y = [], []
+
+    total = sum(max(len(values) - MIN_HISTORY, 0) * max_horizon for _, values in series)
+    keep = min(1.0, max_rows / total) if total else 1.0
+
+    for dates, values in series:
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        values = np.asarray(values, dtype=np.float64)
+        n = len(values)
+        origins = np.arange(MIN_HISTORY, n)  # origin = number of observations seen
+        if keep < 1.0:
+            origins = origins[rng.random(len(origins)) < keep]
+        if len(origins) == 0:
+            continue
+
+        # Window ending at each origin, NaN-padded on the left
+        padded = np.concatenate([np.full(model.window, np.nan), values])
+        windows = np.stack([padded[o:o + model.window] for o in origins])
+        lags, scale = model._origin_features(windows)
+        lengths = np.minimum(origins, model.window).astype(np.float64)
+        step_days = np.full(len(origins), STEP_DAYS.get(freq or "", 1), dtype=np.float64)
+
+        # Target at origin + h - 1 (0-based); dates follow the observed calendar
+        target_index = origins[:, None] + np.arange(max_horizon)[None, :]
+        observed = target_index < n
+        clipped = np.minimum(target_index, n - 1)
+        X = model._design(lags, lengths, dates[clipped], step_days)
+        y = (values[clipped] / scale[:, None]).ravel()
+
+        mask = observed.ravel()
+        blocks_X.append(X[mask])
+        blocks_y.append(y[mask])
+
+    if not blocks_X:
+        raise ValueError("No training windows: series are too short")
+    return np.concatenate(blocks_X), np.concatenate(blocks_y)
+
+
+def residual_quantiles(
+    predicted: np.ndarray,
+    target: np.ndarray,
+    horizon: np.ndarray,
+    max_horizon: int
+) -> Optional[np.ndarray]:
+    """
+    INTERVAL_PERCENTILES of the scaled residuals per horizon, (2, max_horizon).
+    A horizon without residuals takes the quantiles of the one before it.
+    """
+    residuals = target - predicted
+    quantiles = np.full((2, max_horizon), np.nan)
+    for h in range(max_horizon):
+        at_h = residuals[horizon == h + 1]
+        if len(at_h):
+            quantiles[:, h] = np.percentile(at_h, INTERVAL_PERCENTILES)
+        elif h > 0:
+            quantiles[:, h] = quantiles[:, h - 1]
+    if np.isnan(quantiles).any():
+        return None
+    return quantiles
+
+
+def fit_global_model(
+    series: Sequence[Tuple[np.ndarray, np.ndarray]],
+    spec: FeatureSpec = DEFAULT_SPEC,
+    max_horizon: int = DEFAULT_MAX_HORIZON,
+    freq: Optional[str] = None,
+    seed: int = 0,
+    **params: Any
+) -> GlobalIncomeModel:
+    """
+    Train the panel model on a list of (dates, values) series.
+    With at least two series, a share of them (CALIBRATION_FRACTION) is held out of
+    a first fit to calibrate the prediction intervals.
+    """
+    from sklearn.ensemble import HistGradientBoostingRegressor
+
+    params = {"max_iter": 300, "learning_rate": 0.05, "random_state": 42, **params}
+
+    quantiles = None
+    if len(series) >= 2:
+        order = np.random.default_rng(seed).permutation(len(series))
+        n_calibration = max(1, int(round(CALIBRATION_FRACTION * len(series))))
+        calibration = [series[i] for i in order[:n_calibration]]
+        training = [series[i] for i in order[n_calibration:]]
+        try:
+            X, y = build_training_set(training, spec, max_horizon, freq, seed=seed)
+            X_cal, y_cal = build_training_set(calibration, spec, max_horizon, freq, seed=seed)
+        except ValueError as e:
+            logger.warning(f"Global model intervals not calibrated: {e}")
+        else:
+            estimator = HistGradientBoostingRegressor(**params).fit(X, y)
+            quantiles = residual_quantiles(estimator.predict(X_cal), y_cal, X_cal[:, 0], max_horizon)
+
+    X, y = build_training_set(series, spec, max_horizon, freq, seed=seed)
+    estimator = HistGradientBoostingRegressor(**params)
+    estimator.fit(X, y)
+    logger.info(f"Global income model trained on {len(y)} windows from {len(series)} series")
+    return GlobalIncomeModel(estimator, spec, max_horizon, quantiles)
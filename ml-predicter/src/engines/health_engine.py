@@ -4,22 +4,188 @@ Uses LSTM neural networks and health metrics
 """
 
 import numpy as np
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import logging
 from datetime import datetime
 
+from src.engines.tree_runtime import forest_intervals
+from src.utils.micro_batcher import MicroBatcher
+from src.utils.model_store import ModelStore
+
 logger = logging.getLogger(__name__)
 
+HEALTH_ARTIFACTS = (
+    "health_stress_classifier_trees",
+    "health_stress_classifier",
+    "health_stress_scaler",
+    "health_risk_predictor_trees",
+    "health_risk_predictor",
+    "health_risk_scaler",
+)
+
+# Stress classifier classes (risk_level in scripts/train_models.py)
+RISK_LEVELS = ("low", "moderate", "high", "critical")
+# Upper score bounds of the first three risk levels
+RISK_LEVEL_BINS = np.array([30.0, 60.0, 80.0])
+
+# Stress score inputs with the values assumed when a metric is missing
+STRESS_METRIC_DEFAULTS = {
+    "work_hours": 8,
+    "sleep_hours": 7,
+    "exercise_minutes": 30,
+    "mood_score": 5,
+    "meetings_count": 0,
+    "caffeine_cups": 0,
+    "meditation_minutes": 0,
+}
+
+# Health risk predictor inputs in training order (scripts/train_models.py), with the
+# values assumed when a metric is missing
+RISK_FEATURE_DEFAULTS = {
+    "work_hours": 8,
+    "sleep_hours": 7,
+    "exercise_minutes": 30,
+    "mood_score": 5,
+    "caffeine_cups": 0,
+    "meetings_count": 0,
+}
+
+# Risk sweep: days looked back and the tracked metrics with their missing-value defaults
+RISK_WINDOW_DAYS = 30
+TREND_METRIC_DEFAULTS = {
+    "stress_score": 50,
+    "sleep_hours": 7,
+    "exercise_minutes": 30,
+}
+
+# Identified risks in report order: (severity, description, recommendation)
+HEALTH_RISKS = {
+    "high_stress": ("high", "Chronic stress levels elevated", "Increase meditation/yoga, reduce work hours"),
+    "sleep_deprivation": (
+        "high", "Insufficient sleep detected", "Maintain consistent sleep schedule, avoid screens 1h before bed"
+    ),
+    "physical_inactivity": ("moderate", "Low physical activity", "Aim for 30-60 minutes daily exercise"),
+    "rising_stress": ("moderate", "Stress levels trending upward", "Monitor stress carefully, take preventive action"),
+}
+
+# Recommendation codes in report order
+HEALTH_RECOMMENDATIONS = {
+    "stress_increasing": "⚠️ Stress is increasing - implement daily stress management",
+    "prioritize_sleep": "😴 Prioritize sleep - aim for consistent 7-8 hours daily",
+    "increase_activity": "🏃 Increase physical activity - 30-60 minutes daily exercise",
+    "try_meditation": "🧘 Try meditation - even 10 minutes daily helps",
+    "track_metrics": "📊 Track metrics regularly to monitor trends",
+}
+
 class HealthPredictionEngine:
     """
     Predict health risks and stress levels
     Based on lifestyle metrics
     """
     
-    def __init__(self):
-        self.model = None
+    def __init__(
+        self,
+        model_dir: str = "./models",
+        model_store: Optional[ModelStore] = None,
+        max_batch_rows: Optional[int] = None,
+        max_wait_ms: float = 2.0
+    ):
+        """
+        With `max_batch_rows` set, model calls go through a MicroBatcher per model:
+        concurrent requests are stacked into one scaler transform and one predict.
+        """
+        self.model_store = model_store or ModelStore(model_dir).load(HEALTH_ARTIFACTS)
+        self.stress_model = None
+        self.stress_scaler = None
+        self.risk_model = None
+        self.risk_scaler = None
+        self._load_models()
+        
+        self._batchers: Dict[str, MicroBatcher] = {}
+        if max_batch_rows:
+            if self.stress_model is not None:
+                self._batchers["stress"] = MicroBatcher(
+                    self._stress_proba, max_batch_rows, max_wait_ms, name="health-stress-batcher"
+                )
+            if self.risk_model is not None:
+                self._batchers["risk"] = MicroBatcher(
+                    self._risk_intervals, max_batch_rows, max_wait_ms, name="health-risk-batcher"
+                )
         logger.info("Health Prediction Engine initialized")
     
+    def _load_models(self):
+        """Pick up pre-trained models from the shared model store"""
+        store = self.model_store
+        
+        # Memory-mapped tree artifacts first, pickles otherwise (see src/utils/model_store.py)
+        stress_model = store.get("health_stress_classifier_trees", store.get("health_stress_classifier"))
+        if stress_model is not None and "health_stress_scaler" in store:
+            self.stress_model = stress_model
+            self.stress_scaler = store.get("health_stress_scaler")
+        
+        risk_model = store.get("health_risk_predictor_trees", store.get("health_risk_predictor"))
+        if risk_model is not None and "health_risk_scaler" in store:
+            self.risk_model = risk_model
+            self.risk_scaler = store.get("health_risk_scaler")
+    
+    def shutdown(self):
+        for batcher in self._batchers.values():
+            batcher.shutdown()
+    
+    def batching_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: batcher.stats() for name, batcher in self._batchers.items()}
+    
+    def _feature_matrix(self, metrics_list: List[Dict[str, Any]]) -> np.ndarray:
+        return np.array(
+            [[m.get(name, default) for name, default in RISK_FEATURE_DEFAULTS.items()] for m in metrics_list],
+            dtype=np.float64
+        )
+    
+    def _run_model(self, name: str, X: np.ndarray, fn) -> Any:
+        """Through the model's micro-batcher when batching is enabled, directly otherwise"""
+        batcher = self._batchers.get(name)
+        return batcher.run(X) if batcher is not None else fn(X)
+    
+    def _risk_intervals(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return forest_intervals(self.risk_model, self.risk_scaler.transform(X))
+    
+    def _stress_proba(self, X: np.ndarray) -> np.ndarray:
+        return self.stress_model.predict_proba(self.stress_scaler.transform(X))
+    
+    def predict_stress_interval(self, metrics_list: List[Dict[str, Any]]) -> Optional[List[Dict[str, float]]]:
+        """
+        Model-predicted stress score per metrics dict, with the 95% range of the
+        forest's individual trees. None when the risk predictor is not loaded.
+        """
+        if self.risk_model is None:
+            return None
+        
+        score, lower, upper = self._run_model("risk", self._feature_matrix(metrics_list), self._risk_intervals)
+        
+        return [
+            {"score": round(float(s), 2), "lower": round(float(lo), 2), "upper": round(float(hi), 2)}
+            for s, lo, hi in zip(score, lower, upper)
+        ]
+    
+    def predict_stress_level(self, metrics_list: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Classifier-predicted risk level per metrics dict with the class probabilities.
+        None when the stress classifier is not loaded.
+        """
+        if self.stress_model is None:
+            return None
+        
+        proba = self._run_model("stress", self._feature_matrix(metrics_list), self._stress_proba)
+        labels = [RISK_LEVELS[int(c)] for c in self.stress_model.classes_]
+        
+        return [
+            {
+                "risk_level": labels[int(np.argmax(row))],
+                "probabilities": {label: round(float(p), 4) for label, p in zip(labels, row)}
+            }
+            for row in proba
+        ]
+    
     def calculate_stress_score(self, metrics: Dict[str, Any]) -> Dict[str, Any]:
         """
         Calculate stress score from multiple lifestyle metrics
@@ -38,156 +204,190 @@ class HealthPredictionEngine:
         Returns:
             Stress score (0-100) with components
         """
+        columns = list(STRESS_METRIC_DEFAULTS)
+        row = np.array([[metrics.get(name, STRESS_METRIC_DEFAULTS[name]) for name in columns]], dtype=np.float64)
+        scores = self.calculate_stress_scores(row, columns)
         
-        # Normalize metrics to 0-100 scale
-        work_stress = min(metrics.get("work_hours", 8) / 12 * 100, 100)  # 12h max
-        
-        sleep_score = min(metrics.get("sleep_hours", 7) / 8 * 100, 100)  # 8h ideal
-        sleep_stress = 100 - sleep_score
+        return {
+            "overall_score": round(float(scores["overall_score"][0]), 2),
+            "risk_level": str(scores["risk_level"][0]),
+            "components": {
+                name: round(float(values[0]), 2) for name, values in scores["components"].items()
+            }
+        }
+    
+    def calculate_stress_scores(self, values: np.ndarray, columns: List[str]) -> Dict[str, Any]:
+        """
+        Stress scores for many rows at once (e.g. every day of every user)
         
-        exercise_score = min(metrics.get("exercise_minutes", 30) / 60 * 100, 100)  # 60m ideal
-        exercise_stress = 100 - exercise_score
+        Args:
+            values: (n_rows, n_metrics) matrix; NaN means missing
+            columns: Metric name of each column (see STRESS_METRIC_DEFAULTS); absent
+                metrics take their default
         
-        mood_stress = (100 - metrics.get("mood_score", 5) * 10)  # Inverse of mood
+        Returns:
+            Columnar arrays: overall_score, risk_level and each component
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim != 2 or values.shape[1] != len(columns):
+            raise ValueError(f"Expected a (rows, {len(columns)}) matrix, got shape {values.shape}")
         
-        meetings_stress = min(metrics.get("meetings_count", 0) / 10 * 100, 100)
+        index = {name: j for j, name in enumerate(columns)}
         
-        caffeine_stress = min(metrics.get("caffeine_cups", 0) / 5 * 100, 100)
+        def metric(name: str) -> np.ndarray:
+            default = STRESS_METRIC_DEFAULTS[name]
+            if name not in index:
+                return np.full(len(values), float(default))
+            column = values[:, index[name]]
+            return np.where(np.isnan(column), default, column)
         
-        meditation_score = min(metrics.get("meditation_minutes", 0) / 20 * 100, 100)
-        meditation_benefit = meditation_score / 2  # 50% impact of meditation
+        # Normalize metrics to 0-100 scale
+        work_stress = np.minimum(metric("work_hours") / 12 * 100, 100)  # 12h max
+        sleep_stress = 100 - np.minimum(metric("sleep_hours") / 8 * 100, 100)  # 8h ideal
+        exercise_stress = 100 - np.minimum(metric("exercise_minutes") / 60 * 100, 100)  # 60m ideal
+        mood_stress = 100 - metric("mood_score") * 10  # Inverse of mood
+        meetings_stress = np.minimum(metric("meetings_count") / 10 * 100, 100)
+        caffeine_stress = np.minimum(metric("caffeine_cups") / 5 * 100, 100)
+        meditation_benefit = np.minimum(metric("meditation_minutes") / 20 * 100, 100) / 2  # 50% impact of meditation
         
-        # Weighted average
-        stress_score = (
+        # Weighted average, clamped to 0-100
+        stress_score = np.clip(
             work_stress * 0.25 +
             sleep_stress * 0.25 +
             exercise_stress * 0.15 +
             mood_stress * 0.15 +
             meetings_stress * 0.10 +
             caffeine_stress * 0.05 +
-            (100 - meditation_benefit) * 0.05
+            (100 - meditation_benefit) * 0.05,
+            0, 100
         )
         
-        stress_score = max(0, min(100, stress_score))  # Clamp 0-100
-        
         return {
-            "overall_score": round(stress_score, 2),
-            "risk_level": self._get_risk_level(stress_score),
+            "overall_score": stress_score,
+            "risk_level": np.array(RISK_LEVELS)[np.digitize(stress_score, RISK_LEVEL_BINS)],
             "components": {
-                "work_stress": round(work_stress, 2),
-                "sleep_stress": round(sleep_stress, 2),
-                "exercise_stress": round(exercise_stress, 2),
-                "mood_stress": round(mood_stress, 2),
-                "meeting_stress": round(meetings_stress, 2),
-                "caffeine_stress": round(caffeine_stress, 2),
-                "meditation_benefit": round(meditation_benefit, 2)
+                "work_stress": work_stress,
+                "sleep_stress": sleep_stress,
+                "exercise_stress": exercise_stress,
+                "mood_stress": mood_stress,
+                "meeting_stress": meetings_stress,
+                "caffeine_stress": caffeine_stress,
+                "meditation_benefit": meditation_benefit
             }
         }
     
-    def _get_risk_level(self, score: float) -> str:
-        """Determine risk level from score"""
-        if score < 30:
-            return "low"
-        elif score < 60:
-            return "moderate"
-        elif score < 80:
-            return "high"
-        else:
-            return "critical"
-    
     def predict_health_risks(self, health_history: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Predict health risks based on historical health metrics
         """
+        recent_metrics = health_history[-RISK_WINDOW_DAYS:]
+        columns = list(TREND_METRIC_DEFAULTS)
+        values = np.array(
+            [[m.get(name, TREND_METRIC_DEFAULTS[name]) for name in columns] for m in recent_metrics],
+            dtype=np.float64
+        ).reshape(1, len(recent_metrics), len(columns))
+        cohort = self.predict_health_risks_cohort(values, columns, predict=False)
         
-        recent_metrics = health_history[-30:] if len(health_history) > 30 else health_history
-        
-        # Calculate trends
-        stress_scores = [m.get("stress_score", 50) for m in recent_metrics]
-        sleep_hours = [m.get("sleep_hours", 7) for m in recent_metrics]
-        exercise_minutes = [m.get("exercise_minutes", 30) for m in recent_metrics]
-        
-        stress_trend = self._calculate_trend(stress_scores)
-        sleep_trend = self._calculate_trend(sleep_hours)
-        exercise_trend = self._calculate_trend(exercise_minutes)
-        
-        # Identify risks
-        risks = []
-        
-        if np.mean(stress_scores) > 70:
-            risks.append({
-                "type": "high_stress",
-                "severity": "high",
-                "description": "Chronic stress levels elevated",
-                "recommendation": "Increase meditation/yoga, reduce work hours"
-            })
-        
-        if np.mean(sleep_hours) < 6:
-            risks.append({
-                "type": "sleep_deprivation",
-                "severity": "high",
-                "description": "Insufficient sleep detected",
-                "recommendation": "Maintain consistent sleep schedule, avoid screens 1h before bed"
-            })
-        
-        if np.mean(exercise_minutes) < 20:
-            risks.append({
-                "type": "physical_inactivity",
-                "severity": "moderate",
-                "description": "Low physical activity",
-                "recommendation": "Aim for 30-60 minutes daily exercise"
-            })
-        
-        if stress_trend > 0:
-            risks.append({
-                "type": "rising_stress",
-                "severity": "moderate",
-                "description": "Stress levels trending upward",
-                "recommendation": "Monitor stress carefully, take preventive action"
-            })
+        risks = [
+            {"type": name, "severity": severity, "description": description, "recommendation": recommendation}
+            for name, (severity, description, recommendation) in HEALTH_RISKS.items()
+            if cohort["risks"][name][0]
+        ]
+        
+        predicted = self.predict_stress_interval(recent_metrics[-1:]) if recent_metrics else None
+        predicted_level = self.predict_stress_level(recent_metrics[-1:]) if recent_metrics else None
         
         return {
             "identified_risks": risks,
             "risk_count": len(risks),
+            "predicted_stress": predicted[0] if predicted else None,
+            "predicted_risk_level": predicted_level[0] if predicted_level else None,
             "trends": {
-                "stress": stress_trend,
-                "sleep": sleep_trend,
-                "exercise": exercise_trend
+                "stress": float(cohort["trends"]["stress_score"][0]),
+                "sleep": float(cohort["trends"]["sleep_hours"][0]),
+                "exercise": float(cohort["trends"]["exercise_minutes"][0])
             },
-            "recommendations": self._generate_health_recommendations(risks, stress_trend)
+            "recommendations": [
+                text for code, text in HEALTH_RECOMMENDATIONS.items() if cohort["recommendations"][code][0]
+            ]
         }
     
-    def _calculate_trend(self, values: List[float]) -> float:
-        """Calculate linear trend"""
-        if len(values) < 2:
-            return 0
+    def predict_health_risks_cohort(
+        self,
+        values: np.ndarray,
+        columns: List[str],
+        predict: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Health risks for many users at once (daily risk sweep)
         
-        x = np.arange(len(values))
-        y = np.array(values)
+        Args:
+            values: (n_users, n_days, n_metrics) array of daily metrics, oldest day
+                first; only the last RISK_WINDOW_DAYS are used. NaN means missing.
+            columns: Metric name of each slice of the last axis; absent or missing
+                metrics take their defaults (TREND_METRIC_DEFAULTS, RISK_FEATURE_DEFAULTS)
+            predict: Also run the risk predictor on each user's last day
         
-        # Linear regression
-        coeffs = np.polyfit(x, y, 1)
-        return float(coeffs[0])  # Slope
-    
-    def _generate_health_recommendations(self, risks: List[Dict], stress_trend: float) -> List[str]:
-        """Generate health recommendations"""
-        recommendations = []
+        Returns:
+            Columnar arrays over users: per-metric means and least-squares slopes,
+            one boolean array per HEALTH_RISKS type, risk_count, one boolean array
+            per HEALTH_RECOMMENDATIONS code and, when the risk predictor is loaded,
+            predicted_stress {"score", "lower", "upper"}
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim != 3 or values.shape[2] != len(columns):
+            raise ValueError(f"Expected a (users, days, {len(columns)}) array, got shape {values.shape}")
+        values = values[:, -RISK_WINDOW_DAYS:]
+        n_users, n_days, _ = values.shape
+        index = {name: j for j, name in enumerate(columns)}
         
-        if stress_trend > 0.1:
-            recommendations.append("⚠️ Stress is increasing - implement daily stress management")
+        def metric(name: str, default: float) -> np.ndarray:
+            if name not in index:
+                return np.full((n_users, n_days), float(default))
+            column = values[:, :, index[name]]
+            return np.where(np.isnan(column), default, column)
         
-        if any(r["type"] == "sleep_deprivation" for r in risks):
-            recommendations.append("😴 Prioritize sleep - aim for consistent 7-8 hours daily")
+        # Least-squares slope against day number: sum((x - mean x) * y) / sum((x - mean x)^2)
+        x = np.arange(n_days, dtype=np.float64)
+        x_centered = x - x.mean() if n_days else x
+        sxx = float(x_centered @ x_centered)
         
-        if any(r["type"] == "physical_inactivity" for r in risks):
-            recommendations.append("🏃 Increase physical activity - 30-60 minutes daily exercise")
+        means, trends = {}, {}
+        for name, default in TREND_METRIC_DEFAULTS.items():
+            y = metric(name, default)
+            means[name] = y.mean(axis=1) if n_days else np.full(n_users, np.nan)
+            trends[name] = y @ x_centered / sxx if sxx > 0 else np.zeros(n_users)
         
-        if any(r["type"] == "high_stress" for r in risks):
-            recommendations.append("🧘 Try meditation - even 10 minutes daily helps")
+        risks = {
+            "high_stress": means["stress_score"] > 70,
+            "sleep_deprivation": means["sleep_hours"] < 6,
+            "physical_inactivity": means["exercise_minutes"] < 20,
+            "rising_stress": trends["stress_score"] > 0,
+        }
+        recommendations = {
+            "stress_increasing": trends["stress_score"] > 0.1,
+            "prioritize_sleep": risks["sleep_deprivation"],
+            "increase_activity": risks["physical_inactivity"],
+            "try_meditation": risks["high_stress"],
+            "track_metrics": np.ones(n_users, dtype=bool),
+        }
         
-        recommendations.append("📊 Track metrics regularly to monitor trends")
+        predicted = None
+        if predict and self.risk_model is not None and n_users and n_days:
+            last_day = np.column_stack([
+                metric(name, default)[:, -1] for name, default in RISK_FEATURE_DEFAULTS.items()
+            ])
+            score, lower, upper = self._run_model("risk", last_day, self._risk_intervals)
+            predicted = {"score": score, "lower": lower, "upper": upper}
         
-        return recommendations
+        return {
+            "means": means,
+            "trends": trends,
+            "risks": risks,
+            "risk_count": np.stack(list(risks.values())).sum(axis=0),
+            "recommendations": recommendations,
+            "predicted_stress": predicted
+        }
     
     def suggest_wellness_routine(self, stress_level: str) -> Dict[str, List[str]]:
         """
@@ -0,0 +1,234 @@
+"""
+Stepwise ARIMA order selection
+
+Replaces the exhaustive (p, d, q) grid used in training. For every differencing
+order d the differenced series is computed once and ARMA(p, q) candidates are fitted
+to it, starting from a few standard orders and then moving to neighbouring orders
+(p +/- 1, q +/- 1) of the current best until no neighbour improves the AIC. Each wave
+of candidates is fitted in parallel on the fitting service process pool.
+
+AICs of differenced fits only rank orders within one d, so each d's winner is refit
+on the original series (the criterion of the old grid) to compare across d. A d whose
+first-wave winner is already far behind the best refit is not explored further.
+"""
+
+import logging
+import time
+import warnings
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.utils.fitting_service import FittingService
+
+logger = logging.getLogger(__name__)
+
+# AIC gap after which a differencing order is abandoned after its first wave
+PRUNE_AIC_MARGIN = 10.0
+MAX_STEPS = 20
+
+Order = Tuple[int, int, int]
+
+
+@dataclass
+class CandidateFit:
+    """Outcome of fitting one candidate order"""
+    order: Order
+    aic: Optional[float]
+    fit_seconds: float
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.aic is not None and np.isfinite(self.aic)
+
+
+@dataclass
+class OrderSelectionResult:
+    """Selected order, its fitted model on the original series and the search log"""
+    order: Order
+    aic: float
+    model: Any
+    candidates: List[CandidateFit] = field(default_factory=list)
+    pruned_d: List[int] = field(default_factory=list)
+    total_seconds: float = 0.0
+
+    @property
+    def failures(self) -> List[CandidateFit]:
+        return [c for c in self.candidates if not c.ok]
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Per-candidate AIC, fit time and error, in fit order"""
+        return [asdict(c) for c in self.candidates]
+
+
+def fit_candidate(diffed: np.ndarray, p: int, q: int, trend: str) -> Tuple[Optional[float], float, Optional[str]]:
+    """Fit ARMA(p, q) to an already-differenced series; returns (aic, seconds, error)"""
+    from statsmodels.tsa.arima.model import ARIMA
+
+    start = time.perf_counter()
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            aic = float(ARIMA(diffed, order=(p, 0, q), trend=trend).fit().aic)
+        return aic, time.perf_counter() - start, None
+    except Exception as e:
+        return None, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+
+
+class StepwiseOrderSelector:
+    """
+    Stepwise auto-ARIMA over p < max_p, d < max_d, q < max_q (same bounds as the
+    grid it replaces). Pass a started FittingService to fit candidates in parallel;
+    without one candidates are fitted inline.
+    """
+
+    def __init__(
+        self,
+        max_p: int = 3,
+        max_d: int = 2,
+        max_q: int = 3,
+        fitting_service: Optional[FittingService] = None,
+        prune_margin: float = PRUNE_AIC_MARGIN,
+        max_steps: int = MAX_STEPS,
+    ):
+        self.max_p = max_p
+        self.max_d = max_d
+        self.max_q = max_q
+        self.fitting_service = fitting_service
+        self.prune_margin = prune_margin
+        self.max_steps = max_steps
+
+    def _start_orders(self) -> List[Tuple[int, int]]:
+        starts = [(2, 2), (0, 0), (1, 0), (0, 1)]
+        return [(p, q) for p, q in starts if p < self.max_p and q < self.max_q]
+
+    def _neighbours(self, p: int, q: int) -> List[Tuple[int, int]]:
+        moves = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, 1)]
+        return [
+            (p + dp, q + dq) for dp, dq in moves
+            if 0 <= p + dp < self.max_p and 0 <= q + dq < self.max_q
+        ]
+
+    def _fit_wave(self, diffed: np.ndarray, d: int, orders: List[Tuple[int, int]]) -> List[CandidateFit]:
+        trend = "c" if d == 0 else "n"
+        if self.fitting_service is not None:
+            futures: List[Future] = [
+                self.fitting_service.submit(fit_candidate, diffed, p, q, trend) for p, q in orders
+            ]
+            outcomes = [future.result() for future in futures]
+        else:
+            outcomes = [fit_candidate(diffed, p, q, trend) for p, q in orders]
+        return [
+            CandidateFit(order=(p, d, q), aic=aic, fit_seconds=seconds, error=error)
+            for (p, q), (aic, seconds, error) in zip(orders, outcomes)
+        ]
+
+    def _refit(self, values: np.ndarray, order: Order, refits: Dict[Order, Any]) -> Any:
+        """Fit `order` on the original series (cached); these AICs are comparable across d"""
+        from statsmodels.tsa.arima.model import ARIMA
+
+        if order not in refits:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                refits[order] = ARIMA(values, order=order).fit()
+        return refits[order]
+
+    def select(self, values: np.ndarray) -> OrderSelectionResult:
+        """Search orders on `values` and return the best one fitted on the original series"""
+        start = time.perf_counter()
+        values = np.asarray(values, dtype=np.float64)
+        candidates: List[CandidateFit] = []
+        pruned_d: List[int] = []
+        refits: Dict[Order, Any] = {}
+        best_model = None
+
+        # Differenced series cache: each level is one np.diff of the previous
+        diffed = {0: values}
+        for d in range(1, self.max_d):
+            diffed[d] = np.diff(diffed[d - 1])
+
+        for d in range(self.max_d):
+            visited: Set[Tuple[int, int]] = set()
+            wave = self._start_orders()
+            best_d: Optional[CandidateFit] = None
+
+            for step in range(self.max_steps):
+                wave = [order for order in wave if order not in visited]
+                if not wave:
+                    break
+                visited.update(wave)
+                fits = self._fit_wave(diffed[d], d, wave)
+                candidates.extend(fits)
+
+                improved = False
+                for fit in fits:
+                    if fit.ok and (best_d is None or fit.aic < best_d.aic):
+                        best_d, improved = fit, True
+
+                if best_d is None:
+                    break
+                if step == 0 and best_model is not None:
+                    # Differenced-series AICs are only comparable within one d
+                    first_wave_aic = self._refit(values, best_d.order, refits).aic
+                    if first_wave_aic > best_model.aic + self.prune_margin:
+                        pruned_d.append(d)
+                        best_d = None
+                        break
+                if not improved:
+                    break
+                wave = self._neighbours(best_d.order[0], best_d.order[2])
+
+            if best_d is not None:
+                model = self._refit(values, best_d.order, refits)
+                if best_model is None or model.aic < best_model.aic:
+                    best_model = model
+
+        if best_model is None:
+            raise ValueError(f"All {len(candidates)} ARIMA candidates failed to fit")
+
+        result = OrderSelectionResult(
+            order=tuple(int(k) for k in best_model.model.order),
+            aic=float(best_model.aic),
+            model=best_model,
+            candidates=candidates,
+            pruned_d=pruned_d,
+            total_seconds=time.perf_counter() - start,
+        )
+        log_selection(result)
+        return result
+
+
+def log_selection(result: OrderSelectionResult):
+    """Log the per-candidate table and a summary line"""
+    for c in result.candidates:
+        status = f"AIC {c.aic:.2f}" if c.ok else f"FAILED ({c.error})"
+        logger.info(f"    ARIMA{c.order}: {status} in {c.fit_seconds * 1000:.0f} ms")
+    if result.pruned_d:
+        logger.info(f"    Pruned d={result.pruned_d} after the first wave")
+    logger.info(
+        f"  Best ARIMA order: {result.order} (AIC: {result.aic:.2f}) - "
+        f"{len(result.candidates)} candidates, {len(result.failures)} failed, "
+        f"{result.total_seconds:.1f}s"
+    )
+
+
+def select_arima_order(
+    values: np.ndarray,
+    max_p: int = 3,
+    max_d: int = 2,
+    max_q: int = 3,
+    n_jobs: int = 1,
+) -> OrderSelectionResult:
+    """Convenience wrapper for the training scripts; n_jobs > 1 uses a private process pool"""
+    if n_jobs <= 1:
+        return StepwiseOrderSelector(max_p, max_d, max_q).select(values)
+
+    # Each wave holds at most 6 candidates, so the queue bound never rejects
+    service = FittingService(max_workers=n_jobs, max_pending=64).start()
+    try:
+        return StepwiseOrderSelector(max_p, max_d, max_q, fitting_service=service).select(values)
+    finally:
+        service.shutdown()
@@ -0,0 +1,147 @@
+"""
+FFT seasonality analysis
+
+One zero-padded real FFT of the detrended series gives both the periodogram and,
+through the Wiener-Khinchin relation, the full autocorrelation function in
+O(n log n). Periodogram peaks propose candidate periods; the ACF at each candidate
+lag scores its strength. Results are memoized per series content so the SARIMA
+fallback, the recommendations and the API can all ask for the same summary.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+# Season length used when no clear seasonality is found (monthly data)
+DEFAULT_SEASON_PERIOD = 12
+# Minimum autocorrelation at the candidate lag to call a series seasonal
+MIN_STRENGTH = 0.3
+MAX_CANDIDATES = 5
+# A divisor of the strongest period wins if it keeps this share of its strength
+HARMONIC_TOLERANCE = 0.85
+# Detrended residual energy below this share of the raw variance counts as no variation
+# (constant and exactly linear series leave only floating-point noise)
+FLAT_TOLERANCE = 1e-10
+
+
+@dataclass
+class SeasonalitySummary:
+    """Spectral summary of one series"""
+    acf: np.ndarray                       # lags 0..n-1, acf[0] == 1
+    frequencies: np.ndarray               # cycles per observation
+    power: np.ndarray                     # periodogram at `frequencies`
+    candidates: List[Tuple[int, float]] = field(default_factory=list)  # (period, strength), strongest first
+
+    @property
+    def has_seasonality(self) -> bool:
+        return bool(self.candidates) and self.candidates[0][1] >= MIN_STRENGTH
+
+    @property
+    def season_period(self) -> int:
+        return self.candidates[0][0] if self.has_seasonality else DEFAULT_SEASON_PERIOD
+
+    @property
+    def strength(self) -> float:
+        return self.candidates[0][1] if self.candidates else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "has_seasonality": self.has_seasonality,
+            "season_period": self.season_period,
+            "strength": self.strength,
+            "candidates": [{"period": p, "strength": s} for p, s in self.candidates],
+        }
+
+
+def analyze_seasonality(values: np.ndarray, max_candidates: int = MAX_CANDIDATES) -> SeasonalitySummary:
+    """
+    ACF, periodogram and candidate periods of a series in one FFT pass.
+    Candidate periods lie in [2, n/2]; strength is the ACF at that lag.
+    """
+    y = np.asarray(values, dtype=np.float64)
+    n = len(y)
+    if n < 4:
+        return SeasonalitySummary(acf=np.ones(min(n, 1)), frequencies=np.empty(0), power=np.empty(0))
+
+    # Remove the linear trend so it does not show up as autocorrelation at every lag
+    t = np.arange(n)
+    slope, intercept = np.polyfit(t, y, 1)
+    x = y - (slope * t + intercept)
+
+    # Zero-pad to >= 2n so the circular correlation equals the linear one
+    nfft = 1 << int(np.ceil(np.log2(2 * n)))
+    spectrum = np.fft.rfft(x, nfft)
+    power = spectrum.real ** 2 + spectrum.imag ** 2
+
+    autocov = np.fft.irfft(power, nfft)[:n]
+    flat = autocov[0] <= FLAT_TOLERANCE * n * max(np.var(y), 1e-12)
+    acf = np.zeros(n) if flat else autocov / autocov[0]
+    frequencies = np.fft.rfftfreq(nfft)
+
+    candidates: Dict[int, float] = {}
+    if not flat:
+        # Local maxima of the periodogram, largest first (skip the zero frequency)
+        interior = power[1:-1]
+        peaks = np.flatnonzero((interior > power[:-2]) & (interior >= power[2:])) + 1
+        peaks = peaks[np.argsort(power[peaks])[::-1]]
+
+        for k in peaks:
+            period = nfft / k
+            if not 2 <= period <= n / 2:
+                continue
+            # The padded grid is finer than integer periods: score the nearest lags
+            for lag in {int(np.floor(period)), int(np.ceil(period))}:
+                if 2 <= lag <= n // 2 and lag not in candidates and acf[lag] > 0:
+                    candidates[lag] = float(acf[lag])
+            if len(candidates) >= 2 * max_candidates:
+                break
+
+    ranked = _prefer_fundamental(sorted(candidates.items(), key=lambda item: item[1], reverse=True))
+    return SeasonalitySummary(acf=acf, frequencies=frequencies, power=power, candidates=ranked[:max_candidates])
+
+
+def _prefer_fundamental(ranked: List[Tuple[int, float]], tolerance: float = HARMONIC_TOLERANCE) -> List[Tuple[int, float]]:
+    """
+    A seasonal series also correlates at multiples of its period; move a shorter
+    period to the front when the winner is (about) a multiple of it and nearly as strong.
+    """
+    if not ranked:
+        return ranked
+    best_period, best_strength = ranked[0]
+    for period, strength in sorted(ranked[1:]):
+        multiple = round(best_period / period)
+        if multiple >= 2 and abs(best_period - multiple * period) <= 1 and strength >= tolerance * best_strength:
+            return [(period, strength)] + [c for c in ranked if c[0] != period]
+    return ranked
+
+
+class SeasonalityAnalyzer:
+    """Memoizes `analyze_seasonality` by series content (thread-safe LRU)"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, SeasonalitySummary]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(values: np.ndarray) -> str:
+        return hashlib.blake2b(np.ascontiguousarray(values, dtype=np.float64).tobytes(), digest_size=16).hexdigest()
+
+    def analyze(self, values: np.ndarray) -> SeasonalitySummary:
+        key = self._key(values)
+        with self._lock:
+            summary = self._cache.get(key)
+            if summary is not None:
+                self._cache.move_to_end(key)
+                return summary
+
+        summary = analyze_seasonality(values)
+        with self._lock:
+            self._cache[key] = summary
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return summary
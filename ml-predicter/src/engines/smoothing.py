@@ -0,0 +1,180 @@
+"""
+Batched additive Holt-Winters (ETS(A,A,A) / ETS(A,A,N)) in NumPy
+
+The smoothing recursions run over a (series x candidates) matrix, one time step
+at a time, so a whole group of equal-length series is fitted against the full
+parameter grid in a single pass. Each series keeps the grid point with the
+lowest one-step-ahead squared error. Large groups are fitted in chunks of series
+so the (series x candidates x season) state stays within MAX_STATE_ELEMENTS.
+"""
+
+from dataclasses import dataclass, replace
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from src.engines.state_space import Z_95, forecast_intervals
+
+ALPHA_GRID = (0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 0.9)
+BETA_GRID = (0.01, 0.05, 0.1, 0.2, 0.3)
+GAMMA_GRID = (0.01, 0.05, 0.1, 0.2, 0.4)
+# Largest seasonal state array per chunk (float64: 2M elements = 16 MB); the per-step
+# temporaries are (series x candidates), a season length smaller
+MAX_STATE_ELEMENTS = 2_000_000
+
+
+@dataclass
+class HoltWintersFit:
+    """Per-series parameters and end-of-sample states for a batch of fits"""
+    alpha: np.ndarray      # (n_series,)
+    beta: np.ndarray       # (n_series,)
+    gamma: np.ndarray      # (n_series,), zero without seasonality
+    level: np.ndarray      # (n_series,)
+    trend: np.ndarray      # (n_series,)
+    seasonal: np.ndarray   # (n_series, season_period), next period first
+    sigma2: np.ndarray     # (n_series,) one-step error variance
+    season_period: int
+
+    def forecast(self, periods: int, z: float = Z_95):
+        """
+        Point forecasts and prediction intervals, each (n_series, periods).
+        Uses the closed-form ETS(A,A,A) variance
+        sigma^2 * (1 + sum_{j<h} (alpha + alpha*beta*j + gamma*[j % m == 0])^2).
+        """
+        h = np.arange(1, periods + 1)
+        m = self.season_period
+        seasonal = self.seasonal[:, (h - 1) % m] if m > 1 else 0.0
+        mean = self.level[:, None] + h[None, :] * self.trend[:, None] + seasonal
+
+        j = np.arange(1, periods)
+        psi = self.alpha[:, None] * (1 + self.beta[:, None] * j[None, :])
+        if m > 1:
+            psi = psi + self.gamma[:, None] * (j % m == 0)[None, :]
+        cumulative = np.concatenate([np.zeros((len(mean), 1)), np.cumsum(psi ** 2, axis=1)], axis=1)
+        var = self.sigma2[:, None] * (1 + cumulative)
+
+        ci_lower, ci_upper = forecast_intervals(mean, var, z)
+        return mean, ci_lower, ci_upper
+
+    def update(self, y: np.ndarray) -> "HoltWintersFit":
+        """Advance the states by one observation per series, keeping the fitted parameters"""
+        y = np.asarray(y, dtype=np.float64)
+        m = self.season_period
+        s = self.seasonal[:, 0] if m > 1 else 0.0
+        error = y - (self.level + self.trend + s)
+
+        seasonal = self.seasonal
+        if m > 1:
+            # The updated factor is used again m periods ahead, at the end of the rotation
+            seasonal = np.roll(seasonal, -1, axis=1)
+            seasonal[:, -1] = s + self.gamma * error
+        return replace(
+            self,
+            level=self.level + self.trend + self.alpha * error,
+            trend=self.trend + self.alpha * self.beta * error,
+            seasonal=seasonal,
+        )
+
+
+def _initial_states(Y: np.ndarray, m: int):
+    """Classical start values: first-season mean level, season-over-season trend"""
+    if m > 1:
+        first, second = Y[:, :m], Y[:, m:2 * m]
+        level = first.mean(axis=1)
+        trend = (second.mean(axis=1) - level) / m
+        seasonal = first - level[:, None]
+    else:
+        level = Y[:, 0]
+        trend = Y[:, 1] - Y[:, 0]
+        seasonal = np.zeros((len(Y), 1))
+    return level, trend, seasonal
+
+
+def fit_holt_winters_batch(
+    Y: np.ndarray,
+    season_period: int = 12,
+    alphas: Sequence[float] = ALPHA_GRID,
+    betas: Sequence[float] = BETA_GRID,
+    gammas: Sequence[float] = GAMMA_GRID,
+) -> HoltWintersFit:
+    """
+    Fit additive Holt-Winters to every row of Y by grid search.
+
+    Args:
+        Y: (n_series, n_obs) matrix without missing values
+        season_period: Season length; seasonality is dropped when fewer than two
+            full seasons are observed or the period is 1
+
+    Returns:
+        HoltWintersFit with the best grid point per series
+    """
+    Y = np.atleast_2d(np.asarray(Y, dtype=np.float64))
+    n_series, n_obs = Y.shape
+    if np.isnan(Y).any():
+        raise ValueError("Holt-Winters batch fitting requires series without missing values")
+    if n_obs < 3:
+        raise ValueError("Holt-Winters needs at least 3 observations")
+
+    m = season_period if season_period > 1 and n_obs >= 2 * season_period else 1
+    if m == 1:
+        gammas = (0.0,)
+
+    grid = np.array(np.meshgrid(alphas, betas, gammas, indexing="ij")).reshape(3, -1)
+    chunk = max(1, MAX_STATE_ELEMENTS // (grid.shape[1] * m))
+    fits = [_fit_chunk(Y[i:i + chunk], m, grid) for i in range(0, n_series, chunk)]
+    return HoltWintersFit(
+        **{name: np.concatenate([fit[name] for fit in fits]) for name in fits[0]},
+        season_period=m,
+    )
+
+
+def _fit_chunk(Y: np.ndarray, m: int, grid: np.ndarray) -> Dict[str, np.ndarray]:
+    """Grid search for a chunk of series; HoltWintersFit fields except season_period"""
+    n_series, n_obs = Y.shape
+    alpha, beta, gamma = (g[None, :] for g in grid)  # (1, n_candidates)
+    n_candidates = grid.shape[1]
+
+    level0, trend0, seasonal0 = _initial_states(Y, m)
+    level = np.repeat(level0[:, None], n_candidates, axis=1)
+    trend = np.repeat(trend0[:, None], n_candidates, axis=1)
+    # Ring buffer of seasonal states; slot t % m holds the factor for time t
+    seasonal = np.repeat(seasonal0[:, None, :], n_candidates, axis=1)
+    sse = np.zeros((n_series, n_candidates))
+
+    start = m if m > 1 else 1
+    for t in range(start, n_obs):
+        y = Y[:, t][:, None]
+        slot = t % m
+        s = seasonal[:, :, slot] if m > 1 else 0.0
+        error = y - (level + trend + s)
+        sse += error ** 2
+
+        new_level = level + trend + alpha * error
+        trend = trend + alpha * beta * error
+        if m > 1:
+            seasonal[:, :, slot] = s + gamma * error
+        level = new_level
+
+    best = np.argmin(sse, axis=1)
+    rows = np.arange(n_series)
+    if m > 1:
+        # Rotate so column 0 is the factor for the first forecast period
+        order = (np.arange(m) + n_obs) % m
+        final_seasonal = seasonal[rows, best][:, order]
+    else:
+        final_seasonal = np.zeros((n_series, 1))
+
+    return {
+        "alpha": grid[0, best],
+        "beta": grid[1, best],
+        "gamma": grid[2, best],
+        "level": level[rows, best],
+        "trend": trend[rows, best],
+        "seasonal": final_seasonal,
+        "sigma2": sse[rows, best] / max(n_obs - start, 1),
+    }
+
+
+def season_period_for_frequency(freq: Optional[str]) -> int:
+    """Season length implied by a sampling frequency code (D/W/M)"""
+    return {"D": 7, "W": 52, "M": 12}.get(freq or "", 12)
@@ -0,0 +1,122 @@
+"""
+NumPy Kalman filter for time-invariant univariate state-space models
+
+Used to condition pre-trained ARIMA/SARIMA parameters on a user's own series
+without refitting. For a fixed model and series length the state covariance
+recursion does not depend on the data, so it is computed once and shared by a
+whole batch of series; only the state means are carried per series.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Tuple
+
+import numpy as np
+
+# norm.ppf(0.975), matches statsmodels' default 95% intervals
+Z_95 = 1.959963984540054
+
+
+@dataclass
+class StateSpaceSystem:
+    """System matrices of y_t = Z a_t + d + e_t,  a_{t+1} = T a_t + c + R n_t"""
+    design: np.ndarray            # Z, (k,)
+    obs_intercept: float          # d
+    obs_cov: float                # H
+    transition: np.ndarray        # T, (k, k)
+    state_intercept: np.ndarray   # c, (k,)
+    state_cov: np.ndarray         # R Q R', (k, k)
+    initial_state: np.ndarray     # a_1, (k,)
+    initial_state_cov: np.ndarray # P_1, (k, k)
+
+    @classmethod
+    def from_statsmodels(cls, model_type: Any, init_kwds: dict, params: np.ndarray) -> "StateSpaceSystem":
+        """Extract matrices and the default initialization from a statsmodels MLEModel"""
+        model = model_type(np.zeros(2), **init_kwds)
+        results = model.filter(params)
+        ssm = model.ssm
+
+        selection = _time_invariant(ssm["selection"], 2, "selection")
+        return cls(
+            design=_time_invariant(ssm["design"], 2, "design")[0],
+            obs_intercept=float(_time_invariant(ssm["obs_intercept"], 1, "obs_intercept")[0]),
+            obs_cov=float(_time_invariant(ssm["obs_cov"], 2, "obs_cov")[0, 0]),
+            transition=_time_invariant(ssm["transition"], 2, "transition"),
+            state_intercept=_time_invariant(ssm["state_intercept"], 1, "state_intercept"),
+            state_cov=selection @ _time_invariant(ssm["state_cov"], 2, "state_cov") @ selection.T,
+            initial_state=np.array(results.predicted_state[:, 0], dtype=np.float64),
+            initial_state_cov=np.array(results.predicted_state_cov[:, :, 0], dtype=np.float64),
+        )
+
+    @property
+    def k_states(self) -> int:
+        return self.transition.shape[0]
+
+    def filter(self, Y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run the filter over a batch of equal-length series.
+
+        Args:
+            Y: (n_series, n_obs) observations without missing values
+
+        Returns:
+            (a, P): predicted states for the period after the sample, (n_series, k),
+            and their shared covariance, (k, k)
+        """
+        Y = np.atleast_2d(np.asarray(Y, dtype=np.float64))
+        if np.isnan(Y).any():
+            raise ValueError("Batch filtering requires series without missing values")
+
+        a = np.repeat(self.initial_state[None, :], Y.shape[0], axis=0)
+        P = self.initial_state_cov.copy()
+        for t in range(Y.shape[1]):
+            a, P = self.step(a, P, Y[:, t])
+        return a, P
+
+    def step(self, a: np.ndarray, P: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Advance predicted state (a, P) by one observation y (one value per series)"""
+        Z, T = self.design, self.transition
+        v = y - (a @ Z + self.obs_intercept)
+        PZ = P @ Z
+        F = Z @ PZ + self.obs_cov
+        K = T @ PZ / F
+        a = a @ T.T + self.state_intercept + np.outer(v, K)
+        P = T @ P @ T.T + self.state_cov - np.outer(K, K) * F
+        return a, P
+
+    def forecast(self, a: np.ndarray, P: np.ndarray, steps: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Multi-step forecasts from predicted state (a, P).
+
+        Returns:
+            mean (n_series, steps) and variance (steps,) shared by the batch
+        """
+        a = np.atleast_2d(a)
+        Z, T = self.design, self.transition
+        mean = np.empty((a.shape[0], steps))
+        var = np.empty(steps)
+        for h in range(steps):
+            mean[:, h] = a @ Z + self.obs_intercept
+            var[h] = Z @ P @ Z + self.obs_cov
+            a = a @ T.T + self.state_intercept
+            P = T @ P @ T.T + self.state_cov
+        return mean, var
+
+
+def _time_invariant(matrix: np.ndarray, ndim: int, name: str) -> np.ndarray:
+    """
+    Collapse a system matrix to its time-invariant form.
+    statsmodels stores e.g. a constant mean as a per-period obs_intercept; that is
+    accepted as long as every period holds the same value.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    if matrix.ndim == ndim:
+        return matrix
+    if not np.all(matrix == matrix[..., :1]):
+        raise ValueError(f"Time-varying {name} is not supported")
+    return np.ascontiguousarray(matrix[..., 0])
+
+
+def forecast_intervals(mean: np.ndarray, var: np.ndarray, z: float = Z_95) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric normal intervals around `mean` with per-step variance `var`"""
+    half_width = z * np.sqrt(np.maximum(var, 0))
+    return mean - half_width, mean + half_width
@@ -0,0 +1,220 @@
+"""
+Incremental (one observation at a time) income forecasting
+
+A user's series is summarized by a small state: the Kalman predicted state and
+covariance of each pretrained ARIMA/SARIMA system and the Holt-Winters level,
+trend and seasonal factors. Appending an observation advances each of them by
+one step, so the cost of a new point does not depend on the history length.
+The RF sub-model only needs the last date and the global panel model the
+last few observations (its longest lag).
+
+Holt-Winters parameters stay at the values chosen when the state was created;
+re-initializing from the full history refits them.
+"""
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.engines.feature_builder import future_dates
+from src.engines.forecast_engine import IncomeForecastEngine
+from src.engines.smoothing import HoltWintersFit, fit_holt_winters_batch, season_period_for_frequency
+from src.engines.state_space import forecast_intervals
+
+STATE_VERSION = 1
+
+
+@dataclass
+class StreamState:
+    """JSON-serializable per-user filter state"""
+    engine_key: str
+    last_date: str
+    last_value: float
+    n_obs: int
+    freq: str
+    kalman: Dict[str, Dict[str, List]] = field(default_factory=dict)   # name -> {"a", "P"}
+    smoothing: Optional[Dict[str, Any]] = None                         # HoltWintersFit fields
+    recent: Optional[List[float]] = None                               # global model lag window
+    version: int = STATE_VERSION
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Optional["StreamState"]:
+        """None for states written by an incompatible version"""
+        if data.get("version") != STATE_VERSION:
+            return None
+        return cls(**data)
+
+
+class StreamingForecaster:
+    """Creates, advances and forecasts from StreamStates with an engine's models"""
+
+    def __init__(self, engine: IncomeForecastEngine):
+        self.engine = engine
+        # States are only valid for the model versions and config that produced them
+        fingerprint = json.dumps(engine.fingerprint(), sort_keys=True, default=str)
+        self.engine_key = hashlib.sha256(fingerprint.encode()).hexdigest()[:16]
+
+    @property
+    def _kalman_models(self) -> List[str]:
+        return [
+            name for name in ("arima", "sarima")
+            if name in self.engine.ensemble_models and self.engine._systems.get(name) is not None
+        ]
+
+    @property
+    def _uses_global(self) -> bool:
+        return "global" in self.engine.ensemble_models and "global" in self.engine.models
+
+    def is_current(self, state: StreamState) -> bool:
+        return state.engine_key == self.engine_key
+
+    def init_state(self, dates: np.ndarray, values: np.ndarray) -> StreamState:
+        """Filter a full history once"""
+        dates, values = self.engine._normalize_series(dates, values)
+        freq = self.engine._infer_frequency(dates)
+
+        kalman = {}
+        for name in self._kalman_models:
+            a, P = self.engine._systems[name].filter(values[None, :])
+            kalman[name] = {"a": a[0].tolist(), "P": P.tolist()}
+
+        smoothing = None
+        if "exponential_smoothing" in self.engine.ensemble_models and len(values) >= 3:
+            fit = fit_holt_winters_batch(values[None, :], season_period_for_frequency(freq))
+            smoothing = _smoothing_to_dict(fit)
+
+        recent = None
+        if self._uses_global:
+            recent = values[-self.engine.models["global"].window:].tolist()
+
+        return StreamState(
+            engine_key=self.engine_key,
+            last_date=str(dates[-1]),
+            last_value=float(values[-1]),
+            n_obs=len(values),
+            freq=freq,
+            kalman=kalman,
+            smoothing=smoothing,
+            recent=recent,
+        )
+
+    def update(self, state: StreamState, date: str, value: Optional[float]) -> StreamState:
+        """
+        Append one observation. For daily series skipped days are forward-filled
+        with the last value, as prepare_data does; other frequencies take one
+        observation per period. A missing value repeats the last one.
+        """
+        date = np.datetime64(date, "D")
+        last_date = np.datetime64(state.last_date, "D")
+        if date <= last_date:
+            raise ValueError(f"Observation date {date} is not after the last observation ({last_date})")
+
+        gap = int((date - last_date).astype(np.int64)) - 1 if state.freq == "D" else 0
+        value = state.last_value if value is None or np.isnan(value) else float(value)
+        observations = np.append(np.full(gap, state.last_value), value)
+
+        for name, saved in state.kalman.items():
+            system = self.engine._systems[name]
+            a, P = np.array([saved["a"]]), np.array(saved["P"])
+            for y in observations:
+                a, P = system.step(a, P, np.array([y]))
+            state.kalman[name] = {"a": a[0].tolist(), "P": P.tolist()}
+
+        if state.smoothing is not None:
+            fit = _smoothing_from_dict(state.smoothing)
+            for y in observations:
+                fit = fit.update(np.array([y]))
+            state.smoothing = _smoothing_to_dict(fit)
+
+        if state.recent is not None:
+            window = self.engine.models["global"].window
+            state.recent = (state.recent + observations.tolist())[-window:]
+
+        state.last_date = str(date)
+        state.last_value = value
+        state.n_obs += len(observations)
+        return state
+
+    def forecast(self, state: StreamState, periods: int) -> Dict[str, Any]:
+        """Ensemble forecast from the state alone, shaped like the batch results"""
+        engine = self.engine
+        forecasts, intervals = {}, {}
+
+        for name, saved in state.kalman.items():
+            mean, var = engine._systems[name].forecast(np.array([saved["a"]]), np.array(saved["P"]), periods)
+            forecasts[name] = mean[0]
+            intervals[name] = forecast_intervals(mean[0], var)
+
+        if "rf" in engine.models and "rf" in engine.ensemble_models:
+            X_future = engine.feature_builder.build_future(
+                np.array([state.last_date], dtype="datetime64[D]"), periods, state.freq
+            )
+            forecasts["rf"] = engine.models["rf"].predict(engine.scalers["rf"].transform(X_future))
+
+        if state.smoothing is not None:
+            mean, ci_lower, ci_upper = _smoothing_from_dict(state.smoothing).forecast(periods)
+            forecasts["exponential_smoothing"] = mean[0]
+            intervals["exponential_smoothing"] = (ci_lower[0], ci_upper[0])
+
+        if state.recent is not None:
+            last_date = np.array([state.last_date], dtype="datetime64[D]")
+            mean, ci_lower, ci_upper = engine.models["global"].forecast_interval(
+                last_date, [np.array(state.recent)], periods, state.freq
+            )
+            forecasts["global"] = mean[0]
+            if ci_lower is not None:
+                intervals["global"] = (ci_lower[0], ci_upper[0])
+
+        if not forecasts:
+            raise ValueError("No incremental sub-model is available")
+
+        ensemble, weights = engine.combine_forecasts(forecasts)
+        if len(forecasts) > 1:
+            ci_lower, ci_upper = engine.ensemble_interval(forecasts, ensemble, weights)
+        else:
+            # A single sub-model keeps its own interval
+            ci_lower, ci_upper = intervals.get(next(iter(forecasts)), (ensemble, ensemble))
+
+        return {
+            "model": "Ensemble",
+            # Steps are at the state's frequency; the history is not resampled as in /income
+            "freq": state.freq,
+            "forecast_dates": [
+                str(d) for d in future_dates(np.array([state.last_date], dtype="datetime64[D]"), periods, state.freq)[0]
+            ],
+            "sub_models": list(forecasts),
+            "weights": weights,
+            "forecast": ensemble.tolist(),
+            "ci_lower": ci_lower.tolist(),
+            "ci_upper": ci_upper.tolist(),
+            "trend": engine._calculate_trend(ensemble),
+            "volatility": float(np.std(ensemble)),
+            "using_pretrained": any(name in forecasts for name in ("arima", "sarima", "rf", "global")),
+        }
+
+
+def _smoothing_to_dict(fit: HoltWintersFit) -> Dict[str, Any]:
+    """First (only) row of a HoltWintersFit as plain floats/lists"""
+    return {
+        "alpha": float(fit.alpha[0]),
+        "beta": float(fit.beta[0]),
+        "gamma": float(fit.gamma[0]),
+        "level": float(fit.level[0]),
+        "trend": float(fit.trend[0]),
+        "seasonal": fit.seasonal[0].tolist(),
+        "sigma2": float(fit.sigma2[0]),
+        "season_period": fit.season_period,
+    }
+
+
+def _smoothing_from_dict(data: Dict[str, Any]) -> HoltWintersFit:
+    return HoltWintersFit(
+        **{name: np.array([data[name]], dtype=np.float64) for name in ("alpha", "beta", "gamma", "level", "trend", "seasonal", "sigma2")},
+        season_period=data["season_period"],
+    )
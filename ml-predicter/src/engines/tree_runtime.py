@@ -0,0 +1,338 @@
+"""
+Flattened tree-ensemble runtime
+
+Fitted sklearn forests and gradient boosting models are converted into flat NumPy
+node arrays (feature, threshold, left, right, value) covering every tree. Prediction
+walks all trees for all rows at once: each step is a few flat gathers over the
+(rows x trees) node matrix, repeated max_depth times. Leaves point to themselves,
+so no masking is needed.
+
+Results match sklearn: inputs are compared as float32 like sklearn's tree code, and
+per-tree outputs are accumulated in estimator order.
+
+Forest regressors also get prediction intervals from the spread of their trees: one
+traversal yields the (rows x trees) matrix of per-tree outputs, whose mean is the
+prediction and whose empirical quantiles bound it.
+
+Flattened models can be saved as one raw array file plus a JSON manifest. Loading
+memory-maps the raw file read-only, so every worker process shares the same
+physical pages and startup costs a page-in instead of an unpickle.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from scipy.special import expit, softmax
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("forest_regressor", "forest_classifier", "boosting_regressor", "boosting_classifier")
+
+FORMAT_VERSION = 1
+MANIFEST_SUFFIX = ".trees.json"
+DATA_SUFFIX = ".trees.bin"
+# Arrays stored in the raw file, in this order, each starting on an aligned offset
+ARRAY_FIELDS = ("feature", "threshold", "children", "value", "roots")
+ALIGNMENT = 64
+
+# Central share of per-tree predictions covered by forest intervals
+DEFAULT_COVERAGE = 0.95
+
+
+class FlatTreeEnsemble:
+    """Tree ensemble as flat node arrays; exposes predict / predict_proba like sklearn"""
+
+    def __init__(
+        self,
+        kind: str,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        n_features: int,
+        classes: Optional[np.ndarray] = None,
+        learning_rate: float = 1.0,
+        baseline: Optional[np.ndarray] = None,
+    ):
+        if kind not in KINDS:
+            raise ValueError(f"Unknown tree ensemble kind: {kind}")
+        # Pointer-sized indices are used as-is by np.take, so memory-mapped arrays are never copied
+        self.kind = kind
+        self.feature = np.asarray(feature, dtype=np.intp)      # (n_nodes,), 0 for leaves
+        self.threshold = np.asarray(threshold, dtype=np.float64)  # (n_nodes,)
+        self.children = np.asarray(children, dtype=np.intp)    # (2 * n_nodes,): left at 2i, right at 2i + 1
+        self.value = np.asarray(value, dtype=np.float64)       # (n_nodes, n_outputs)
+        self.roots = np.asarray(roots, dtype=np.intp)          # (n_trees,)
+        self.max_depth = int(max_depth)
+        self.n_features_in_ = int(n_features)
+        self.classes_ = classes
+        self.learning_rate = float(learning_rate)
+        # Boosting: raw prediction of the init estimator, (n_outputs,)
+        self.baseline = None if baseline is None else np.asarray(baseline, dtype=np.float64)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def left(self) -> np.ndarray:
+        """Global index of each node's left child; leaves point to themselves"""
+        return self.children[0::2]
+
+    @property
+    def right(self) -> np.ndarray:
+        return self.children[1::2]
+
+    @classmethod
+    def from_sklearn(cls, model: Any) -> "FlatTreeEnsemble":
+        """Convert a fitted RandomForest*/ExtraTrees*/GradientBoosting* model"""
+        from sklearn.ensemble import BaseEnsemble, GradientBoostingClassifier, GradientBoostingRegressor
+        from sklearn.base import is_classifier
+
+        if isinstance(model, (GradientBoostingRegressor, GradientBoostingClassifier)):
+            stages = np.asarray(model.estimators_)  # (n_estimators, K)
+            # Column k of every stage feeds output k; trees are stored stage-major
+            trees = [tree.tree_ for stage in stages for tree in stage]
+            n_outputs = stages.shape[1]
+            baseline = np.asarray(model._raw_predict_init(np.zeros((1, model.n_features_in_), dtype=np.float32)))[0]
+            kind = "boosting_classifier" if is_classifier(model) else "boosting_regressor"
+            learning_rate = model.learning_rate
+        elif isinstance(model, BaseEnsemble) and hasattr(model, "estimators_"):
+            trees = [tree.tree_ for tree in model.estimators_]
+            kind = "forest_classifier" if is_classifier(model) else "forest_regressor"
+            if kind == "forest_classifier" and getattr(model, "n_outputs_", 1) != 1:
+                raise ValueError("Multi-output forest classifiers are not supported")
+            n_outputs = trees[0].value.shape[2] if kind == "forest_classifier" else trees[0].value.shape[1]
+            baseline, learning_rate = None, 1.0
+        else:
+            raise ValueError(f"Unsupported model type: {type(model).__name__}")
+
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        n_nodes = int(offsets[-1])
+        feature = np.zeros(n_nodes, dtype=np.intp)
+        threshold = np.zeros(n_nodes, dtype=np.float64)
+        children = np.empty(2 * n_nodes, dtype=np.intp)
+        pairs = children.reshape(n_nodes, 2)  # view: (left, right) per node
+        value = np.empty((n_nodes, n_outputs), dtype=np.float64)
+
+        for tree, start in zip(trees, offsets[:-1]):
+            nodes = slice(start, start + tree.node_count)
+            own = np.arange(start, start + tree.node_count, dtype=np.intp)
+            is_leaf = tree.children_left == -1
+            feature[nodes] = np.where(is_leaf, 0, tree.feature)
+            threshold[nodes] = tree.threshold
+            pairs[nodes, 0] = np.where(is_leaf, own, tree.children_left + start)
+            pairs[nodes, 1] = np.where(is_leaf, own, tree.children_right + start)
+            if kind == "forest_classifier":
+                # Per-tree class distribution, normalized as in DecisionTreeClassifier.predict_proba
+                counts = tree.value[:, 0, :]
+                normalizer = counts.sum(axis=1, keepdims=True)
+                normalizer[normalizer == 0.0] = 1.0
+                value[nodes] = counts / normalizer
+            else:
+                value[nodes] = tree.value[:, :, 0] if kind == "forest_regressor" else tree.value[:, 0, :]
+
+        return cls(
+            kind=kind,
+            feature=feature,
+            threshold=threshold,
+            children=children,
+            value=value,
+            roots=offsets[:-1],
+            max_depth=max(tree.max_depth for tree in trees),
+            n_features=model.n_features_in_,
+            classes=getattr(model, "classes_", None),
+            learning_rate=learning_rate,
+            baseline=baseline,
+        )
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Leaf index (global) reached by every row in every tree, (n_rows, n_trees)"""
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X[None, :]
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[1]} features, model expects {self.n_features_in_}")
+        # sklearn compares float32 inputs against float64 thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32).astype(np.float64)
+
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        row_offset = (np.arange(n_rows, dtype=np.intp) * n_features)[:, None]
+        node = np.repeat(self.roots[None, :], n_rows, axis=0)
+        for _ in range(self.max_depth):
+            x = flat_X.take(row_offset + self.feature.take(node))
+            # Anything that is not <= threshold (including NaN) goes right, as in sklearn
+            go_right = np.logical_not(x <= self.threshold.take(node))
+            node = self.children.take(2 * node + go_right)
+        return node
+
+    def _boosting_raw(self, X: np.ndarray) -> np.ndarray:
+        leaves = self.apply(X)
+        n_outputs = len(self.baseline)
+        n_stages = self.n_trees // n_outputs
+        # Trees are stored stage-major: tree s * K + k is stage s, output k
+        contributions = self.value[leaves, 0].reshape(len(leaves), n_stages, n_outputs) * self.learning_rate
+        staged = np.concatenate([np.broadcast_to(self.baseline, (len(leaves), 1, n_outputs)), contributions], axis=1)
+        # Sequential accumulation in stage order, like sklearn's predict_stages
+        return np.cumsum(staged, axis=1)[:, -1, :]
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if self.kind == "forest_classifier":
+            per_tree = self.value[self.apply(X)]  # (rows, trees, classes)
+            return np.cumsum(per_tree, axis=1)[:, -1, :] / self.n_trees
+        if self.kind == "boosting_classifier":
+            raw = self._boosting_raw(X)
+            if raw.shape[1] == 1:
+                positive = expit(raw[:, 0])
+                return np.column_stack([1.0 - positive, positive])
+            return softmax(raw, axis=1)
+        raise AttributeError("predict_proba is only available for classifiers")
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        if self.kind == "forest_regressor":
+            per_tree = self.value[self.apply(X)]  # (rows, trees, outputs)
+            mean = np.cumsum(per_tree, axis=1)[:, -1, :] / self.n_trees
+            return mean[:, 0] if mean.shape[1] == 1 else mean
+        if self.kind == "boosting_regressor":
+            return self._boosting_raw(X)[:, 0]
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def per_tree_predictions(self, X: np.ndarray) -> np.ndarray:
+        """Individual tree outputs of a forest regressor, (n_rows, n_trees)"""
+        if self.kind != "forest_regressor":
+            raise AttributeError("Per-tree predictions are only available for forest regressors")
+        return self.value[self.apply(X), 0]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "trees": self.n_trees,
+            "nodes": len(self.feature),
+            "max_depth": self.max_depth,
+        }
+
+    def save(self, path) -> Path:
+        """
+        Write `<stem>.trees.bin` (raw little-endian arrays) and the `<stem>.trees.json`
+        manifest describing them. `path` may name either file; returns the manifest path.
+        """
+        manifest_path, data_path = artifact_paths(path)
+        arrays = {}
+        offset = 0
+        with open(data_path, "wb") as f:
+            for name in ARRAY_FIELDS:
+                array = np.ascontiguousarray(getattr(self, name))
+                array = array.astype(array.dtype.newbyteorder("<"), copy=False)
+                padding = -offset % ALIGNMENT
+                f.write(b"\0" * padding)
+                offset += padding
+                f.write(array.tobytes())
+                arrays[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+                offset += array.nbytes
+
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "kind": self.kind,
+            "max_depth": self.max_depth,
+            "n_features": self.n_features_in_,
+            "learning_rate": self.learning_rate,
+            "classes": None if self.classes_ is None else np.asarray(self.classes_).tolist(),
+            "baseline": None if self.baseline is None else self.baseline.tolist(),
+            "data_file": data_path.name,
+            "data_bytes": offset,
+            "arrays": arrays,
+        }
+        manifest_path.write_text(json.dumps(manifest, indent=2))
+        return manifest_path
+
+    @classmethod
+    def load(cls, path, mmap_mode: Optional[str] = "r") -> "FlatTreeEnsemble":
+        """Open an artifact; arrays are views into one memory map unless mmap_mode is None"""
+        manifest_path, _ = artifact_paths(path)
+        manifest = json.loads(manifest_path.read_text())
+        if manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported tree artifact version: {manifest.get('format_version')}")
+
+        data_path = manifest_path.with_name(manifest["data_file"])
+        if data_path.stat().st_size != manifest["data_bytes"]:
+            raise ValueError(f"{data_path.name} does not match its manifest ({manifest['data_bytes']} bytes)")
+        if mmap_mode is None:
+            raw = np.fromfile(data_path, dtype=np.uint8)
+        else:
+            raw = np.memmap(data_path, dtype=np.uint8, mode=mmap_mode)
+
+        arrays = {}
+        for name in ARRAY_FIELDS:
+            meta = manifest["arrays"][name]
+            dtype = np.dtype(meta["dtype"])
+            count = int(np.prod(meta["shape"], dtype=np.int64))
+            chunk = raw[meta["offset"]:meta["offset"] + count * dtype.itemsize]
+            arrays[name] = chunk.view(dtype).reshape(meta["shape"])
+
+        classes = manifest["classes"]
+        return cls(
+            kind=manifest["kind"],
+            max_depth=manifest["max_depth"],
+            n_features=manifest["n_features"],
+            classes=None if classes is None else np.asarray(classes),
+            learning_rate=manifest["learning_rate"],
+            baseline=manifest["baseline"],
+            **arrays,
+        )
+
+
+def forest_intervals(model: Any, X: np.ndarray, coverage: float = DEFAULT_COVERAGE) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Prediction and empirical per-tree quantile interval of a forest regressor.
+    Returns (mean, lower, upper), each (n_rows,); mean equals model.predict(X).
+    """
+    if not 0 < coverage < 1:
+        raise ValueError("coverage must be between 0 and 1")
+    from sklearn.ensemble import ExtraTreesRegressor, RandomForestRegressor
+
+    if isinstance(model, FlatTreeEnsemble):
+        per_tree = model.per_tree_predictions(X)
+    elif isinstance(model, (RandomForestRegressor, ExtraTreesRegressor)):
+        # sklearn forest: same float32 inputs its own predict uses
+        X = np.atleast_2d(np.asarray(X, dtype=np.float32))
+        per_tree = np.column_stack([tree.predict(X) for tree in model.estimators_])
+    else:
+        raise ValueError(f"Intervals need a forest regressor, got {type(model).__name__}")
+
+    mean = np.cumsum(per_tree, axis=1)[:, -1] / per_tree.shape[1]
+    tail = (1 - coverage) / 2
+    lower, upper = np.quantile(per_tree, [tail, 1 - tail], axis=1)
+    return mean, lower, upper
+
+
+def artifact_paths(path) -> Tuple[Path, Path]:
+    """(manifest, raw data) paths for an artifact named by either file or by its stem"""
+    path = Path(path)
+    name = path.name
+    for suffix in (MANIFEST_SUFFIX, DATA_SUFFIX):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+            break
+    return path.with_name(name + MANIFEST_SUFFIX), path.with_name(name + DATA_SUFFIX)
+
+
+def save_tree_model(model: Any, path) -> Path:
+    """Convenience wrapper used by the training scripts"""
+    return FlatTreeEnsemble.from_sklearn(model).save(path)
+
+
+def compile_tree_model(model: Any) -> Any:
+    """Flatten a supported sklearn tree ensemble; anything else is returned unchanged"""
+    if model is None or isinstance(model, FlatTreeEnsemble):
+        return model
+    try:
+        return FlatTreeEnsemble.from_sklearn(model)
+    except Exception as e:
+        logger.warning(f"Tree runtime unavailable for {type(model).__name__}: {e}")
+        return model
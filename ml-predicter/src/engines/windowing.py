@@ -0,0 +1,164 @@
+"""
+Adaptive resampling and history windowing before model fitting
+
+Long daily histories are aggregated to the coarsest frequency (weekly or monthly)
+that still leaves enough points to fit, then truncated to the most recent window
+that on-the-fly fitting can handle within the latency budget. SARIMA fit cost grows
+linearly with the number of observations and roughly quadratically with the season
+length (the state dimension), so bounding the window bounds the fit time
+regardless of how much history a user sends.
+
+Resampling is vectorized: observations are bucketed by integer period codes and
+aggregated with np.add.reduceat.
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from src.engines.feature_builder import infer_frequency
+from src.engines.smoothing import season_period_for_frequency
+
+# Coarse to fine; a series is only ever aggregated, never upsampled
+FREQUENCIES = ("M", "W", "D")
+# Fewest points a resampled series must keep (two years of months, half a year of weeks)
+MIN_POINTS = {"M": 24, "W": 26, "D": 3}
+# Most expensive on-the-fly fit (statsmodels SARIMA), milliseconds per observation
+# at a season of REFERENCE_SEASON; longer seasons scale it by (season / REFERENCE_SEASON) ** 2
+FIT_MS_PER_OBS = 2.0
+REFERENCE_SEASON = 12
+# Share of the latency budget the fits may use
+BUDGET_SHARE = 0.5
+# Smallest window regardless of budget (at least two seasons are always kept)
+MIN_WINDOW = 36
+MAX_WINDOW = 1000
+AGGREGATIONS = ("mean", "sum", "last")
+
+
+@dataclass
+class WindowPolicy:
+    """What was done to a series before fitting; returned with the forecast"""
+    source_freq: str
+    target_freq: str
+    aggregation: str
+    raw_points: int
+    resampled_points: int
+    window: int
+    truncated: bool
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class WindowingConfig:
+    """`target_freq` is "auto" or one of FREQUENCIES"""
+    target_freq: str = "auto"
+    aggregation: str = "mean"
+    latency_budget_ms: Optional[float] = None
+
+    def __post_init__(self):
+        if self.target_freq != "auto" and self.target_freq not in FREQUENCIES:
+            raise ValueError(f"Unknown target frequency: {self.target_freq}")
+        if self.aggregation not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation: {self.aggregation}")
+
+    def max_window(self, season_period: int = REFERENCE_SEASON) -> int:
+        """Observations the slowest fit can process within the budget share"""
+        floor = max(MIN_WINDOW, 2 * season_period)
+        if not self.latency_budget_ms:
+            return max(MAX_WINDOW, floor)
+        ms_per_obs = FIT_MS_PER_OBS * max(1.0, season_period / REFERENCE_SEASON) ** 2
+        window = int(self.latency_budget_ms * BUDGET_SHARE / ms_per_obs)
+        return min(max(window, floor), max(MAX_WINDOW, floor))
+
+
+def period_codes(days: np.ndarray, freq: str) -> np.ndarray:
+    """Integer bucket per date: Monday-start weeks or calendar months (days for D)"""
+    if freq == "M":
+        return days.astype("datetime64[M]").astype(np.int64)
+    if freq == "W":
+        # 1970-01-01 was a Thursday
+        return (days.astype(np.int64) + 3) // 7
+    return days.astype(np.int64)
+
+
+def period_end(codes: np.ndarray, freq: str) -> np.ndarray:
+    """Last day of each bucket (Sunday / month end), as pandas labels W and ME"""
+    if freq == "M":
+        return (codes.astype("datetime64[M]") + 1).astype("datetime64[D]") - 1
+    if freq == "W":
+        return (codes * 7 + 3).astype("datetime64[D]")
+    return codes.astype("datetime64[D]")
+
+
+def resample(
+    dates: np.ndarray,
+    values: np.ndarray,
+    freq: str,
+    aggregation: str = "mean"
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Aggregate a sorted series without missing values into `freq` buckets.
+    With "sum" an incomplete last bucket is dropped, since it would look like a drop in income.
+    """
+    days = np.asarray(dates, dtype="datetime64[D]")
+    values = np.asarray(values, dtype=np.float64)
+    codes = period_codes(days, freq)
+    starts = np.flatnonzero(np.concatenate([[True], codes[1:] != codes[:-1]]))
+
+    if aggregation == "last":
+        ends = np.concatenate([starts[1:], [len(values)]]) - 1
+        aggregated = values[ends]
+    else:
+        aggregated = np.add.reduceat(values, starts)
+        if aggregation == "mean":
+            aggregated = aggregated / np.diff(np.concatenate([starts, [len(values)]]))
+
+    labels = period_end(codes[starts], freq)
+    if aggregation == "sum" and len(labels) > 1 and days[-1] < labels[-1]:
+        labels, aggregated = labels[:-1], aggregated[:-1]
+    return labels, aggregated
+
+
+def choose_frequency(days: np.ndarray, source_freq: str, target_freq: str = "auto") -> str:
+    """The coarsest frequency not finer than the source that keeps MIN_POINTS buckets"""
+    source = source_freq if source_freq in FREQUENCIES else "D"
+    if target_freq != "auto":
+        # Never upsample
+        return target_freq if FREQUENCIES.index(target_freq) <= FREQUENCIES.index(source) else source
+    for freq in FREQUENCIES[:FREQUENCIES.index(source)]:
+        if len(np.unique(period_codes(days, freq))) >= MIN_POINTS[freq]:
+            return freq
+    return source
+
+
+def apply_window_policy(
+    dates: np.ndarray,
+    values: np.ndarray,
+    config: WindowingConfig
+) -> Tuple[np.ndarray, np.ndarray, WindowPolicy]:
+    """Resample and truncate a sorted series without missing values; returns the policy applied"""
+    days = np.asarray(dates, dtype="datetime64[D]")
+    values = np.asarray(values, dtype=np.float64)
+    source = infer_frequency(days) if len(days) > 1 else "D"
+    target = choose_frequency(days, source, config.target_freq)
+
+    if target != source:
+        days, values = resample(days, values, target, config.aggregation)
+    resampled_points = len(values)
+
+    window = min(resampled_points, config.max_window(season_period_for_frequency(target)))
+    days, values = days[-window:], values[-window:]
+
+    policy = WindowPolicy(
+        source_freq=source,
+        target_freq=target,
+        aggregation=config.aggregation if target != source else "none",
+        raw_points=len(dates),
+        resampled_points=resampled_points,
+        window=window,
+        truncated=window < resampled_points,
+    )
+    return days, values, policy
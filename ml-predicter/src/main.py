@@ -8,6 +8,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 from datetime import datetime
 
@@ -15,6 +16,9 @@ from src.config.settings import Settings
 from src.utils.logger import setup_logger
 from src.utils.database import Database
 from src.utils.cache import CacheManager
+from src.utils.model_store import ModelStore
+from src.utils.fitting_service import FittingService
+from src.utils.forecast_cache import ForecastCache
 
 # Import routes
 from src.api.routes import astrology, forecast, health, relationships, embeddings
@@ -26,7 +30,11 @@ settings = Settings()
 # Global instances
 db: Database = None
 cache: CacheManager = None
+model_store: ModelStore = None
+fitting_service: FittingService = None
+forecast_cache: ForecastCache = None
 model_registry = None
+precompute_task: asyncio.Task = None
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -37,7 +45,7 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting ML Engine...")
     
-    global db, cache
+    global db, cache, model_store, fitting_service, forecast_cache, precompute_task
     
     try:
         # Initialize database connection
@@ -50,6 +58,44 @@ async def lifespan(app: FastAPI):
         await cache.connect()
         logger.info("Redis cache connected")
         
+        if settings.ENABLE_CACHE:
+            forecast_cache = ForecastCache(
+                cache,
+                max_entries=settings.FORECAST_CACHE_ENTRIES,
+                ttl_seconds=settings.REDIS_CACHE_TTL
+            )
+            app.state.forecast_cache = forecast_cache
+        
+        # Load pre-trained models once and share them across requests
+        model_store = ModelStore(settings.MODEL_PATH, compile_trees=settings.TREE_RUNTIME).load_all()
+        app.state.model_store = model_store
+        
+        # Heavy on-the-fly fits run in worker processes, off the event loop
+        fitting_service = FittingService(
+            max_workers=settings.FIT_POOL_WORKERS,
+            max_pending=settings.FIT_QUEUE_DEPTH,
+            timeout_seconds=settings.FIT_TIMEOUT_SECONDS
+        ).start()
+        app.state.fitting_service = fitting_service
+        
+        from src.engines.forecast_engine import build_income_engine
+        app.state.forecast_engine = build_income_engine(settings, model_store, fitting_service)
+        
+        # Per-user Kalman/smoothing state for incremental forecast updates
+        from src.engines.streaming import StreamingForecaster
+        from src.utils.stream_state import StreamStateStore
+        app.state.streaming_forecaster = StreamingForecaster(app.state.forecast_engine)
+        app.state.stream_state = StreamStateStore(cache, ttl_seconds=settings.STREAM_STATE_TTL)
+        
+        from src.engines.health_engine import HealthPredictionEngine
+        app.state.health_engine = HealthPredictionEngine(
+            settings.MODEL_PATH,
+            model_store=model_store,
+            max_batch_rows=settings.HEALTH_BATCH_ROWS,
+            max_wait_ms=settings.HEALTH_BATCH_WAIT_MS
+        )
+        logger.info("Model store loaded")
+        
         # Initialize Model Registry
         try:
             from src.utils.model_registry import ModelRegistry
@@ -67,6 +113,23 @@ async def lifespan(app: FastAPI):
         # Expose db via app state
         app.state.db = db
         
+        # Nightly forecast precomputation inside the app (or run scripts/precompute_forecasts.py)
+        if settings.PRECOMPUTE_SCHEDULE:
+            from src.utils.forecast_precompute import ForecastPrecomputer, run_nightly
+            precomputer = ForecastPrecomputer(
+                db,
+                app.state.forecast_engine,
+                forecast_cache=forecast_cache,
+                model_registry=getattr(app.state, "model_registry", None),
+                page_size=settings.PRECOMPUTE_PAGE_SIZE,
+                active_days=settings.PRECOMPUTE_ACTIVE_DAYS,
+                horizon=settings.FORECAST_MAX_HORIZON,
+                ttl_seconds=settings.PRECOMPUTE_TTL_SECONDS,
+                concurrency=settings.FIT_POOL_WORKERS
+            )
+            precompute_task = asyncio.create_task(run_nightly(precomputer, settings.PRECOMPUTE_HOUR_UTC))
+            logger.info(f"Forecast precompute scheduled daily at {settings.PRECOMPUTE_HOUR_UTC:02d}:00 UTC")
+        
         logger.info("ML Engine ready to serve requests")
     
     except Exception as e:
@@ -79,6 +142,12 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down ML Engine...")
     
     try:
+        if precompute_task:
+            precompute_task.cancel()
+        if fitting_service:
+            fitting_service.shutdown()
+        if getattr(app.state, "health_engine", None):
+            app.state.health_engine.shutdown()
         if cache:
             await cache.disconnect()
         if db:
@@ -147,7 +216,10 @@ async def health_check():
         "services": {
             "database": await db.health_check(),
             "cache": await cache.health_check()
-        }
+        },
+        "models": model_store.stats() if model_store else {},
+        "fitting": fitting_service.stats() if fitting_service else {},
+        "forecast_cache": forecast_cache.stats() if forecast_cache else {}
     }
 
 # Include route modules
@@ -33,6 +33,35 @@ class CacheManager:
         except Exception:
             return "error"
 
+    async def get_json(self, key: str):
+        """Fetch and decode a JSON value, or None if missing / Redis unavailable"""
+        if not self.redis:
+            return None
+        try:
+            cached = await self.redis.get(key)
+            return json.loads(cached) if cached else None
+        except Exception as e:
+            logger.warning(f"Cache get failed: {e}")
+            return None
+
+    async def set_json(self, key: str, value, ttl_seconds: int = 3600):
+        """Encode and store a JSON value with a TTL (no-op if Redis unavailable)"""
+        if not self.redis:
+            return
+        try:
+            await self.redis.setex(key, ttl_seconds, json.dumps(value, default=str))
+        except Exception as e:
+            logger.warning(f"Cache set failed: {e}")
+
+    async def delete(self, key: str):
+        """Remove a key (no-op if Redis unavailable)"""
+        if not self.redis:
+            return
+        try:
+            await self.redis.delete(key)
+        except Exception as e:
+            logger.warning(f"Cache delete failed: {e}")
+
     def cache_prediction(self, ttl_seconds=86400):
         """Decorator to cache predictions using the instance redis client"""
         def decorator(func):
@@ -0,0 +1,156 @@
+"""
+Process-pool fitting service
+Runs CPU-heavy statsmodels fits outside the API process so the event loop keeps serving
+"""
+
+import logging
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class FittingQueueFullError(RuntimeError):
+    """Raised when the pool already has `max_pending` jobs queued or running"""
+
+
+class FittingTimeoutError(TimeoutError):
+    """Raised when a fit does not finish within its timeout"""
+
+
+def _warm_worker():
+    """Worker initializer: pay the statsmodels import cost once per process"""
+    import statsmodels.tsa.arima.model  # noqa: F401
+    import statsmodels.tsa.statespace.sarimax  # noqa: F401
+
+
+def _ping() -> bool:
+    return True
+
+
+def _forecast_frame(fitted_model: Any, periods: int) -> Dict[str, List[float]]:
+    forecast_df = fitted_model.get_forecast(steps=periods).summary_frame()
+    return {
+        "forecast": forecast_df["mean"].tolist(),
+        "ci_lower": forecast_df["mean_ci_lower"].tolist(),
+        "ci_upper": forecast_df["mean_ci_upper"].tolist(),
+    }
+
+
+def fit_arima_forecast(values: np.ndarray, order: Tuple[int, int, int], periods: int) -> Dict[str, List[float]]:
+    """Fit ARIMA on `values` and return the forecast with 95% intervals"""
+    import warnings
+    from statsmodels.tsa.arima.model import ARIMA
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        fitted_model = ARIMA(values, order=order).fit()
+    return _forecast_frame(fitted_model, periods)
+
+
+def fit_sarima_forecast(
+    values: np.ndarray,
+    order: Tuple[int, int, int],
+    seasonal_order: Tuple[int, int, int, int],
+    periods: int
+) -> Dict[str, List[float]]:
+    """Fit SARIMAX on `values` and return the forecast with 95% intervals"""
+    import warnings
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        fitted_model = SARIMAX(
+            values,
+            order=order,
+            seasonal_order=seasonal_order,
+            enforce_stationarity=False,
+            enforce_invertibility=False
+        ).fit(disp=False)
+    return _forecast_frame(fitted_model, periods)
+
+
+class FittingService:
+    """
+    Bounded ProcessPoolExecutor for model fitting.
+    Rejects new jobs immediately once `max_pending` jobs are in flight.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 8, timeout_seconds: float = 15.0):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout_seconds = timeout_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> "FittingService":
+        """Spawn the worker processes and wait until statsmodels is imported in each"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_warm_worker
+            )
+            warmups = [self._executor.submit(_ping) for _ in range(self.max_workers)]
+            for warmup in warmups:
+                warmup.result()
+            logger.info(f"Fitting service started with {self.max_workers} workers")
+        return self
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            logger.info("Fitting service stopped")
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _release(self, _future: Future):
+        with self._lock:
+            self._pending -= 1
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Queue a job, or raise FittingQueueFullError if the service is saturated"""
+        if self._executor is None:
+            self.start()
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise FittingQueueFullError(
+                    f"Fitting queue is full ({self._pending}/{self.max_pending} jobs in flight)"
+                )
+            self._pending += 1
+
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def run(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """Submit a job and block until it finishes or times out"""
+        future = self.submit(fn, *args, **kwargs)
+        timeout = self.timeout_seconds if timeout is None else timeout
+
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # A running fit cannot be interrupted; it keeps its queue slot until it finishes
+            future.cancel()
+            raise FittingTimeoutError(f"{getattr(fn, '__name__', 'job')} exceeded {timeout:.1f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.max_workers,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "timeout_seconds": self.timeout_seconds,
+        }
@@ -0,0 +1,113 @@
+"""
+Content-addressed forecast cache
+Two tiers: a small in-process LRU in front of Redis (via CacheManager)
+"""
+
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from src.utils.cache import CacheManager
+
+logger = logging.getLogger(__name__)
+
+KEY_VERSION = "v1"
+
+
+class ForecastCache:
+    """
+    Caches full-horizon forecasts keyed by a hash of the normalized input series,
+    the model versions and the engine config. Shorter horizons are served by slicing.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[CacheManager] = None,
+        max_entries: int = 1000,
+        ttl_seconds: int = 3600,
+        namespace: str = "forecast"
+    ):
+        self.cache = cache
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+        self._local: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits_local = 0
+        self.hits_redis = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(dates: np.ndarray, values: np.ndarray, fingerprint: Dict[str, Any]) -> str:
+        """
+        Stable hash of the series and everything that determines the forecast.
+        Dates are normalized to day resolution and values to float64.
+        """
+        digest = hashlib.sha256(KEY_VERSION.encode())
+        digest.update(np.ascontiguousarray(dates, dtype="datetime64[D]").view(np.int64).tobytes())
+        digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+        digest.update(json.dumps(fingerprint, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _local_get(self, key: str) -> Optional[Dict[str, Any]]:
+        item = self._local.get(key)
+        if item is None:
+            return None
+        expires_at, entry = item
+        if expires_at < time.monotonic():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return entry
+
+    def _local_set(self, key: str, entry: Dict[str, Any], ttl_seconds: Optional[int] = None):
+        self._local[key] = (time.monotonic() + (ttl_seconds or self.ttl_seconds), entry)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    async def get(self, key: str, periods: int) -> Optional[Dict[str, Any]]:
+        """Return the cached full-horizon result if it covers `periods`, else None"""
+        entry = self._local_get(key)
+        if entry is not None:
+            tier = "local"
+        elif self.cache is not None:
+            entry = await self.cache.get_json(self._redis_key(key))
+            tier = "redis"
+            if entry is not None:
+                self._local_set(key, entry)
+
+        if entry is None or entry.get("horizon", 0) < periods:
+            self.misses += 1
+            return None
+
+        if tier == "local":
+            self.hits_local += 1
+        else:
+            self.hits_redis += 1
+        return entry["result"]
+
+    async def set(self, key: str, result: Dict[str, Any], horizon: int, ttl_seconds: Optional[int] = None):
+        """Store a full-horizon result; `ttl_seconds` overrides the default TTL in both tiers"""
+        entry = {"horizon": horizon, "result": result}
+        self._local_set(key, entry, ttl_seconds)
+        if self.cache is not None:
+            await self.cache.set_json(self._redis_key(key), entry, ttl_seconds or self.ttl_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.hits_local + self.hits_redis
+        lookups = hits + self.misses
+        return {
+            "hits_local": self.hits_local,
+            "hits_redis": self.hits_redis,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "local_entries": len(self._local),
+        }
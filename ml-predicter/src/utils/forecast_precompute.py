@@ -0,0 +1,283 @@
+"""
+Nightly forecast precomputation
+
+Reads every active user's income series from `user_metrics` in pages, forecasts
+each user with `ensemble_forecast` (the path `/forecast/income` serves, so stored
+results equal what the route would compute) and bulk-inserts one `predictions` row
+per user.
+Each row stores the content hash of its input series (the ForecastCache key) next
+to the full-horizon result, and the forecast cache is warmed with the same key,
+so `/forecast/income` serves unchanged inputs without recomputing or writing.
+Users whose series did not change since the last run are not recomputed. A page
+that fails is logged and its users counted as failed; the run continues.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from src.utils.database import Database
+from src.utils.forecast_cache import ForecastCache
+
+logger = logging.getLogger(__name__)
+
+PRECOMPUTED_SOURCE = "precomputed"
+
+ACTIVE_USERS_SQL = text("""
+    SELECT DISTINCT user_id FROM user_metrics
+    WHERE metric_type = 'income' AND metric_date >= :since AND (CAST(:after AS uuid) IS NULL OR user_id > CAST(:after AS uuid))
+    ORDER BY user_id
+    LIMIT :limit
+""")
+
+SERIES_SQL = text("""
+    SELECT user_id, metric_date, metric_value FROM user_metrics
+    WHERE metric_type = 'income' AND user_id = ANY(CAST(:user_ids AS uuid[]))
+    ORDER BY user_id, metric_date
+""")
+
+# Latest precomputed row per (user, input) among the given keys
+EXISTING_SQL = text("""
+    SELECT DISTINCT ON (user_id) id, user_id, combined_prediction
+    FROM predictions
+    WHERE category = 'finance'
+      AND user_id = ANY(CAST(:user_ids AS uuid[]))
+      AND combined_prediction->>'input_key' = ANY(:keys)
+      AND combined_prediction->>'source' = 'precomputed'
+      AND (expires_at IS NULL OR expires_at > CURRENT_TIMESTAMP)
+    ORDER BY user_id, generated_at DESC
+""")
+
+LOOKUP_SQL = text("""
+    SELECT id, combined_prediction FROM predictions
+    WHERE user_id = CAST(:user_id AS uuid)
+      AND category = 'finance'
+      AND combined_prediction->>'input_key' = :key
+      AND combined_prediction->>'source' = 'precomputed'
+      AND (expires_at IS NULL OR expires_at > CURRENT_TIMESTAMP)
+    ORDER BY generated_at DESC
+    LIMIT 1
+""")
+
+# One statement per page: rows travel as a JSON array
+BULK_INSERT_SQL = text("""
+    INSERT INTO predictions (
+        user_id, category, prediction_type, timeframe,
+        period_start, period_end,
+        combined_prediction, overall_confidence,
+        model_id, expires_at
+    )
+    SELECT
+        CAST(r->>'user_id' AS uuid), 'finance', 'hybrid', :timeframe,
+        CURRENT_DATE, CURRENT_DATE + make_interval(months => :months),
+        r->'prediction', :confidence,
+        CAST(:model_id AS uuid), CURRENT_TIMESTAMP + make_interval(secs => :ttl_seconds)
+    FROM jsonb_array_elements(CAST(:rows AS jsonb)) AS r
+    RETURNING id, user_id
+""")
+
+
+def _all_finite(value: Any) -> bool:
+    """False if any number in a (nested) result is NaN or infinite; jsonb rejects them"""
+    if isinstance(value, dict):
+        return all(_all_finite(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return all(_all_finite(v) for v in value)
+    if isinstance(value, (float, np.floating)):
+        return bool(np.isfinite(value))
+    return True
+
+
+async def find_precomputed(db: Database, user_id: str, key: str) -> Optional[Tuple[str, Dict[str, Any], int]]:
+    """(prediction_id, result, horizon) of a live precomputed row for this input, or None"""
+    async with db.engine.begin() as conn:
+        row = (await conn.execute(LOOKUP_SQL, {"user_id": user_id, "key": key})).fetchone()
+    if row is None:
+        return None
+    stored = row[1] if isinstance(row[1], dict) else json.loads(row[1])
+    return str(row[0]), stored["result"], stored["horizon"]
+
+
+class ForecastPrecomputer:
+    """Pages through active users and precomputes their income forecasts"""
+
+    def __init__(
+        self,
+        db: Database,
+        engine: Any,
+        forecast_cache: Optional[ForecastCache] = None,
+        model_registry: Any = None,
+        page_size: int = 1000,
+        active_days: int = 90,
+        horizon: int = 24,
+        ttl_seconds: int = 36 * 3600,
+        concurrency: int = 4
+    ):
+        self.db = db
+        self.engine = engine
+        self.forecast_cache = forecast_cache
+        self.model_registry = model_registry
+        self.page_size = page_size
+        self.active_days = active_days
+        self.horizon = horizon
+        self.ttl_seconds = ttl_seconds
+        # Users forecast at once (each in a worker thread; on-the-fly fits share the fitting pool)
+        self.concurrency = concurrency
+
+    async def pages(self) -> AsyncIterator[Dict[str, Tuple[List[str], List[Optional[float]]]]]:
+        """{user_id: (dates, values)} for `page_size` active users at a time (keyset paging)"""
+        since = datetime.now(timezone.utc).date() - timedelta(days=self.active_days)
+        after = None
+        while True:
+            async with self.db.engine.begin() as conn:
+                user_ids = [
+                    str(row[0]) for row in await conn.execute(
+                        ACTIVE_USERS_SQL, {"since": since, "after": after, "limit": self.page_size}
+                    )
+                ]
+                if not user_ids:
+                    return
+                rows = await conn.execute(SERIES_SQL, {"user_ids": user_ids})
+
+            series: Dict[str, Tuple[List[str], List[Optional[float]]]] = {}
+            for user_id, metric_date, metric_value in rows:
+                dates, values = series.setdefault(str(user_id), ([], []))
+                dates.append(metric_date.isoformat())
+                values.append(None if metric_value is None else float(metric_value))
+            yield series
+
+            if len(user_ids) < self.page_size:
+                return
+            after = user_ids[-1]
+
+    async def run(self) -> Dict[str, Any]:
+        """Precompute every page; returns run statistics"""
+        start = time.perf_counter()
+        stats = {"users": 0, "computed": 0, "unchanged": 0, "failed": 0, "pages": 0}
+        async for page in self.pages():
+            try:
+                page_stats = await self.process_page(page)
+            except Exception as e:
+                logger.error(f"Forecast precompute page of {len(page)} users failed: {e}")
+                page_stats = {"users": len(page), "failed": len(page)}
+            stats["pages"] += 1
+            for name, count in page_stats.items():
+                stats[name] += count
+        stats["seconds"] = round(time.perf_counter() - start, 2)
+        logger.info(f"Forecast precompute finished: {stats}")
+        return stats
+
+    async def process_page(self, page: Dict[str, Tuple[List[str], List[Optional[float]]]]) -> Dict[str, int]:
+        engine = self.engine
+        fingerprint = engine.fingerprint()
+        stats = {"users": len(page), "computed": 0, "unchanged": 0, "failed": 0}
+
+        # Same normalization and key as the /forecast/income route
+        prepared: Dict[str, Tuple[Any, str]] = {}
+        for user_id, (dates, values) in page.items():
+            try:
+                df = engine.prepare_data(dates=dates, values=values)
+                prepared[user_id] = (df, ForecastCache.make_key(df.index.values, df["value"].values, fingerprint))
+            except Exception as e:
+                logger.warning(f"Skipping user {user_id}: {e}")
+                stats["failed"] += 1
+
+        # Inputs unchanged since the last run: reuse the stored rows
+        existing = await self._existing(prepared)
+        for user_id, (prediction_id, result) in existing.items():
+            await self._warm(prepared[user_id][1], result, prediction_id)
+        stats["unchanged"] = len(existing)
+
+        todo = [user_id for user_id in prepared if user_id not in existing]
+        if not todo:
+            return stats
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def forecast(df) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    return await run_in_threadpool(engine.ensemble_forecast, df, periods=self.horizon)
+                except Exception as e:
+                    return {"error": str(e)}
+
+        results = await asyncio.gather(*(forecast(prepared[u][0]) for u in todo))
+
+        rows = []
+        for user_id, result in zip(todo, results):
+            # Same rule as the route: errors and results missing sub-models are not stored
+            if "error" in result or result.get("dropped_sub_models") or not _all_finite(result):
+                stats["failed"] += 1
+                continue
+            rows.append({
+                "user_id": user_id,
+                "prediction": {
+                    "source": PRECOMPUTED_SOURCE,
+                    "input_key": prepared[user_id][1],
+                    "horizon": self.horizon,
+                    "result": result,
+                },
+            })
+
+        inserted = await self._bulk_insert(rows)
+        for row in rows:
+            prediction_id = inserted.get(row["user_id"])
+            await self._warm(row["prediction"]["input_key"], row["prediction"]["result"], prediction_id)
+        stats["computed"] = len(rows)
+        return stats
+
+    async def _existing(self, prepared: Dict[str, Tuple[Any, str]]) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+        if not prepared:
+            return {}
+        params = {"user_ids": list(prepared), "keys": [key for _, key in prepared.values()]}
+        async with self.db.engine.begin() as conn:
+            rows = await conn.execute(EXISTING_SQL, params)
+        existing = {}
+        for prediction_id, user_id, stored in rows:
+            stored = stored if isinstance(stored, dict) else json.loads(stored)
+            user_id = str(user_id)
+            # Keys are matched as a set above; keep rows whose key is this user's
+            if stored.get("input_key") == prepared[user_id][1]:
+                existing[user_id] = (str(prediction_id), stored["result"])
+        return existing
+
+    async def _bulk_insert(self, rows: List[Dict[str, Any]]) -> Dict[str, str]:
+        """user_id -> prediction_id of the inserted rows"""
+        if not rows:
+            return {}
+        model_id = self.model_registry.get_model_id() if self.model_registry is not None else None
+        async with self.db.engine.begin() as conn:
+            result = await conn.execute(BULK_INSERT_SQL, {
+                "rows": json.dumps(rows, default=float, allow_nan=False),
+                "timeframe": f"{self.horizon}_months",
+                "months": self.horizon,
+                "confidence": 0.85,
+                "model_id": model_id,
+                "ttl_seconds": self.ttl_seconds,
+            })
+            return {str(user_id): str(prediction_id) for prediction_id, user_id in result}
+
+    async def _warm(self, key: str, result: Dict[str, Any], prediction_id: Optional[str]):
+        if self.forecast_cache is not None:
+            await self.forecast_cache.set(key, {**result, "prediction_id": prediction_id}, self.horizon, self.ttl_seconds)
+
+
+async def run_nightly(precomputer: ForecastPrecomputer, hour_utc: int = 2):
+    """Run the precompute job every day at `hour_utc`; cancel the task to stop"""
+    while True:
+        now = datetime.now(timezone.utc)
+        next_run = now.replace(hour=hour_utc, minute=0, second=0, microsecond=0)
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        await asyncio.sleep((next_run - now).total_seconds())
+        try:
+            await precomputer.run()
+        except Exception as e:
+            logger.error(f"Forecast precompute failed: {e}")
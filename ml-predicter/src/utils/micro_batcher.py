@@ -0,0 +1,131 @@
+"""
+Micro-batching inference queue
+Coalesces concurrent row-wise model calls into one vectorized call per batch
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Collects requests for up to `max_wait_ms` or `max_batch_rows` rows, runs `fn`
+    once on the stacked rows and hands each caller its slice of the result.
+
+    `fn` maps an (n_rows, n_features) matrix to an array, or a tuple of arrays,
+    with n_rows leading rows. A request larger than `max_batch_rows` runs as one batch.
+    Callers block in their own thread (route handlers call the engine through the
+    thread pool), so concurrent requests meet in the queue.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[np.ndarray], Any],
+        max_batch_rows: int = 256,
+        max_wait_ms: float = 2.0,
+        name: str = "micro-batcher"
+    ):
+        self.fn = fn
+        self.max_batch_rows = max_batch_rows
+        self.max_wait_ms = max_wait_ms
+        self.name = name
+        self._queue: "queue.Queue[Optional[Tuple[np.ndarray, Future]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._rows = 0
+        self._requests = 0
+
+    def start(self) -> "MicroBatcher":
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                self._thread.start()
+        return self
+
+    def shutdown(self):
+        """Serve what is queued, then stop the batching thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+            logger.info(f"{self.name} stopped")
+
+    def submit(self, X: np.ndarray) -> Future:
+        """Queue rows for the next batch; the future resolves to this request's slice"""
+        if self._thread is None:
+            self.start()
+        future: Future = Future()
+        self._queue.put((np.atleast_2d(np.asarray(X, dtype=np.float64)), future))
+        return future
+
+    def run(self, X: np.ndarray, timeout: Optional[float] = None) -> Any:
+        """Submit rows and block until their batch has run"""
+        return self.submit(X).result(timeout=timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self._batches,
+            "requests": self._requests,
+            "rows": self._rows,
+            "mean_batch_rows": round(self._rows / self._batches, 2) if self._batches else 0.0,
+        }
+
+    def _collect(self, first: Tuple[np.ndarray, Future]) -> Tuple[List[Tuple[np.ndarray, Future]], bool]:
+        """Requests joining `first` until the deadline or the row limit; True when shutdown was requested"""
+        batch = [first]
+        rows = len(first[0])
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+        while rows < self.max_batch_rows:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+            rows += len(item[0])
+        return batch, False
+
+    def _loop(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, stopping = self._collect(first)
+            self._run_batch(batch)
+            if stopping:
+                return
+
+    def _run_batch(self, batch: List[Tuple[np.ndarray, Future]]):
+        batch = [(X, future) for X, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            result = self.fn(np.concatenate([X for X, _ in batch]))
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self._batches += 1
+        self._requests += len(batch)
+        start = 0
+        for X, future in batch:
+            end = start + len(X)
+            if isinstance(result, tuple):
+                future.set_result(tuple(part[start:end] for part in result))
+            else:
+                future.set_result(result[start:end])
+            start = end
+        self._rows += start
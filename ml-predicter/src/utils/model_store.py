@@ -0,0 +1,206 @@
+"""
+Shared model store
+Loads every pre-trained artifact once at startup so engines never touch disk per request
+"""
+
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import joblib
+
+from src.engines.feature_builder import FeatureSpec
+from src.engines.tree_runtime import MANIFEST_SUFFIX, FlatTreeEnsemble, artifact_paths, compile_tree_model
+from src.utils.ts_artifacts import load_compact_model
+
+logger = logging.getLogger(__name__)
+
+# name -> (filename, joblib mmap_mode); .npz files are compact time-series artifacts,
+# .trees.json files are memory-mapped tree ensembles (src/engines/tree_runtime.py),
+# other .json files are read with their JSON_LOADERS entry
+# Array-heavy models are memory-mapped so forked workers share the same physical pages.
+# statsmodels results need writable buffers (Cython memoryviews), so they use copy-on-write.
+ARTIFACTS: Dict[str, tuple] = {
+    "income_arima_compact": ("income_arima_compact.npz", None),
+    "income_sarima_compact": ("income_sarima_compact.npz", None),
+    "income_arima": ("income_arima.pkl", "c"),
+    "income_sarima": ("income_sarima.pkl", "c"),
+    "income_rf_trees": ("income_rf.trees.json", "r"),
+    "income_rf": ("income_rf.pkl", "r"),
+    "income_scaler": ("income_scaler.pkl", None),
+    "income_rf_features": ("income_rf_features.json", None),
+    "income_ensemble_weights": ("income_ensemble_weights.json", None),
+    "income_demographic_classifier_trees": ("income_demographic_classifier.trees.json", "r"),
+    "income_demographic_classifier": ("income_demographic_classifier.pkl", "r"),
+    "income_demographic_scaler": ("income_demographic_scaler.pkl", None),
+    "income_demographic_features": ("income_demographic_features.pkl", None),
+    "income_global": ("income_global.pkl", None),
+    "health_stress_classifier_trees": ("health_stress_classifier.trees.json", "r"),
+    "health_stress_classifier": ("health_stress_classifier.pkl", "r"),
+    "health_stress_scaler": ("health_stress_scaler.pkl", None),
+    "health_risk_predictor_trees": ("health_risk_predictor.trees.json", "r"),
+    "health_risk_predictor": ("health_risk_predictor.pkl", "r"),
+    "health_risk_scaler": ("health_risk_scaler.pkl", None),
+}
+
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    return json.loads(path.read_text())
+
+
+JSON_LOADERS: Dict[str, Callable[[Path], Any]] = {
+    # Feature spec of the RF sub-model (src/engines/feature_builder.py)
+    "income_rf_features": FeatureSpec.load,
+    # Backtest-derived ensemble weights (src/engines/backtest.py)
+    "income_ensemble_weights": _read_json,
+}
+
+# sklearn tree ensembles served through the flattened runtime (src/engines/tree_runtime.py)
+TREE_ENSEMBLES = {
+    "income_rf",
+    "income_demographic_classifier",
+    "health_stress_classifier",
+    "health_risk_predictor",
+}
+
+TREE_ARTIFACTS = {f"{name}_trees" for name in TREE_ENSEMBLES}
+
+# Legacy pickles that are skipped when their compact replacement is on disk
+SUPERSEDED_BY: Dict[str, str] = {
+    "income_arima": "income_arima_compact",
+    "income_sarima": "income_sarima_compact",
+    **{name: f"{name}_trees" for name in TREE_ENSEMBLES},
+}
+
+
+def _current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes (Linux only)"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+@dataclass
+class LoadedArtifact:
+    """A model loaded into the store with its load statistics"""
+    name: str
+    obj: Any
+    path: str
+    mmap_mode: Optional[str]
+    load_seconds: float
+    disk_bytes: int
+    resident_bytes: Optional[int]
+    mtime_ns: int = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "mmap_mode": self.mmap_mode,
+            "load_ms": round(self.load_seconds * 1000, 2),
+            "disk_bytes": self.disk_bytes,
+            "resident_bytes": self.resident_bytes,
+        }
+
+
+class ModelStore:
+    """
+    Process-wide registry of pre-trained models.
+    Created once in the app lifespan and shared by every engine.
+    """
+
+    def __init__(self, model_dir: str = "./models", compile_trees: bool = True):
+        self.model_dir = Path(model_dir)
+        self.compile_trees = compile_trees
+        self._artifacts: Dict[str, LoadedArtifact] = {}
+
+    def load_all(self) -> "ModelStore":
+        """Load every known artifact that exists on disk"""
+        return self.load(ARTIFACTS.keys())
+
+    def load(self, names: Iterable[str]) -> "ModelStore":
+        """Load the given artifacts (already-loaded ones are skipped)"""
+        for name in names:
+            if name in self._artifacts:
+                continue
+            if name in TREE_ARTIFACTS and not self.compile_trees:
+                continue
+            filename, mmap_mode = ARTIFACTS[name]
+            path = self.model_dir / filename
+            replacement = SUPERSEDED_BY.get(name)
+            if replacement in TREE_ARTIFACTS and not self.compile_trees:
+                replacement = None
+            if replacement and (self.model_dir / ARTIFACTS[replacement][0]).exists():
+                continue
+            if path.exists():
+                self._load_artifact(name, path, mmap_mode)
+        return self
+
+    def _load_artifact(self, name: str, path: Path, mmap_mode: Optional[str]):
+        rss_before = _current_rss()
+        start = time.perf_counter()
+
+        try:
+            if path.suffix == ".npz":
+                obj = load_compact_model(path)
+            elif path.name.endswith(MANIFEST_SUFFIX):
+                obj = FlatTreeEnsemble.load(path, mmap_mode=mmap_mode)
+            elif path.suffix == ".json":
+                obj = JSON_LOADERS[name](path)
+            else:
+                try:
+                    obj = joblib.load(path, mmap_mode=mmap_mode)
+                except ValueError as e:
+                    # Objects whose arrays cannot be mapped are loaded into private memory
+                    logger.warning(f"mmap load of {name} failed ({e}), loading into memory")
+                    mmap_mode = None
+                    obj = joblib.load(path)
+                if self.compile_trees and name in TREE_ENSEMBLES:
+                    obj = compile_tree_model(obj)
+        except Exception as e:
+            logger.error(f"Error loading {name}: {e}")
+            return
+
+        elapsed = time.perf_counter() - start
+        rss_after = _current_rss()
+        resident = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+        disk_bytes = path.stat().st_size
+        if path.name.endswith(MANIFEST_SUFFIX):
+            disk_bytes += artifact_paths(path)[1].stat().st_size
+
+        self._artifacts[name] = LoadedArtifact(
+            name=name,
+            obj=obj,
+            path=str(path),
+            mmap_mode=mmap_mode,
+            load_seconds=elapsed,
+            disk_bytes=disk_bytes,
+            resident_bytes=resident,
+            mtime_ns=path.stat().st_mtime_ns,
+        )
+        logger.info(f"✓ {name} loaded in {elapsed * 1000:.1f} ms")
+
+    def get(self, name: str, default: Any = None) -> Any:
+        artifact = self._artifacts.get(name)
+        return artifact.obj if artifact else default
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._artifacts
+
+    def fingerprint(self, names: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """Version tag per loaded artifact (size + mtime), used in cache keys"""
+        names = self._artifacts.keys() if names is None else names
+        return {
+            name: f"{self._artifacts[name].disk_bytes}:{self._artifacts[name].mtime_ns}"
+            for name in names if name in self._artifacts
+        }
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-model load time and memory footprint"""
+        return {name: artifact.stats() for name, artifact in self._artifacts.items()}
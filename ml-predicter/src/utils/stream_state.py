@@ -0,0 +1,112 @@
+"""
+Per-user incremental forecast state in Redis (via CacheManager)
+"""
+
+import json
+import logging
+from typing import Awaitable, Callable, Optional
+
+from src.engines.streaming import StreamState
+from src.utils.cache import CacheManager
+
+logger = logging.getLogger(__name__)
+
+# Write ARGV[2] only if the key still holds ARGV[1] ("" = absent): compare-and-set
+COMPARE_AND_SET_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if (current == false and ARGV[1] == '') or current == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', tonumber(ARGV[3]))
+    return 1
+end
+return 0
+"""
+
+# Read-modify-write attempts before a contended update gives up
+UPDATE_ATTEMPTS = 5
+
+
+class StreamStateConflictError(Exception):
+    """Concurrent updates for the same user kept winning the compare-and-set"""
+
+
+class StreamStateStore:
+    """
+    Keeps one StreamState per user. The TTL is refreshed on every write, so
+    users who keep sending observations never need to resend their history.
+    """
+
+    def __init__(self, cache: Optional[CacheManager], ttl_seconds: int = 30 * 86400, namespace: str = "stream"):
+        self.cache = cache
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+
+    @property
+    def available(self) -> bool:
+        return self.cache is not None and self.cache.redis is not None
+
+    def _key(self, user_id: str) -> str:
+        return f"{self.namespace}:{user_id}"
+
+    def _decode(self, user_id: str, raw: Optional[str]) -> Optional[StreamState]:
+        if not raw:
+            return None
+        try:
+            return StreamState.from_dict(json.loads(raw))
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Discarding unreadable stream state for {user_id}: {e}")
+            return None
+
+    async def get(self, user_id: str) -> Optional[StreamState]:
+        if not self.available:
+            return None
+        data = await self.cache.get_json(self._key(user_id))
+        if data is None:
+            return None
+        try:
+            return StreamState.from_dict(data)
+        except TypeError as e:
+            logger.warning(f"Discarding unreadable stream state for {user_id}: {e}")
+            return None
+
+    async def set(self, user_id: str, state: StreamState):
+        if self.available:
+            await self.cache.set_json(self._key(user_id), state.to_dict(), self.ttl_seconds)
+
+    async def update(
+        self,
+        user_id: str,
+        advance: Callable[[Optional[StreamState]], Awaitable[StreamState]]
+    ) -> StreamState:
+        """
+        Read the user's state, `advance` it and write it back only if nobody wrote in
+        between; otherwise re-read and advance again. Concurrent observations are
+        therefore applied one after the other instead of overwriting each other.
+        """
+        if not self.available:
+            return await advance(None)
+
+        key = self._key(user_id)
+        redis = self.cache.redis
+        for _ in range(UPDATE_ATTEMPTS):
+            try:
+                raw = await redis.get(key)
+            except Exception as e:
+                logger.warning(f"Stream state read failed: {e}")
+                return await advance(None)
+
+            state = await advance(self._decode(user_id, raw))
+            try:
+                written = await redis.eval(
+                    COMPARE_AND_SET_SCRIPT, 1, key, raw or "", json.dumps(state.to_dict()), self.ttl_seconds
+                )
+            except Exception as e:
+                logger.warning(f"Stream state write failed: {e}")
+                return state
+            if written:
+                return state
+
+        raise StreamStateConflictError(f"Stream state for {user_id} changed during {UPDATE_ATTEMPTS} attempts")
+
+    async def delete(self, user_id: str):
+        if self.available:
+            await self.cache.delete(self._key(user_id))
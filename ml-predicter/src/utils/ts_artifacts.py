@@ -0,0 +1,181 @@
+"""
+Compact artifact format for statsmodels state-space models (ARIMA / SARIMAX)
+
+A fitted results object pickles the full training data and smoother output
+(tens of MB for SARIMA). For forecasting we only need the model specification,
+the fitted parameters and the filter state at the end of the sample, so that is
+all this format stores. Loading re-runs the Kalman filter over a one-point tail
+from the saved state, which reproduces the original forecasts exactly.
+"""
+
+import json
+import logging
+from importlib import import_module
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+# Only these classes may be rebuilt from an artifact
+SUPPORTED_MODELS = {
+    "statsmodels.tsa.arima.model.ARIMA",
+    "statsmodels.tsa.statespace.sarimax.SARIMAX",
+}
+
+_TUPLE_KWDS = ("order", "seasonal_order")
+
+
+class CompactTimeSeriesModel:
+    """
+    Fitted parameters + model spec + end-of-sample filter state.
+    Exposes `get_forecast` so it can be used in place of a statsmodels results object.
+    """
+
+    def __init__(
+        self,
+        model_class: str,
+        init_kwds: Dict[str, Any],
+        params: np.ndarray,
+        endog_tail: np.ndarray,
+        state: np.ndarray,
+        state_cov: np.ndarray,
+        nobs: int,
+    ):
+        if model_class not in SUPPORTED_MODELS:
+            raise ValueError(f"Unsupported model class: {model_class}")
+
+        self.model_class = model_class
+        self.init_kwds = init_kwds
+        self.params = np.asarray(params, dtype=np.float64)
+        self.endog_tail = np.asarray(endog_tail, dtype=np.float64)
+        self.state = np.asarray(state, dtype=np.float64)
+        self.state_cov = np.asarray(state_cov, dtype=np.float64)
+        self.nobs = int(nobs)
+        self._results = None
+
+    @classmethod
+    def from_results(cls, results: Any) -> "CompactTimeSeriesModel":
+        """Extract the compact representation from a fitted statsmodels results object"""
+        model = results.model
+        model_class = f"{type(model).__module__}.{type(model).__name__}"
+
+        init_kwds = {k: v for k, v in model._get_init_kwds().items() if v is not None}
+        if init_kwds.get("simple_differencing"):
+            raise ValueError("Models fitted with simple_differencing are not supported")
+        if getattr(model, "k_exog", 0):
+            raise ValueError("Models with exogenous regressors are not supported")
+
+        nobs = int(model.nobs)
+        start = nobs - 1
+
+        # The tail model starts at `start`, so time-dependent trends must be offset
+        if "trend_offset" in init_kwds:
+            init_kwds["trend_offset"] = int(init_kwds["trend_offset"]) + start
+
+        endog = np.asarray(model.endog, dtype=np.float64).reshape(-1)
+
+        return cls(
+            model_class=model_class,
+            init_kwds=init_kwds,
+            params=np.asarray(results.params),
+            endog_tail=endog[start:],
+            state=results.predicted_state[:, start],
+            state_cov=results.predicted_state_cov[:, :, start],
+            nobs=nobs,
+        )
+
+    def model_type(self):
+        module_name, class_name = self.model_class.rsplit(".", 1)
+        return getattr(import_module(module_name), class_name)
+
+    def _build_kwds(self) -> Dict[str, Any]:
+        kwds = dict(self.init_kwds)
+        for key in _TUPLE_KWDS:
+            if key in kwds:
+                kwds[key] = tuple(kwds[key])
+        return kwds
+
+    @property
+    def results(self) -> Any:
+        """statsmodels results filtered over the tail from the saved state"""
+        if self._results is None:
+            model = self.model_type()(self.endog_tail, **self._build_kwds())
+            model.initialize_known(self.state, self.state_cov)
+            self._results = model.filter(self.params)
+        return self._results
+
+    def apply_kwds(self) -> Dict[str, Any]:
+        """Constructor arguments for applying the model to a new series from its start"""
+        kwds = self._build_kwds()
+        if "trend_offset" in kwds:
+            kwds["trend_offset"] -= self.nobs - len(self.endog_tail)
+        return kwds
+
+    def apply(self, endog: np.ndarray) -> Any:
+        """Filter a new series with the fitted parameters held fixed (no refit)"""
+        model = self.model_type()(np.asarray(endog, dtype=np.float64), **self.apply_kwds())
+        return model.filter(self.params)
+
+    def get_forecast(self, steps: int = 1, **kwargs) -> Any:
+        return self.results.get_forecast(steps=steps, **kwargs)
+
+    def forecast(self, steps: int = 1, **kwargs) -> np.ndarray:
+        return self.results.forecast(steps=steps, **kwargs)
+
+    @property
+    def order(self) -> Optional[tuple]:
+        order = self.init_kwds.get("order")
+        return tuple(order) if order is not None else None
+
+    def save(self, path) -> Path:
+        """Write the artifact as an uncompressed .npz (no pickled objects)"""
+        path = Path(path)
+        spec = {
+            "format_version": FORMAT_VERSION,
+            "model_class": self.model_class,
+            "init_kwds": self.init_kwds,
+            "nobs": self.nobs,
+        }
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                spec=np.array(json.dumps(spec)),
+                params=self.params,
+                endog_tail=self.endog_tail,
+                state=self.state,
+                state_cov=self.state_cov,
+            )
+        return path
+
+    @classmethod
+    def load(cls, path) -> "CompactTimeSeriesModel":
+        with np.load(path, allow_pickle=False) as data:
+            spec = json.loads(str(data["spec"]))
+            if spec.get("format_version") != FORMAT_VERSION:
+                raise ValueError(f"Unsupported artifact version: {spec.get('format_version')}")
+
+            return cls(
+                model_class=spec["model_class"],
+                init_kwds=spec["init_kwds"],
+                params=data["params"],
+                endog_tail=data["endog_tail"],
+                state=data["state"],
+                state_cov=data["state_cov"],
+                nobs=spec["nobs"],
+            )
+
+
+def save_compact_model(results: Any, path) -> Path:
+    """Convenience wrapper used by the training scripts"""
+    return CompactTimeSeriesModel.from_results(results).save(path)
+
+
+def load_compact_model(path) -> CompactTimeSeriesModel:
+    """Load an artifact and run the tail filter pass so the first forecast is warm"""
+    model = CompactTimeSeriesModel.load(path)
+    model.results
+    return model
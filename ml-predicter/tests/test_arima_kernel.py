@@ -0,0 +1,99 @@
+import warnings
+
+import numpy as np
+import pytest
+from statsmodels.tsa.arima.model import ARIMA
+
+from src.engines.forecast_engine import (
+    ARIMA_KERNEL_MAX_OBS,
+    IncomeForecastEngine,
+    _arma11_innovations,
+    fit_arima111,
+    forecast_arima111,
+)
+from src.utils.model_store import ModelStore
+
+
+def _simulate(rng, n, phi, theta):
+    """Unit-scale ARIMA(1,1,1) path (keeps statsmodels' approximate diffuse prior negligible)"""
+    shocks = rng.normal(size=n + 1)
+    diffs = np.zeros(n)
+    for t in range(1, n):
+        diffs[t] = phi * diffs[t - 1] + shocks[t] + theta * shocks[t - 1]
+    return 50 + np.cumsum(diffs)
+
+
+def _statsmodels_fit(y):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return ARIMA(y, order=(1, 1, 1)).fit()
+
+
+@pytest.mark.parametrize("n, phi, theta, seed", [
+    (24, -0.5, 0.3, 1),
+    (36, 0.6, -0.2, 6),
+    (60, 0.3, 0.4, 3),
+    (200, -0.6, -0.3, 4),
+    # Realistic lengths: ten years of months, a year of days, the inline cutoff
+    (120, 0.5, 0.2, 7),
+    (365, -0.3, 0.5, 8),
+    (ARIMA_KERNEL_MAX_OBS, 0.7, -0.4, 9),
+])
+def test_kernel_matches_statsmodels(n, phi, theta, seed):
+    y = _simulate(np.random.default_rng(seed), n, phi, theta)
+    reference = _statsmodels_fit(y)
+    fit = fit_arima111(y)
+
+    np.testing.assert_allclose([fit["phi"], fit["theta"]], reference.params[:2], atol=5e-3)
+    np.testing.assert_allclose(fit["sigma2"], reference.params[2], rtol=5e-3)
+    assert fit["llf"] == pytest.approx(reference.llf, abs=1e-3)
+
+    forecast = forecast_arima111(fit, 12)
+    expected = reference.get_forecast(steps=12).summary_frame()
+    np.testing.assert_allclose(forecast["forecast"], expected["mean"].values, rtol=1e-4, atol=1e-4)
+    np.testing.assert_allclose(forecast["ci_lower"], expected["mean_ci_lower"].values, rtol=1e-4, atol=1e-4)
+    np.testing.assert_allclose(forecast["ci_upper"], expected["mean_ci_upper"].values, rtol=1e-4, atol=1e-4)
+
+
+def test_likelihood_matches_statsmodels_at_same_params():
+    """The innovations recursion is the exact likelihood of the differenced series"""
+    y = _simulate(np.random.default_rng(5), 80, 0.4, 0.5)
+    reference = _statsmodels_fit(y)
+    phi, theta, sigma2 = reference.params
+
+    S, sum_log_r, _, _ = _arma11_innovations(np.diff(y), np.array([phi]), np.array([theta]))
+    m = len(y) - 1
+    llf = -0.5 * m * np.log(2 * np.pi * sigma2) - 0.5 * sum_log_r[0] - 0.5 * S[0] / sigma2
+
+    assert llf == pytest.approx(reference.llf, abs=1e-4)
+
+
+def test_kernel_never_worse_than_statsmodels_optimum():
+    """Short series can have an MA unit-root optimum that statsmodels' local search misses"""
+    rng = np.random.default_rng(11)
+    for _ in range(5):
+        y = _simulate(rng, 30, *rng.uniform(-0.8, 0.8, 2))
+        assert fit_arima111(y)["llf"] >= _statsmodels_fit(y).llf - 1e-3
+
+
+def test_kernel_rejects_unusable_series():
+    with pytest.raises(ValueError):
+        fit_arima111(np.array([1.0, 2.0]))
+    with pytest.raises(ValueError):
+        fit_arima111(np.array([1.0, np.nan, 2.0, 3.0]))
+
+
+@pytest.mark.parametrize("n, uses_pool", [(ARIMA_KERNEL_MAX_OBS, False), (ARIMA_KERNEL_MAX_OBS + 1, True)])
+def test_long_series_are_fitted_through_the_fitting_service(monkeypatch, n, uses_pool):
+    engine = IncomeForecastEngine(model_store=ModelStore("/nonexistent"), ensemble_models=["arima"])
+    calls = []
+    run_fit = engine._run_fit
+    monkeypatch.setattr(engine, "_run_fit", lambda fn, *args: calls.append(fn) or run_fit(fn, *args))
+    y = _simulate(np.random.default_rng(10), n, 0.4, 0.2)
+    dates = np.datetime64("2020-01-01") + np.arange(n)
+    df = engine.prepare_data(dates=[str(d) for d in dates], values=y.tolist())
+
+    result = engine.forecast_arima(df, periods=6)
+
+    assert bool(calls) == uses_pool
+    np.testing.assert_allclose(result["forecast"], forecast_arima111(fit_arima111(y), 6)["forecast"], rtol=1e-4)
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+from statsmodels.tsa.arima.model import ARIMA
+
+from src.engines.backtest import BacktestConfig, RollingOriginBacktester
+from src.engines.forecast_engine import IncomeForecastEngine
+from src.engines.state_space import StateSpaceSystem
+from src.engines.windowing import WindowingConfig
+from src.utils.model_store import ModelStore
+from src.utils.ts_artifacts import CompactTimeSeriesModel
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(11)
+
+
+@pytest.fixture
+def engine(tmp_path, rng):
+    engine = IncomeForecastEngine(str(tmp_path), model_store=ModelStore(str(tmp_path)), ensemble_models=["arima"])
+    results = ARIMA(50000 + np.cumsum(rng.normal(0, 500, 150)), order=(1, 1, 1)).fit()
+    compact = CompactTimeSeriesModel.from_results(results)
+    engine._systems["arima"] = StateSpaceSystem.from_statsmodels(compact.model_type(), compact.apply_kwds(), compact.params)
+    return engine
+
+
+def test_incremental_kalman_state_matches_refiltering(engine, rng):
+    """Carrying the filter state across origins equals filtering each prefix from scratch"""
+    values = 52000 + np.cumsum(rng.normal(0, 400, (5, 40)), axis=1)
+    dates = np.tile(np.datetime64("2024-01-01") + np.arange(40), (5, 1))
+    config = BacktestConfig(horizon=4, min_train=20, step=3)
+    scores = RollingOriginBacktester(engine, config).run_group(dates, values)
+
+    system = engine._systems["arima"]
+    errors = []
+    for origin in config.origins(40):
+        mean, _ = system.forecast(*system.filter(values[:, :origin]), 4)
+        errors.append(mean - values[:, origin:origin + 4])
+    errors = np.concatenate(errors)
+
+    arima = scores["arima"]
+    assert arima.n_forecasts == len(errors)
+    np.testing.assert_allclose(arima.sq_error, (errors ** 2).sum(axis=0), rtol=1e-9)
+    np.testing.assert_allclose(arima.abs_error, np.abs(errors).sum(axis=0), rtol=1e-9)
+
+
+def test_inverse_mse_weights_feed_the_ensemble(engine, rng):
+    series = [(np.datetime64("2024-01-01") + np.arange(48), 40000 + np.cumsum(rng.normal(0, 300, 48))) for _ in range(6)]
+    engine.ensemble_models = ("arima", "exponential_smoothing")
+    result = RollingOriginBacktester(engine, BacktestConfig(horizon=3, min_train=24)).run(series)
+
+    inverse = {name: 1 / result.scores[name].mse for name in engine.ensemble_models}
+    weights = result.ensemble_weights()
+    assert weights == pytest.approx({name: value / sum(inverse.values()) for name, value in inverse.items()})
+    assert {row["model"] for row in result.table()} == {"arima", "exponential_smoothing", "ensemble"}
+
+    # Weights are renormalized over the sub-models that produced a forecast
+    engine.ensemble_weights = {**weights, "rf": 0.5}
+    combined, used = engine.combine_forecasts({"arima": np.ones(3), "exponential_smoothing": np.zeros(3)})
+    assert sum(used.values()) == pytest.approx(1.0)
+    np.testing.assert_allclose(combined, used["arima"])
+
+
+def test_unscored_sub_model_gets_the_mean_weight(engine):
+    engine.ensemble_weights = {"arima": 0.75, "exponential_smoothing": 0.25}
+    _, used = engine.combine_forecasts({"arima": np.ones(3), "sarima": np.ones(3)})
+    assert used == pytest.approx({"arima": 0.75 / 1.25, "sarima": 0.5 / 1.25})
+
+
+def test_weights_missing_a_sub_model_are_ignored(tmp_path, engine, rng):
+    series = [(np.datetime64("2024-01-01") + np.arange(48), 40000 + np.cumsum(rng.normal(0, 300, 48))) for _ in range(4)]
+    engine.ensemble_models = ("arima", "exponential_smoothing")
+    result = RollingOriginBacktester(engine, BacktestConfig(horizon=3, min_train=24, source="test panel")).run(series)
+    result.save_weights(tmp_path / "income_ensemble_weights.json")
+
+    store = ModelStore(str(tmp_path)).load_all()
+    covered = IncomeForecastEngine(str(tmp_path), model_store=store, ensemble_models=["arima", "exponential_smoothing"])
+    stale = IncomeForecastEngine(str(tmp_path), model_store=store, ensemble_models=["arima", "sarima"])
+
+    assert covered.ensemble_weights == pytest.approx(result.ensemble_weights())
+    assert stale.ensemble_weights is None
+
+
+def test_backtest_scores_windowed_series_and_keeps_synthetic_weights(tmp_path, engine, rng):
+    """Daily histories are resampled as the route would; synthetic runs write no weights"""
+    days = np.datetime64("2021-01-01") + np.arange(3 * 365)
+    series = [(days, 40000 + np.cumsum(rng.normal(0, 100, len(days)))) for _ in range(3)]
+    engine.windowing = WindowingConfig()
+    config = BacktestConfig(horizon=3, min_train=24)
+    result = RollingOriginBacktester(engine, config).run(series)
+
+    assert result.to_dict()["windowing"]["target_freq"] == "auto"
+    # Three years of days become 36 monthly points per series
+    assert result.scores["arima"].n_forecasts == 3 * len(config.origins(36))
+    with pytest.raises(ValueError):
+        result.save_weights(tmp_path / "income_ensemble_weights.json")
+
+
+def test_weighted_interval_contains_the_forecast(engine, rng):
+    forecasts = {name: rng.normal(0, 100, (50, 6)) for name in ("arima", "sarima", "exponential_smoothing")}
+    unweighted, _ = engine.combine_forecasts(forecasts)
+    ci_lower, ci_upper = engine.ensemble_interval(forecasts, unweighted, None)
+    stacked = np.stack(list(forecasts.values()))
+    np.testing.assert_array_equal(ci_lower, np.minimum(np.percentile(stacked, 2.5, axis=0), unweighted))
+
+    for _ in range(5):
+        engine.ensemble_weights = dict(zip(forecasts, rng.dirichlet([0.3] * 3)))
+        combined, weights = engine.combine_forecasts(forecasts)
+        ci_lower, ci_upper = engine.ensemble_interval(forecasts, combined, weights)
+        assert np.all(ci_lower <= combined) and np.all(combined <= ci_upper)
+        assert np.all(ci_lower >= stacked.min(axis=0)) and np.all(ci_upper <= stacked.max(axis=0))
+
+    # Same rule on the batch path
+    engine.ensemble_models = ("arima", "exponential_smoothing")
+    engine.ensemble_weights = {"arima": 0.97, "exponential_smoothing": 0.03}
+    series = [(np.datetime64("2024-01-01") + np.arange(30), 40000 + np.cumsum(rng.normal(0, 300, 30))) for _ in range(8)]
+    for result in engine.batch_forecast(series, periods=6):
+        assert np.all(np.array(result["ci_lower"]) <= result["forecast"])
+        assert np.all(np.array(result["forecast"]) <= result["ci_upper"])
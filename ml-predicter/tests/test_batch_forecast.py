@@ -0,0 +1,113 @@
+import json
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.routes import forecast as forecast_routes
+from src.engines.forecast_engine import IncomeForecastEngine
+from src.engines.windowing import WindowingConfig
+from src.utils.model_store import ModelStore
+
+
+def make_series(rng, n, step_days=1, start="2023-01-31"):
+    dates = np.datetime64(start) + np.arange(n) * step_days
+    return dates, 40000 + np.cumsum(rng.normal(0, 300, n))
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(23)
+
+
+@pytest.fixture
+def engine():
+    return IncomeForecastEngine(model_store=ModelStore("/nonexistent"), ensemble_models=["exponential_smoothing"])
+
+
+def single(engine, dates, values, periods):
+    df = engine.prepare_data(dates=[str(d) for d in dates], values=values.tolist())
+    return engine.ensemble_forecast(df, periods=periods)
+
+
+def test_batch_matches_single_series_and_reports_errors(engine, rng):
+    series = [
+        make_series(rng, 40),
+        make_series(rng, 40),
+        make_series(rng, 40, step_days=7),
+        make_series(rng, 30, step_days=30),
+        (np.array(["2024-01-01"], dtype="datetime64[D]"), np.array([1.0])),
+    ]
+    results = engine.batch_forecast(series, periods=4)
+
+    for (dates, values), result in zip(series[:4], results):
+        np.testing.assert_allclose(result["forecast"], single(engine, dates, values, 4)["forecast"], rtol=1e-6)
+    assert "error" in results[4]
+
+
+def test_fallback_keeps_group_calendar_and_does_not_rewindow(rng, monkeypatch):
+    """Groups without a vectorized sub-model run the per-series ensemble on their own dates"""
+    engine = IncomeForecastEngine(
+        model_store=ModelStore("/nonexistent"), ensemble_models=["arima"], windowing=WindowingConfig()
+    )
+    calls = []
+    ensemble_forecast = engine.ensemble_forecast
+    monkeypatch.setattr(
+        engine, "ensemble_forecast",
+        lambda df, periods, **kwargs: calls.append((df.index.values, kwargs)) or ensemble_forecast(df, periods, **kwargs)
+    )
+    dates, values = make_series(rng, 30, step_days=30)
+
+    result = engine.batch_forecast([(dates, values)], periods=3)[0]
+
+    index, kwargs = calls[0]
+    np.testing.assert_array_equal(index.astype("datetime64[D]"), dates)
+    assert kwargs == {"window": False}
+    assert result["preprocessing"]["target_freq"] == "M"
+    np.testing.assert_allclose(result["forecast"], ensemble_forecast(engine.prepare_data(
+        dates=[str(d) for d in dates], values=values.tolist()), 3)["forecast"], rtol=1e-9)
+
+
+@pytest.fixture
+def client(engine):
+    app = FastAPI()
+    app.include_router(forecast_routes.router)
+    app.state.forecast_engine = engine
+    return TestClient(app)
+
+
+def payload(rng, user_id, n=30):
+    dates, values = make_series(rng, n)
+    return {"user_id": user_id, "dates": [str(d) for d in dates], "values": values.tolist()}
+
+
+def test_batch_route_json_and_ndjson(client, rng):
+    series = [payload(rng, "a"), payload(rng, "b"), {"user_id": "c", "dates": ["2024-01-01"], "values": [None]}]
+
+    response = client.post("/forecast/income/batch", json={"series": series, "periods_ahead": 3})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["periods_ahead"] == 3
+    assert [r["user_id"] for r in body["results"]] == ["a", "b", "c"]
+    assert len(body["results"][0]["forecast"]) == 3
+    assert "error" in body["results"][2]
+
+    ndjson = "\n".join(json.dumps(s) for s in series[:2]) + "\n\n"
+    response = client.post(
+        "/forecast/income/batch?periods_ahead=2", content=ndjson, headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    assert [r["forecast"] for r in response.json()["results"]] == [r["forecast"][:2] for r in body["results"][:2]]
+
+
+def test_batch_route_rejects_oversized_and_malformed_input(client, rng, monkeypatch):
+    monkeypatch.setattr(forecast_routes.settings, "BATCH_MAX_SERIES", 1)
+    response = client.post("/forecast/income/batch", json={"series": [payload(rng, "a"), payload(rng, "b")]})
+    assert response.status_code == 413
+
+    response = client.post(
+        "/forecast/income/batch", content='{"user_id": "a"}\nnot json', headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 400
+    assert "line 1" in response.json()["detail"]
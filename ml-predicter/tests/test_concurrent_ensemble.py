@@ -0,0 +1,63 @@
+import threading
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.routes import forecast as forecast_routes
+from src.engines.forecast_engine import IncomeForecastEngine
+from src.utils.forecast_cache import ForecastCache
+from src.utils.model_store import ModelStore
+
+DATES = [str(np.datetime64("2022-01-31") + 30 * i) for i in range(36)]
+VALUES = list(45000 + 150.0 * np.arange(36))
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    """Holt-Winters answers at once; SARIMA blocks until the test releases it"""
+    engine = IncomeForecastEngine(
+        model_store=ModelStore("/nonexistent"),
+        ensemble_models=["exponential_smoothing", "sarima"],
+        concurrent_ensemble=True,
+        latency_budget_ms=200,
+    )
+    release = threading.Event()
+    calls = []
+
+    def slow_sarima(data, periods=6):
+        calls.append(periods)
+        release.wait(5)
+        return {"model": "SARIMA", "forecast": [0.0] * periods, "ci_lower": [0.0] * periods,
+                "ci_upper": [0.0] * periods, "using_pretrained": False}
+
+    monkeypatch.setattr(engine, "forecast_sarima", slow_sarima)
+    engine.slow_calls = calls
+    yield engine
+    release.set()
+
+
+def test_slow_sub_model_is_dropped_and_reported(engine):
+    df = engine.prepare_data(dates=DATES, values=VALUES)
+    result = engine.ensemble_forecast(df, periods=6)
+
+    assert engine.slow_calls == [6]
+    assert result["sub_models"] == ["exponential_smoothing"]
+    assert result["dropped_sub_models"] == ["sarima"]
+    assert "sarima" not in (result["weights"] or {})
+    expected = engine.forecast_exponential_smoothing(df, periods=6)["forecast"]
+    np.testing.assert_allclose(result["forecast"], expected)
+
+
+def test_route_does_not_cache_results_with_dropped_sub_models(engine):
+    app = FastAPI()
+    app.include_router(forecast_routes.router)
+    app.state.forecast_engine = engine
+    app.state.forecast_cache = cache = ForecastCache()
+
+    response = TestClient(app).post("/forecast/income", json={"user_id": "u", "dates": DATES, "values": VALUES})
+
+    assert response.status_code == 200
+    assert len(response.json()["forecast"]) == 6
+    assert cache.stats()["local_entries"] == 0
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.engines.feature_builder import (
+    DemographicEncoder,
+    FeatureBuilder,
+    FeatureSpec,
+    calendar_features,
+    lag_features,
+)
+
+
+def test_calendar_features_match_pandas():
+    dates = pd.date_range("1999-12-20", "2031-03-10", freq="D")
+    names = ["dayofweek", "dayofmonth", "dayofyear", "month", "quarter", "year"]
+    expected = np.column_stack([dates.dayofweek, dates.day, dates.dayofyear, dates.month, dates.quarter, dates.year])
+
+    X = calendar_features(dates.values, names)
+
+    assert X.flags.c_contiguous
+    np.testing.assert_array_equal(X, expected)
+
+
+def test_lag_features_batch_and_single_agree():
+    values = np.arange(20, dtype=float).reshape(2, 10)
+    batch = lag_features(values, [1, 3])
+
+    np.testing.assert_array_equal(batch[1], lag_features(values[1], [1, 3]))
+    assert np.isnan(batch[0, :3, 1]).all()
+    np.testing.assert_array_equal(batch[0, 3:, 1], values[0, :7])
+
+
+def test_future_features_continue_the_calendar():
+    builder = FeatureBuilder(FeatureSpec())
+    last = np.array(["2024-12-30", "2025-02-27"], dtype="datetime64[D]")
+
+    X = builder.build_future(last, 3)
+    expected = np.vstack([
+        builder.build(last[i] + np.arange(1, 4)) for i in range(len(last))
+    ])
+    np.testing.assert_array_equal(X, expected)
+
+
+def test_spec_round_trip(tmp_path):
+    spec = FeatureSpec(calendar=("month", "dayofweek"), lags=(1, 12))
+    loaded = FeatureSpec.load(spec.save(tmp_path / "features.json"))
+
+    assert loaded == spec
+    assert loaded.columns == ["month", "dayofweek", "lag_1", "lag_12"]
+
+
+def test_spec_rejects_unknown_version_and_features():
+    with pytest.raises(ValueError):
+        FeatureSpec.from_dict({"version": 99, "calendar": ["month"]})
+    with pytest.raises(ValueError):
+        FeatureSpec(calendar=("hourofday",))
+
+
+FEATURE_NAMES = [
+    "age", "capital_gain", "hours_per_week",
+    "workclass_Private", "workclass_Self-emp", "marital_status_Never-married",
+    "marital_status_Married-civ-spouse", "native_country_United-States", "gender_Male",
+]
+
+
+def _reference_row(profile, feature_names):
+    """The original per-request loop: numeric defaults, then f"{key}_{value}" matching"""
+    row = {
+        "age": profile.get("age", 30),
+        "capital_gain": profile.get("capital_gain", 0),
+        "capital_loss": profile.get("capital_loss", 0),
+        "hours_per_week": profile.get("hours_per_week", 40),
+    }
+    for feat in feature_names:
+        if feat in row:
+            continue
+        row[feat] = int(any(f"{key}_{value}" == feat for key, value in profile.items()))
+    return [row[feat] for feat in feature_names]
+
+
+@pytest.mark.parametrize("profile", [
+    {},
+    {"age": 41, "workclass": "Private", "marital_status": "Married-civ-spouse", "gender": "Male"},
+    {"hours_per_week": 60, "workclass": "Unknown", "native_country": "United-States", "extra": 1},
+])
+def test_demographic_encoder_matches_reference_loop(profile):
+    encoder = DemographicEncoder(FEATURE_NAMES)
+    np.testing.assert_array_equal(encoder.encode(profile), _reference_row(profile, FEATURE_NAMES))
+
+
+def test_demographic_batch_equals_rows():
+    encoder = DemographicEncoder(FEATURE_NAMES)
+    profiles = [{"age": 25, "gender": "Male"}, {"workclass": "Self-emp"}]
+    X = encoder.encode_batch(profiles)
+
+    assert X.shape == (2, len(FEATURE_NAMES))
+    for row, profile in zip(X, profiles):
+        np.testing.assert_array_equal(row, encoder.encode(profile))
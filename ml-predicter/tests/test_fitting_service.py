@@ -0,0 +1,72 @@
+import time
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.routes import forecast as forecast_routes
+from src.engines.forecast_engine import IncomeForecastEngine
+from src.utils.fitting_service import FittingQueueFullError, FittingService, FittingTimeoutError
+from src.utils.model_store import ModelStore
+
+
+@pytest.fixture
+def service():
+    service = FittingService(max_workers=1, max_pending=2, timeout_seconds=5).start()
+    yield service
+    service.shutdown()
+
+
+def wait_drained(service, timeout=5.0):
+    """Slots are released by done-callbacks, which may run just after result() returns"""
+    deadline = time.monotonic() + timeout
+    while service.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return service.pending
+
+
+def test_submit_rejects_at_max_pending_and_drains(service):
+    running = [service.submit(time.sleep, 0.3) for _ in range(2)]
+    assert service.pending == 2
+    with pytest.raises(FittingQueueFullError):
+        service.submit(time.sleep, 0)
+
+    for future in running:
+        future.result(timeout=5)
+    assert wait_drained(service) == 0
+    assert service.run(sum, [1, 2, 3]) == 6
+
+
+def test_failed_jobs_release_their_slot(service):
+    with pytest.raises(ValueError):
+        service.run(int, "not a number")
+    assert wait_drained(service) == 0
+
+
+def test_timeout_keeps_the_slot_until_the_fit_finishes(service):
+    with pytest.raises(FittingTimeoutError):
+        service.run(time.sleep, 0.5, timeout=0.05)
+    # The running job cannot be cancelled, so it still counts against max_pending
+    assert service.pending == 1
+    assert wait_drained(service) == 0
+
+
+def test_saturated_service_turns_into_503():
+    service = FittingService(max_workers=1, max_pending=0)
+    engine = IncomeForecastEngine(
+        model_store=ModelStore("/nonexistent"), fitting_service=service, ensemble_models=["sarima"]
+    )
+    app = FastAPI()
+    app.include_router(forecast_routes.router)
+    app.state.forecast_engine = engine
+    dates = np.datetime64("2022-01-31") + 30 * np.arange(36)
+    body = {"user_id": "u", "dates": [str(d) for d in dates], "values": list(40000 + 100.0 * np.arange(36))}
+
+    try:
+        response = TestClient(app).post("/forecast/income", json=body)
+    finally:
+        service.shutdown()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
@@ -0,0 +1,113 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.engines.forecast_engine import IncomeForecastEngine
+from src.utils import forecast_cache
+from src.utils.forecast_cache import ForecastCache
+from src.utils.model_store import ModelStore
+
+
+class DictCache:
+    """CacheManager stand-in: JSON values with their TTLs"""
+
+    def __init__(self):
+        self.data, self.ttls = {}, {}
+
+    async def get_json(self, key):
+        return self.data.get(key)
+
+    async def set_json(self, key, value, ttl_seconds=3600):
+        self.data[key], self.ttls[key] = value, ttl_seconds
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(forecast_cache.time, "monotonic", clock)
+    return clock
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_key_depends_on_series_and_fingerprint():
+    dates = np.datetime64("2024-01-01") + np.arange(10)
+    values = 100.0 + np.arange(10)
+    fingerprint = {"models": {"income_arima": "10:1"}, "ensemble_models": ["arima"]}
+
+    key = ForecastCache.make_key(dates, values, fingerprint)
+    # Same series in other dtypes / resolutions, same fingerprint with other key order
+    assert key == ForecastCache.make_key(
+        dates.astype("datetime64[ns]"), values.astype(np.int64),
+        {"ensemble_models": ["arima"], "models": {"income_arima": "10:1"}}
+    )
+    assert key != ForecastCache.make_key(dates, values + 1, fingerprint)
+    assert key != ForecastCache.make_key(dates, values, {**fingerprint, "models": {"income_arima": "10:2"}})
+
+
+def test_hit_serves_shorter_horizons_and_misses_longer_ones():
+    engine = IncomeForecastEngine(model_store=ModelStore("/nonexistent"), ensemble_models=["exponential_smoothing"])
+    dates = np.datetime64("2024-01-31") + 30 * np.arange(30)
+    df = engine.prepare_data(dates=[str(d) for d in dates], values=list(40000 + 100.0 * np.arange(30)))
+    full = engine.ensemble_forecast(df, periods=12)
+    cache = ForecastCache()
+
+    run(cache.set("k", full, 12))
+    hit = run(cache.get("k", 6))
+    sliced = engine.slice_forecast(hit, 6)
+    assert sliced["forecast"] == full["forecast"][:6]
+    assert sliced["ci_upper"] == full["ci_upper"][:6]
+    assert sliced["forecast"] == engine.ensemble_forecast(df, periods=6)["forecast"]
+
+    assert run(cache.get("k", 13)) is None
+    assert run(cache.get("other", 1)) is None
+    assert cache.stats() == {
+        "hits_local": 1, "hits_redis": 0, "misses": 2, "hit_rate": round(1 / 3, 4), "local_entries": 1
+    }
+
+
+def test_local_tier_evicts_least_recently_used(clock):
+    cache = ForecastCache(max_entries=2)
+    run(cache.set("a", {"v": 1}, 6))
+    run(cache.set("b", {"v": 2}, 6))
+    assert run(cache.get("a", 6)) == {"v": 1}  # a is now the most recent
+    run(cache.set("c", {"v": 3}, 6))
+
+    assert run(cache.get("b", 6)) is None
+    assert run(cache.get("a", 6)) == {"v": 1}
+    assert run(cache.get("c", 6)) == {"v": 3}
+
+
+def test_ttl_override_applies_to_both_tiers(clock):
+    redis = DictCache()
+    cache = ForecastCache(redis, ttl_seconds=60)
+    run(cache.set("default", {"v": 1}, 6))
+    run(cache.set("precomputed", {"v": 2}, 6, ttl_seconds=600))
+    assert redis.ttls == {"forecast:default": 60, "forecast:precomputed": 600}
+
+    clock.now += 120
+    redis.data.clear()  # only the local tier can answer now
+    assert run(cache.get("default", 6)) is None
+    assert run(cache.get("precomputed", 6)) == {"v": 2}
+
+
+def test_redis_hits_are_promoted_to_the_local_tier(clock):
+    redis = DictCache()
+    run(ForecastCache(redis).set("k", {"v": 1}, 6))
+    cache = ForecastCache(redis)
+
+    assert run(cache.get("k", 6)) == {"v": 1}
+    assert run(cache.get("k", 6)) == {"v": 1}
+    stats = cache.stats()
+    assert (stats["hits_redis"], stats["hits_local"], stats["misses"]) == (1, 1, 0)
@@ -0,0 +1,83 @@
+import asyncio
+import json
+
+import numpy as np
+
+from src.engines.forecast_engine import IncomeForecastEngine
+from src.utils.forecast_precompute import ForecastPrecomputer
+from src.utils.model_store import ModelStore
+
+
+def income_series(seed):
+    rng = np.random.default_rng(seed)
+    dates = [str(np.datetime64("2022-01-31") + 30 * i) for i in range(36)]
+    return dates, (45000 + np.cumsum(rng.normal(0, 300, 36))).tolist()
+
+
+class OfflinePrecomputer(ForecastPrecomputer):
+    """Pages from memory; inserts serialize the rows as the database statement would"""
+
+    def __init__(self, engine, page_list, fail_users=()):
+        super().__init__(db=None, engine=engine, horizon=6, concurrency=2)
+        self.page_list = page_list
+        self.fail_users = fail_users
+        self.inserted = []
+
+    async def pages(self):
+        for page in self.page_list:
+            yield page
+
+    async def _existing(self, prepared):
+        return {}
+
+    async def _bulk_insert(self, rows):
+        if any(row["user_id"] in self.fail_users for row in rows):
+            raise RuntimeError("insert failed")
+        json.dumps(rows, default=float, allow_nan=False)
+        self.inserted.extend(rows)
+        return {row["user_id"]: f"p-{row['user_id']}" for row in rows}
+
+
+def test_precompute_matches_route_and_contains_failed_pages():
+    engine = IncomeForecastEngine(model_store=ModelStore("/nonexistent"), ensemble_models=["exponential_smoothing"])
+    pages = [{"a": income_series(1), "b": income_series(2)}, {"c": income_series(3)}]
+    precomputer = OfflinePrecomputer(engine, pages, fail_users={"c"})
+
+    stats = asyncio.run(precomputer.run())
+
+    assert stats["pages"] == 2 and stats["users"] == 3
+    assert stats["computed"] == 2 and stats["failed"] == 1
+    for row in precomputer.inserted:
+        df = engine.prepare_data(dates=pages[0][row["user_id"]][0], values=pages[0][row["user_id"]][1])
+        expected = engine.ensemble_forecast(df, periods=6)
+        np.testing.assert_allclose(row["prediction"]["result"]["forecast"], expected["forecast"])
+
+
+def test_non_finite_results_are_not_stored(monkeypatch):
+    engine = IncomeForecastEngine(model_store=ModelStore("/nonexistent"), ensemble_models=["exponential_smoothing"])
+    forecast = engine.ensemble_forecast
+    monkeypatch.setattr(
+        engine, "ensemble_forecast",
+        lambda df, periods: {**forecast(df, periods=periods), "ci_upper": [float("inf")] * periods}
+    )
+    precomputer = OfflinePrecomputer(engine, [{"a": income_series(1)}])
+
+    stats = asyncio.run(precomputer.run())
+
+    assert stats["failed"] == 1 and stats["computed"] == 0
+    assert precomputer.inserted == []
+
+
+def test_results_with_dropped_sub_models_are_not_stored(monkeypatch):
+    engine = IncomeForecastEngine(model_store=ModelStore("/nonexistent"), ensemble_models=["exponential_smoothing"])
+    forecast = engine.ensemble_forecast
+    monkeypatch.setattr(
+        engine, "ensemble_forecast",
+        lambda df, periods: {**forecast(df, periods=periods), "dropped_sub_models": ["sarima"]}
+    )
+    precomputer = OfflinePrecomputer(engine, [{"a": income_series(1)}])
+
+    stats = asyncio.run(precomputer.run())
+
+    assert stats["failed"] == 1 and stats["computed"] == 0
+    assert precomputer.inserted == []
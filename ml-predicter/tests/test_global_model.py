@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.engines.forecast_engine import IncomeForecastEngine
+from src.engines.global_model import (
+    GlobalIncomeModel, build_training_set, fit_global_model, future_dates, residual_quantiles
+)
+from src.utils.model_store import ModelStore
+
+
+class RecordingEstimator:
+    """Returns zeros and keeps every design matrix it is asked to predict"""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, X):
+        self.calls.append(X)
+        return np.zeros(len(X))
+
+
+@pytest.fixture
+def panel():
+    rng = np.random.default_rng(23)
+    series = []
+    for n in (40, 55, 70):
+        level = rng.uniform(30000, 90000)
+        t = np.arange(n)
+        series.append((np.datetime64("2024-01-01") + t, level * (1 + 0.05 * np.sin(t / 5) + rng.normal(0, 0.02, n))))
+    return series
+
+
+def test_serving_features_match_training_windows(panel):
+    dates, values = panel[1]
+    origin, horizon = 30, 5
+    X_train, y_train = build_training_set([(dates, values)], max_horizon=horizon)
+
+    model = GlobalIncomeModel(RecordingEstimator(), max_horizon=horizon)
+    model.forecast(dates[origin - 1:origin], [values[:origin]], horizon, "D")
+
+    # Rows are origin-major, starting at MIN_HISTORY; every horizon is observed this early
+    start = (origin - 2) * horizon
+    np.testing.assert_array_equal(model.estimator.calls[0], X_train[start:start + horizon])
+    scale = np.mean(np.abs(values[origin - model.window:origin]))
+    np.testing.assert_allclose(y_train[start:start + horizon] * scale, values[origin:origin + horizon], rtol=1e-12)
+
+
+def test_monthly_future_dates_clip_to_month_end():
+    last = np.array(["2024-01-31", "2024-03-15"], dtype="datetime64[D]")
+    expected = np.array([["2024-02-29", "2024-03-31"], ["2024-04-15", "2024-05-15"]], dtype="datetime64[D]")
+    np.testing.assert_array_equal(future_dates(last, 2, "M"), expected)
+
+
+def test_engine_serves_global_model_in_one_predict(tmp_path, panel):
+    model = fit_global_model(panel, max_horizon=6, max_iter=20)
+    engine = IncomeForecastEngine(str(tmp_path), model_store=ModelStore(str(tmp_path)), ensemble_models=["global"])
+    engine.models["global"] = model
+
+    # Cold start: a single observation is enough
+    one = pd.DataFrame({"value": [50000.0]}, index=pd.DatetimeIndex(["2024-03-01"]))
+    result = engine.ensemble_forecast(one, periods=3)
+    assert result["sub_models"] == ["global"] and np.all(np.isfinite(result["forecast"]))
+
+    recorder = GlobalIncomeModel(RecordingEstimator(), model.spec, model.max_horizon)
+    engine.models["global"] = recorder
+    series = [(dates[:30], values[:30]) for dates, values in panel]
+    results = engine.batch_forecast(series, periods=4)
+    assert len(recorder.estimator.calls) == 1 and recorder.estimator.calls[0].shape[0] == 3 * 4
+    assert all(r["sub_models"] == ["global"] for r in results)
+
+
+def test_residual_quantiles_per_horizon_carry_forward():
+    horizon = np.array([1, 1, 1, 1, 2, 2, 2, 2])
+    target = np.array([0.0, 1.0, 2.0, 3.0, 0.0, 0.0, 0.0, 0.0])
+    q = residual_quantiles(np.zeros(8), target, horizon, max_horizon=3)
+
+    np.testing.assert_allclose(q[:, 0], np.percentile([0, 1, 2, 3], [2.5, 97.5]))
+    np.testing.assert_allclose(q[:, 1], [0.0, 0.0])
+    np.testing.assert_allclose(q[:, 2], q[:, 1])  # no horizon-3 residuals
+    assert residual_quantiles(np.zeros(2), np.zeros(2), np.array([2, 2]), max_horizon=2) is None
+
+
+def test_calibrated_interval_covers_unseen_series():
+    rng = np.random.default_rng(5)
+    t = np.arange(60)
+
+    def make(n):
+        levels = rng.uniform(30000, 90000, (n, 1))
+        return levels * (1 + 0.05 * np.sin(t / 5) + rng.normal(0, 0.03, (n, 60)))
+
+    dates = np.datetime64("2024-01-01") + t
+    model = fit_global_model([(dates, values) for values in make(10)], max_horizon=6, max_iter=50)
+    assert model.residual_quantiles.shape == (2, 6)
+
+    test = make(20)
+    last_dates = np.full(20, dates[47])
+    mean, lower, upper = model.forecast_interval(last_dates, test[:, :48], 6, "D")
+    actual = test[:, 48:54]
+    np.testing.assert_allclose(mean, model.forecast(last_dates, test[:, :48], 6, "D"))
+    assert np.all(lower < mean) and np.all(mean < upper)
+    assert np.mean((lower <= actual) & (actual <= upper)) > 0.8
+
+
+def test_engine_interval_of_global_model(tmp_path, panel):
+    engine = IncomeForecastEngine(str(tmp_path), model_store=ModelStore(str(tmp_path)), ensemble_models=["global"])
+    one = pd.DataFrame({"value": [50000.0]}, index=pd.DatetimeIndex(["2024-03-01"]))
+
+    # Calibrated: a cold-start user gets the model's own interval, not a zero-width one
+    engine.models["global"] = fit_global_model(panel, max_horizon=6, max_iter=20)
+    result = engine.ensemble_forecast(one, periods=3)
+    assert np.all(np.array(result["ci_lower"]) < result["forecast"])
+    assert np.all(np.array(result["ci_upper"]) > result["forecast"])
+
+    # Uncalibrated: no interval of its own
+    engine.models["global"] = GlobalIncomeModel(RecordingEstimator(), max_horizon=6)
+    sub_model = engine.forecast_global(one, periods=3)
+    assert sub_model["ci_lower"] is None and sub_model["ci_upper"] is None
+    result = engine.ensemble_forecast(one, periods=3)
+    assert result["ci_lower"] == result["forecast"] == result["ci_upper"]
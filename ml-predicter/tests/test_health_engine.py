@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from src.engines.health_engine import HealthPredictionEngine
+from src.utils.model_store import ModelStore
+
+
+@pytest.fixture
+def engine():
+    return HealthPredictionEngine(model_store=ModelStore("/nonexistent"))
+
+
+def test_batch_stress_scores_match_single_rows(engine):
+    rng = np.random.default_rng(5)
+    columns = ["work_hours", "sleep_hours", "mood_score", "caffeine_cups", "meditation_minutes"]
+    values = rng.uniform(0, 14, size=(300, len(columns)))
+    values[rng.random(values.shape) < 0.1] = np.nan
+
+    scores = engine.calculate_stress_scores(values, columns)
+
+    for i, row in enumerate(values):
+        single = engine.calculate_stress_score({name: v for name, v in zip(columns, row) if not np.isnan(v)})
+        assert single["overall_score"] == round(float(scores["overall_score"][i]), 2)
+        assert single["risk_level"] == scores["risk_level"][i]
+        for name, component in single["components"].items():
+            assert component == round(float(scores["components"][name][i]), 2)
+
+
+def test_absent_and_missing_metrics_take_defaults(engine):
+    defaults = engine.calculate_stress_score({})
+    scores = engine.calculate_stress_scores(np.array([[np.nan], [np.nan]]), ["sleep_hours"])
+
+    np.testing.assert_array_equal(np.round(scores["overall_score"], 2), defaults["overall_score"])
+    np.testing.assert_array_equal(scores["risk_level"], [defaults["risk_level"]] * 2)
+    with pytest.raises(ValueError):
+        engine.calculate_stress_scores(np.zeros((2, 3)), ["work_hours"])
+
+
+def test_cohort_risks_match_per_user_path(engine):
+    rng = np.random.default_rng(9)
+    columns = ["sleep_hours", "stress_score", "exercise_minutes"]
+    values = rng.normal([6.5, 60, 25], [1, 20, 12], size=(40, 35, 3))
+    values[rng.random(values.shape) < 0.05] = np.nan
+
+    cohort = engine.predict_health_risks_cohort(values, columns)
+
+    for u in range(len(values)):
+        history = [{name: v for name, v in zip(columns, day) if not np.isnan(v)} for day in values[u]]
+        single = engine.predict_health_risks(history)
+        expected = np.polyfit(np.arange(30), [m.get("stress_score", 50) for m in history[-30:]], 1)[0]
+        assert cohort["trends"]["stress_score"][u] == pytest.approx(expected)
+        assert cohort["risk_count"][u] == single["risk_count"]
+        assert [name for name, flags in cohort["risks"].items() if flags[u]] == [
+            risk["type"] for risk in single["identified_risks"]
+        ]
+        assert sum(flags[u] for flags in cohort["recommendations"].values()) == len(single["recommendations"])
+
+
+def test_cohort_single_day_has_flat_trends(engine):
+    cohort = engine.predict_health_risks_cohort(np.full((3, 1, 1), 80.0), ["stress_score"])
+    np.testing.assert_array_equal(cohort["trends"]["stress_score"], 0.0)
+    np.testing.assert_array_equal(cohort["risks"]["high_stress"], True)
@@ -0,0 +1,98 @@
+import threading
+
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+from src.engines.health_engine import RISK_FEATURE_DEFAULTS, HealthPredictionEngine
+from src.utils.micro_batcher import MicroBatcher
+
+
+def run_concurrently(call_one, requests):
+    results = [None] * len(requests)
+    start = threading.Barrier(len(requests))
+
+    def call(i):
+        start.wait()
+        results[i] = call_one(requests[i])
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(requests))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_requests_share_batches_and_get_their_rows():
+    calls = []
+
+    def fn(X):
+        calls.append(len(X))
+        return X.sum(axis=1), X[:, 0] * 2
+
+    batcher = MicroBatcher(fn, max_batch_rows=64, max_wait_ms=200)
+    requests = [np.full((i % 3 + 1, 2), float(i)) for i in range(12)]
+    try:
+        results = run_concurrently(lambda X: batcher.run(X, timeout=5), requests)
+    finally:
+        batcher.shutdown()
+
+    for X, (sums, doubled) in zip(requests, results):
+        np.testing.assert_array_equal(sums, X.sum(axis=1))
+        np.testing.assert_array_equal(doubled, X[:, 0] * 2)
+    assert len(calls) < len(requests)
+    assert sum(calls) == sum(len(X) for X in requests)
+    assert all(rows <= 64 for rows in calls)
+
+
+def test_batch_failure_reaches_every_caller():
+    def fn(X):
+        raise ValueError("bad batch")
+
+    batcher = MicroBatcher(fn, max_wait_ms=1)
+    try:
+        with pytest.raises(ValueError, match="bad batch"):
+            batcher.run(np.zeros((1, 3)), timeout=5)
+    finally:
+        batcher.shutdown()
+
+
+class DictStore(dict):
+    def get(self, name, default=None):
+        return super().get(name, default)
+
+
+@pytest.fixture
+def health_store():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, len(RISK_FEATURE_DEFAULTS))) * [2, 1.5, 20, 2, 1, 3] + [8, 7, 30, 6, 2, 4]
+    score = np.clip(X[:, 0] * 5 + (10 - X[:, 1]) * 8 + (60 - X[:, 2]) * 0.5, 0, 100)
+    scaler = StandardScaler().fit(X)
+    return DictStore(
+        health_stress_classifier=GradientBoostingClassifier(n_estimators=10, random_state=0).fit(
+            scaler.transform(X), np.digitize(score, [30, 60, 80])
+        ),
+        health_stress_scaler=scaler,
+        health_risk_predictor=RandomForestRegressor(n_estimators=10, random_state=0).fit(scaler.transform(X), score),
+        health_risk_scaler=scaler,
+    )
+
+
+def test_batched_engine_matches_direct_engine(health_store):
+    direct = HealthPredictionEngine(model_store=health_store)
+    batched = HealthPredictionEngine(model_store=health_store, max_batch_rows=32, max_wait_ms=100)
+    metrics = [{"work_hours": 6 + i, "sleep_hours": 8 - i * 0.5} for i in range(6)]
+    try:
+        results = run_concurrently(lambda m: batched.predict_health_risks([m]), metrics)
+        stats = batched.batching_stats()
+    finally:
+        batched.shutdown()
+
+    for m, result in zip(metrics, results):
+        expected = direct.predict_health_risks([m])
+        assert result["predicted_stress"] == expected["predicted_stress"]
+        assert result["predicted_risk_level"] == expected["predicted_risk_level"]
+    assert stats["risk"]["requests"] == len(metrics)
+    assert stats["risk"]["batches"] < len(metrics)
@@ -0,0 +1,48 @@
+import warnings
+
+import numpy as np
+from statsmodels.tsa.arima.model import ARIMA
+
+from src.engines import order_selection
+from src.engines.order_selection import StepwiseOrderSelector
+
+
+def _series(n=150):
+    rng = np.random.default_rng(21)
+    shocks = rng.normal(0, 100, n)
+    diffs = np.zeros(n)
+    for t in range(1, n):
+        diffs[t] = 0.6 * diffs[t - 1] + shocks[t]
+    return 50000 + np.cumsum(diffs)
+
+
+def test_stepwise_matches_exhaustive_grid():
+    values = _series()
+    grid_aic = np.inf
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for p in range(3):
+            for d in range(2):
+                for q in range(3):
+                    grid_aic = min(grid_aic, ARIMA(values, order=(p, d, q)).fit().aic)
+
+    result = StepwiseOrderSelector().select(values)
+
+    assert result.aic <= grid_aic + 2.0
+    assert len(result.candidates) < 18
+    assert all(c["fit_seconds"] >= 0 for c in result.report())
+
+
+def test_failed_candidates_are_reported(monkeypatch):
+    real_fit = order_selection.fit_candidate
+
+    def flaky_fit(diffed, p, q, trend):
+        if (p, q) == (2, 2):
+            return None, 0.0, "LinAlgError: singular matrix"
+        return real_fit(diffed, p, q, trend)
+
+    monkeypatch.setattr(order_selection, "fit_candidate", flaky_fit)
+    result = StepwiseOrderSelector().select(_series(80))
+
+    assert {c.order for c in result.failures} == {(2, 0, 2), (2, 1, 2)}
+    assert result.model is not None
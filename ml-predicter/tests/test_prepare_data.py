@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.engines.forecast_engine import IncomeForecastEngine
+from src.utils.model_store import ModelStore
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return IncomeForecastEngine(str(tmp_path), model_store=ModelStore(str(tmp_path)))
+
+
+@pytest.mark.parametrize("dates", [
+    pd.date_range("2022-01-01", periods=24, freq="MS"),
+    pd.date_range("2022-01-31", periods=24, freq="ME"),
+    pd.date_range("2022-01-02", periods=20, freq="W"),
+    pd.date_range("2022-01-01", periods=30, freq="D")[::-1],
+])
+def test_numpy_path_matches_pandas(engine, dates):
+    values = [None if i in (3, 4) else 100.0 + i for i in range(len(dates))]
+    timeseries = [{"date": str(d.date()), "value": v} for d, v in zip(dates, values)]
+
+    fast = engine._prepare_data_numpy([p["date"] for p in timeseries], values)
+    assert fast is not None
+    expected = engine._prepare_data_pandas(pd.DataFrame(timeseries))
+    np.testing.assert_array_equal(fast["value"].values, expected["value"].values)
+    np.testing.assert_array_equal(fast.index.values.astype("datetime64[D]"), expected.index.values.astype("datetime64[D]"))
+
+
+@pytest.mark.parametrize("dates", [
+    ["2022-01-01", "2022-01-02", "2022-01-05"],          # gap
+    ["2022-01-01", "2022-01-01", "2022-01-02"],          # duplicate
+    ["2022-01-01T10:00:00", "2022-01-02T10:00:00"],      # time of day
+    ["01/05/2022", "01/06/2022"],                        # non-ISO
+])
+def test_irregular_input_falls_back_to_pandas(engine, dates):
+    values = list(range(len(dates)))
+    assert engine._prepare_data_numpy(dates, values) is None
+    df = engine.prepare_data(dates=dates, values=values)
+    assert df.index.is_monotonic_increasing and len(df) == len(dates)
@@ -0,0 +1,46 @@
+import numpy as np
+
+from src.engines.seasonality import SeasonalityAnalyzer, analyze_seasonality
+
+
+def _monthly(seed=0, n=48):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    return 1000 + 5 * t + 200 * np.sin(2 * np.pi * t / 12) + rng.normal(0, 30, n)
+
+
+def test_fft_acf_matches_direct_correlation():
+    y = _monthly(n=300)
+    t = np.arange(len(y))
+    x = y - np.polyval(np.polyfit(t, y, 1), t)
+    direct = np.correlate(x, x, mode="full")[len(x) - 1:]
+
+    np.testing.assert_allclose(analyze_seasonality(y).acf, direct / direct[0], atol=1e-12)
+
+
+def test_detects_monthly_season_not_its_harmonics():
+    for seed in range(3):
+        summary = analyze_seasonality(_monthly(seed))
+        assert summary.has_seasonality
+        assert summary.season_period == 12
+
+
+def test_white_noise_is_not_seasonal():
+    summary = analyze_seasonality(np.random.default_rng(1).normal(size=120))
+    assert not summary.has_seasonality
+    assert summary.season_period == 12
+
+
+def test_analyzer_memoizes_by_content():
+    analyzer = SeasonalityAnalyzer()
+    y = _monthly()
+    assert analyzer.analyze(y) is analyzer.analyze(y.copy())
+
+
+def test_constant_and_linear_series_are_not_seasonal():
+    t = np.arange(48, dtype=np.float64)
+    for y in (np.full(48, 5000.0), 1000 + 10 * t):
+        summary = analyze_seasonality(y)
+        assert not summary.has_seasonality
+        assert summary.candidates == []
+        assert summary.season_period == 12
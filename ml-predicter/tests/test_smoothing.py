@@ -0,0 +1,68 @@
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa.exponential_smoothing.ets import ETSModel
+
+from src.engines import smoothing
+from src.engines.smoothing import _initial_states, fit_holt_winters_batch
+
+
+@pytest.fixture
+def seasonal_batch():
+    rng = np.random.default_rng(3)
+    t = np.arange(48)
+    return 1000 + 5 * t + 50 * np.sin(2 * np.pi * t / 12) + rng.normal(0, 10, (4, 48))
+
+
+def test_batch_matches_statsmodels_ets_at_selected_params(seasonal_batch):
+    """Each row's forecast equals ETS(A,A,A) smoothed with the chosen params and start states"""
+    fit = fit_holt_winters_batch(seasonal_batch, 12)
+    mean, lower, upper = fit.forecast(6)
+    level0, trend0, seasonal0 = _initial_states(seasonal_batch, 12)
+
+    for i, row in enumerate(seasonal_batch):
+        endog = pd.Series(row[12:], index=pd.date_range("2020-01-01", periods=36, freq="MS"))
+        model = ETSModel(
+            endog, error="add", trend="add", seasonal="add", seasonal_periods=12,
+            initialization_method="known", initial_level=level0[i],
+            initial_trend=trend0[i], initial_seasonal=seasonal0[i]
+        )
+        results = model.smooth([fit.alpha[i], fit.alpha[i] * fit.beta[i], fit.gamma[i]])
+        expected = results.get_prediction(start=36, end=41).summary_frame()
+
+        np.testing.assert_allclose(mean[i], expected["mean"].values, rtol=1e-10)
+        np.testing.assert_allclose(lower[i], expected["pi_lower"].values, rtol=1e-10)
+        np.testing.assert_allclose(upper[i], expected["pi_upper"].values, rtol=1e-10)
+
+
+def test_batch_fit_equals_per_series_fit(seasonal_batch):
+    batch = fit_holt_winters_batch(seasonal_batch, 12).forecast(6)[0]
+    single = np.vstack([fit_holt_winters_batch(row[None, :], 12).forecast(6)[0] for row in seasonal_batch])
+    np.testing.assert_allclose(batch, single)
+
+
+def test_short_series_drop_seasonality():
+    fit = fit_holt_winters_batch(np.arange(10, dtype=float)[None, :] * 3 + 100, 12)
+    assert fit.season_period == 1
+    np.testing.assert_allclose(fit.forecast(3)[0][0], [130, 133, 136])
+
+
+def test_large_weekly_batch_is_fitted_in_bounded_chunks(monkeypatch):
+    rng = np.random.default_rng(8)
+    Y = 1000 + np.cumsum(rng.normal(0, 10, (2000, 110)), axis=1)
+
+    tracemalloc.start()
+    try:
+        fit = fit_holt_winters_batch(Y, 52)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    # One unchunked seasonal state alone would be 2000 x 175 x 52 floats (~146 MB)
+    assert peak < 64e6
+
+    # Chunking does not change the per-series fits
+    monkeypatch.setattr(smoothing, "MAX_STATE_ELEMENTS", 175 * 52 * 7)
+    chunked = fit_holt_winters_batch(Y[:50], 52)
+    np.testing.assert_allclose(chunked.forecast(8)[0], fit.forecast(8)[0][:50], rtol=1e-12)
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from statsmodels.tsa.arima.model import ARIMA
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+from src.engines.state_space import StateSpaceSystem, forecast_intervals
+from src.utils.ts_artifacts import CompactTimeSeriesModel
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(7)
+
+
+def _system(results):
+    compact = CompactTimeSeriesModel.from_results(results)
+    return compact, StateSpaceSystem.from_statsmodels(compact.model_type(), compact.apply_kwds(), compact.params)
+
+
+@pytest.mark.parametrize("spec", [
+    {"order": (1, 0, 1)},
+    {"order": (1, 1, 1)},
+    {"order": (1, 1, 1), "seasonal_order": (1, 1, 0, 12)},
+])
+def test_batch_filter_matches_statsmodels_apply(rng, spec):
+    """Conditioning many series at once equals statsmodels apply() per series"""
+    train = 50000 + np.cumsum(rng.normal(0, 500, 200))
+    model_cls = SARIMAX if "seasonal_order" in spec else ARIMA
+    results = model_cls(train, **spec).fit(**({"disp": False} if model_cls is SARIMAX else {}))
+    compact, system = _system(results)
+
+    users = 52000 + np.cumsum(rng.normal(0, 400, (4, 36)), axis=1)
+    a, P = system.filter(users)
+    mean, var = system.forecast(a, P, 6)
+    lower, upper = forecast_intervals(mean, var)
+
+    for i, series in enumerate(users):
+        expected = compact.apply(series).get_forecast(steps=6).summary_frame()
+        np.testing.assert_allclose(mean[i], expected["mean"].values, rtol=1e-9)
+        np.testing.assert_allclose(lower[i], expected["mean_ci_lower"].values, rtol=1e-9)
+        np.testing.assert_allclose(upper[i], expected["mean_ci_upper"].values, rtol=1e-9)
+
+
+def test_filter_rejects_missing_values(rng):
+    results = ARIMA(np.cumsum(rng.normal(size=100)), order=(1, 1, 0)).fit()
+    _, system = _system(results)
+
+    with pytest.raises(ValueError):
+        system.filter(np.array([[1.0, np.nan, 2.0]]))
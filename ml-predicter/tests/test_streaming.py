@@ -0,0 +1,124 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from statsmodels.tsa.arima.model import ARIMA
+
+from src.engines.forecast_engine import IncomeForecastEngine
+from src.engines.smoothing import fit_holt_winters_batch
+from src.engines.state_space import StateSpaceSystem
+from src.engines.streaming import StreamingForecaster, StreamState
+from src.utils.model_store import ModelStore
+from src.utils.stream_state import StreamStateStore
+from src.utils.ts_artifacts import CompactTimeSeriesModel
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(19)
+
+
+@pytest.fixture
+def engine(tmp_path, rng):
+    engine = IncomeForecastEngine(str(tmp_path), model_store=ModelStore(str(tmp_path)), ensemble_models=["arima"])
+    results = ARIMA(50000 + np.cumsum(rng.normal(0, 500, 150)), order=(1, 1, 1)).fit()
+    compact = CompactTimeSeriesModel.from_results(results)
+    engine._systems["arima"] = StateSpaceSystem.from_statsmodels(compact.model_type(), compact.apply_kwds(), compact.params)
+    return engine
+
+
+def test_holt_winters_update_equals_refit_at_fixed_params(rng):
+    t = np.arange(40)
+    Y = 1000 + 5 * t + 50 * np.sin(2 * np.pi * t / 12) + rng.normal(0, 10, (3, 40))
+    grid = {"alphas": (0.3,), "betas": (0.1,), "gammas": (0.2,)}
+
+    fit = fit_holt_winters_batch(Y[:, :36], 12, **grid)
+    for t in range(36, 40):
+        fit = fit.update(Y[:, t])
+    expected = fit_holt_winters_batch(Y, 12, **grid)
+    np.testing.assert_allclose(fit.forecast(15)[0], expected.forecast(15)[0], rtol=1e-12)
+
+
+def test_incremental_updates_match_full_history(engine, rng):
+    dates = np.datetime64("2024-01-01") + np.arange(60)
+    values = 52000 + np.cumsum(rng.normal(0, 400, 60))
+    streaming = StreamingForecaster(engine)
+
+    state = streaming.init_state(dates[:50], values[:50])
+    for date, value in zip(dates[50:], values[50:]):
+        # Through JSON, as stored in Redis
+        state = StreamState.from_dict(json.loads(json.dumps(state.to_dict())))
+        state = streaming.update(state, str(date), float(value))
+
+    expected = streaming.forecast(streaming.init_state(dates, values), 6)
+    result = streaming.forecast(state, 6)
+    assert state.n_obs == 60 and state.last_date == str(dates[-1])
+    np.testing.assert_allclose(result["forecast"], expected["forecast"], rtol=1e-9)
+    np.testing.assert_allclose(result["ci_upper"], expected["ci_upper"], rtol=1e-9)
+
+
+def test_skipped_days_are_forward_filled(engine, rng):
+    values = 52000 + np.cumsum(rng.normal(0, 400, 30))
+    streaming = StreamingForecaster(engine)
+    dates = np.datetime64("2024-01-01") + np.arange(30)
+
+    state = streaming.update(streaming.init_state(dates, values), "2024-02-01", 53000.0)
+    filled = np.concatenate([values, [values[-1], 53000.0]])
+    expected = streaming.init_state(np.datetime64("2024-01-01") + np.arange(32), filled)
+    np.testing.assert_allclose(state.kalman["arima"]["a"], expected.kalman["arima"]["a"], rtol=1e-9)
+
+    with pytest.raises(ValueError):
+        streaming.update(state, "2024-01-31", 1.0)
+
+
+class CompareAndSetRedis:
+    """Redis stand-in: GET, and EVAL with the compare-and-set script's semantics"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def eval(self, script, numkeys, key, expected, value, ttl):
+        if self.data.get(key, "") != expected:
+            return 0
+        self.data[key] = value
+        return 1
+
+
+def test_concurrent_updates_are_not_lost(engine, rng):
+    dates = np.datetime64("2024-01-01") + np.arange(30)
+    values = 52000 + np.cumsum(rng.normal(0, 400, 30))
+    streaming = StreamingForecaster(engine)
+    store = StreamStateStore(SimpleNamespace(redis=CompareAndSetRedis()))
+
+    async def run():
+        async def init(state):
+            return streaming.init_state(dates, values)
+        await store.update("u", init)
+
+        def observe(date, value):
+            async def advance(state):
+                await asyncio.sleep(0)  # both requests read before either writes
+                return streaming.update(state, date, value)
+            return store.update("u", advance)
+
+        await asyncio.gather(observe("2024-01-31", 53000.0), observe("2024-02-01", 53500.0))
+        return StreamState.from_dict(json.loads(store.cache.redis.data["stream:u"]))
+
+    state = asyncio.run(run())
+    # A lost 2024-01-31 observation would have been forward-filled from the day before
+    expected = streaming.init_state(np.datetime64("2024-01-01") + np.arange(32), np.append(values, [53000.0, 53500.0]))
+    assert state.n_obs == 32 and state.last_date == "2024-02-01"
+    np.testing.assert_allclose(state.kalman["arima"]["a"], expected.kalman["arima"]["a"], rtol=1e-9)
+
+
+def test_forecast_is_labelled_with_its_step_frequency(engine, rng):
+    dates = np.datetime64("2024-01-31") + np.arange(30)
+    streaming = StreamingForecaster(engine)
+    result = streaming.forecast(streaming.init_state(dates, 52000 + np.cumsum(rng.normal(0, 400, 30))), 3)
+    assert result["freq"] == "D"
+    assert result["forecast_dates"] == ["2024-03-01", "2024-03-02", "2024-03-03"]
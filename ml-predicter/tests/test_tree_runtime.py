@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import (
+    GradientBoostingClassifier,
+    GradientBoostingRegressor,
+    RandomForestClassifier,
+    RandomForestRegressor,
+)
+
+from src.engines.tree_runtime import FlatTreeEnsemble, compile_tree_model, forest_intervals
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(5)
+    X = rng.normal(size=(300, 6))
+    y = 2 * X[:, 0] + np.sin(3 * X[:, 1]) + 0.1 * rng.normal(size=300)
+    # float64 test rows exercise the float32 threshold comparison
+    X_test = rng.normal(size=(150, 6)) * 1.5
+    return X, y, X_test
+
+
+@pytest.mark.parametrize("model", [
+    RandomForestRegressor(n_estimators=40, max_depth=8, random_state=0),
+    GradientBoostingRegressor(n_estimators=60, random_state=0),
+])
+def test_regressors_match_sklearn_exactly(data, model):
+    X, y, X_test = data
+    model.fit(X, y)
+    flat = FlatTreeEnsemble.from_sklearn(model)
+    np.testing.assert_array_equal(flat.predict(X_test), model.predict(X_test))
+    # Single row, 1-D input
+    np.testing.assert_array_equal(flat.predict(X_test[0]), model.predict(X_test[:1]))
+
+
+@pytest.mark.parametrize("model, n_classes", [
+    (RandomForestClassifier(n_estimators=40, random_state=0), 2),
+    (GradientBoostingClassifier(n_estimators=40, random_state=0), 2),
+    (GradientBoostingClassifier(n_estimators=20, random_state=0), 3),
+])
+def test_classifiers_match_sklearn_exactly(data, model, n_classes):
+    X, y, X_test = data
+    labels = np.digitize(y, np.quantile(y, np.linspace(0, 1, n_classes + 1)[1:-1]))
+    model.fit(X, labels)
+    flat = FlatTreeEnsemble.from_sklearn(model)
+    np.testing.assert_array_equal(flat.predict_proba(X_test), model.predict_proba(X_test))
+    np.testing.assert_array_equal(flat.predict(X_test), model.predict(X_test))
+
+
+def test_per_tree_predictions_and_fallback(data):
+    X, y, X_test = data
+    model = RandomForestRegressor(n_estimators=10, random_state=0).fit(X, y)
+    flat = compile_tree_model(model)
+    expected = np.column_stack([tree.predict(X_test.astype(np.float32)) for tree in model.estimators_])
+    np.testing.assert_array_equal(flat.per_tree_predictions(X_test), expected)
+
+    # Unsupported models are served as-is
+    scaler_like = object()
+    assert compile_tree_model(scaler_like) is scaler_like
+    with pytest.raises(ValueError):
+        flat.predict(X_test[:, :3])
+
+
+def _is_mapped(array):
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
+def test_artifact_roundtrip_is_memory_mapped(data, tmp_path):
+    X, y, X_test = data
+    labels = (y > 0).astype(int)
+    for model, method in (
+        (RandomForestRegressor(n_estimators=10, random_state=0).fit(X, y), "predict"),
+        (GradientBoostingClassifier(n_estimators=10, random_state=0).fit(X, labels), "predict_proba"),
+    ):
+        manifest = FlatTreeEnsemble.from_sklearn(model).save(tmp_path / "model")
+        assert manifest.name == "model.trees.json"
+        loaded = FlatTreeEnsemble.load(manifest)
+
+        # Traversal arrays are used straight from the read-only mapping, without copies
+        for name in ("feature", "threshold", "children", "value", "roots"):
+            assert _is_mapped(getattr(loaded, name)) and not getattr(loaded, name).flags.writeable
+        np.testing.assert_array_equal(getattr(loaded, method)(X_test), getattr(model, method)(X_test))
+
+
+def test_model_store_prefers_tree_artifact(data, tmp_path):
+    import joblib
+    from src.utils.model_store import ModelStore
+
+    X, y, X_test = data
+    model = RandomForestRegressor(n_estimators=5, random_state=0).fit(X, y)
+    joblib.dump(model, tmp_path / "income_rf.pkl")
+    FlatTreeEnsemble.from_sklearn(model).save(tmp_path / "income_rf")
+
+    store = ModelStore(str(tmp_path)).load(["income_rf_trees", "income_rf"])
+    assert "income_rf" not in store
+    np.testing.assert_array_equal(store.get("income_rf_trees").predict(X_test), model.predict(X_test))
+
+    legacy = ModelStore(str(tmp_path), compile_trees=False).load(["income_rf_trees", "income_rf"])
+    assert "income_rf_trees" not in legacy
+    assert isinstance(legacy.get("income_rf"), RandomForestRegressor)
+
+
+def test_forest_intervals_from_per_tree_quantiles(data):
+    X, y, X_test = data
+    model = RandomForestRegressor(n_estimators=50, random_state=0).fit(X, y)
+    mean, lower, upper = forest_intervals(compile_tree_model(model), X_test, coverage=0.9)
+
+    np.testing.assert_array_equal(mean, model.predict(X_test))
+    per_tree = np.column_stack([tree.predict(X_test.astype(np.float32)) for tree in model.estimators_])
+    np.testing.assert_allclose(lower, np.quantile(per_tree, 0.05, axis=1), rtol=1e-12)
+    np.testing.assert_allclose(upper, np.quantile(per_tree, 0.95, axis=1), rtol=1e-12)
+
+    # The sklearn object gives the same interval
+    for flat, reference in zip((mean, lower, upper), forest_intervals(model, X_test, coverage=0.9)):
+        np.testing.assert_array_equal(flat, reference)
+    with pytest.raises(ValueError):
+        forest_intervals(GradientBoostingRegressor(n_estimators=5).fit(X, y), X_test)
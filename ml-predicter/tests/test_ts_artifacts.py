@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from statsmodels.tsa.arima.model import ARIMA
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+from src.utils.ts_artifacts import CompactTimeSeriesModel, load_compact_model
+
+
+@pytest.fixture
+def income_series():
+    rng = np.random.default_rng(42)
+    n = 240
+    trend = np.linspace(40000, 60000, n)
+    seasonal = 3000 * np.sin(2 * np.pi * np.arange(n) / 12)
+    return trend + seasonal + rng.normal(0, 1500, n)
+
+
+def _assert_same_forecast(original, compact, steps=12):
+    expected = original.get_forecast(steps=steps).summary_frame()
+    actual = compact.get_forecast(steps=steps).summary_frame()
+    np.testing.assert_allclose(actual.values, expected.values, rtol=1e-10)
+
+
+def test_arima_roundtrip_forecast_identical(income_series, tmp_path):
+    """Compact ARIMA artifact reproduces the original forecasts"""
+    results = ARIMA(income_series, order=(1, 1, 1)).fit()
+
+    path = CompactTimeSeriesModel.from_results(results).save(tmp_path / "arima.npz")
+    compact = load_compact_model(path)
+
+    _assert_same_forecast(results, compact)
+    assert compact.order == (1, 1, 1)
+
+
+def test_sarima_roundtrip_forecast_identical(income_series, tmp_path):
+    """Compact SARIMA artifact reproduces the original forecasts and is much smaller"""
+    import pickle
+
+    results = SARIMAX(
+        income_series,
+        order=(1, 1, 1),
+        seasonal_order=(1, 1, 0, 12),
+        enforce_stationarity=False,
+        enforce_invertibility=False
+    ).fit(disp=False)
+
+    path = CompactTimeSeriesModel.from_results(results).save(tmp_path / "sarima.npz")
+    compact = load_compact_model(path)
+
+    _assert_same_forecast(results, compact)
+    assert path.stat().st_size * 100 < len(pickle.dumps(results))
+
+
+def test_rejects_unknown_model_class():
+    with pytest.raises(ValueError):
+        CompactTimeSeriesModel(
+            model_class="os.system",
+            init_kwds={},
+            params=np.zeros(1),
+            endog_tail=np.zeros(1),
+            state=np.zeros(1),
+            state_cov=np.zeros((1, 1)),
+            nobs=1
+        )
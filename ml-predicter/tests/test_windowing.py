@@ -0,0 +1,79 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.config.settings import Settings
+from src.engines.forecast_engine import INCOME_ARTIFACTS, IncomeForecastEngine, build_income_engine
+from src.engines.windowing import WindowingConfig, apply_window_policy, resample
+from src.utils.model_store import ModelStore
+
+
+def daily_series(n, start="2021-03-17", seed=3):
+    rng = np.random.default_rng(seed)
+    dates = np.datetime64(start) + np.arange(n)
+    return dates, 50000 + np.cumsum(rng.normal(0, 100, n))
+
+
+@pytest.mark.parametrize("freq, rule", [("W", "W"), ("M", "ME")])
+def test_resample_matches_pandas(freq, rule):
+    dates, values = daily_series(400)
+    expected = pd.Series(values, index=pd.DatetimeIndex(dates)).resample(rule).mean()
+
+    labels, means = resample(dates, values, freq, "mean")
+
+    np.testing.assert_array_equal(labels, expected.index.values.astype("datetime64[D]"))
+    np.testing.assert_allclose(means, expected.values)
+
+
+def test_sum_drops_incomplete_last_bucket():
+    dates = np.datetime64("2024-01-01") + np.arange(45)  # Jan 1 .. Feb 14
+    labels, sums = resample(dates, np.ones(45), "M", "sum")
+    np.testing.assert_array_equal(labels, np.array(["2024-01-31"], dtype="datetime64[D]"))
+    np.testing.assert_array_equal(sums, [31.0])
+
+
+def test_policy_picks_coarsest_frequency_and_bounds_window():
+    config = WindowingConfig(latency_budget_ms=100)
+    # Three years of days: monthly has enough points
+    _, values, policy = apply_window_policy(*daily_series(3 * 365), config)
+    assert policy.target_freq == "M" and len(values) == policy.window == 36
+
+    # Half a year of days: too few months, weekly instead
+    _, _, policy = apply_window_policy(*daily_series(200), config)
+    assert policy.target_freq == "W"
+
+    # Ten years of days at a fixed daily frequency: truncated to the budget
+    _, values, policy = apply_window_policy(*daily_series(3650), WindowingConfig(target_freq="D", latency_budget_ms=100))
+    assert policy.truncated and len(values) == config.max_window(7) < 3650
+
+
+def test_ensemble_records_policy():
+    engine = IncomeForecastEngine(
+        model_store=ModelStore("/nonexistent"),
+        ensemble_models=["exponential_smoothing"],
+        windowing=WindowingConfig()
+    )
+    dates, values = daily_series(3 * 365)
+    df = engine.prepare_data(dates=[str(d) for d in dates], values=values.tolist())
+
+    result = engine.ensemble_forecast(df, periods=3)
+    batch = engine.batch_forecast([(dates, values)], periods=3)[0]
+
+    assert result["preprocessing"]["target_freq"] == "M"
+    assert result["preprocessing"]["raw_points"] == 3 * 365
+    np.testing.assert_allclose(batch["forecast"], result["forecast"], rtol=1e-6)
+    assert batch["preprocessing"] == result["preprocessing"]
+
+
+def test_app_and_precompute_engines_share_a_fingerprint(tmp_path):
+    (tmp_path / "income_ensemble_weights.json").write_text(json.dumps({"weights": {"exponential_smoothing": 1.0}}))
+    settings = Settings(MODEL_PATH=str(tmp_path), FORECAST_WINDOWING=True)
+
+    # The app loads every artifact, scripts/precompute_forecasts.py only the income ones
+    app_engine = build_income_engine(settings, ModelStore(str(tmp_path)).load_all())
+    job_engine = build_income_engine(settings, ModelStore(str(tmp_path)).load(INCOME_ARTIFACTS))
+
+    assert app_engine.fingerprint() == job_engine.fingerprint()
+    assert job_engine.fingerprint()["windowing"]["latency_budget_ms"] == settings.ENSEMBLE_LATENCY_BUDGET_MS
@@ -601,6 +601,7 @@ CREATE INDEX IF NOT EXISTS idx_messages_consultation_date ON public.consultation
 -- Additional Indexes (Moved from inline to explicit CREATE INDEX)
 CREATE INDEX IF NOT EXISTS idx_user_predictions ON public.predictions (user_id);
 CREATE INDEX IF NOT EXISTS idx_period_predictions ON public.predictions (period_start, period_end);
+CREATE INDEX IF NOT EXISTS idx_predictions_input_key ON public.predictions (user_id, (combined_prediction->>'input_key'));
 CREATE INDEX IF NOT EXISTS idx_user_metrics_date ON public.user_metrics (user_id, metric_date);
 CREATE INDEX IF NOT EXISTS idx_metric_type_date_solo ON public.user_metrics (metric_type, metric_date);
 CREATE INDEX IF NOT EXISTS idx_metrics_recorded_at ON public.user_metrics (recorded_at);